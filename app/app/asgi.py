@@ -2,6 +2,9 @@
 ASGI config for app project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Requests resolve against app.urls_async, which serves the recipe and user
+read paths as async views. Streaming responses, such as recipe exports, are
+read in a sync thread since their generators query the database.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
@@ -9,8 +12,59 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIHandler, ASGIRequest
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
 
-application = get_asgi_application()
+
+class AsyncURLConfRequest(ASGIRequest):
+    """ASGI request resolved against the async URLconf."""
+    urlconf = 'app.urls_async'
+
+
+class AsyncURLConfASGIHandler(ASGIHandler):
+    """ASGI handler serving the async read paths."""
+    request_class = AsyncURLConfRequest
+
+    async def send_response(self, response, send):
+        """Send a response, reading streaming content in a sync thread.
+
+        Django 3.2 iterates streaming responses on the event loop, where
+        database queries raise SynchronousOnlyOperation. The parent sends
+        the headers, an empty body and closes the response; each part is
+        pulled through sync_to_async before that final message.
+        """
+        if not response.streaming:
+            return await super().send_response(response, send)
+
+        parts = iter(response)
+        next_part = sync_to_async(next, thread_sensitive=True)
+        response.streaming_content = []
+
+        async def send_parts(message):
+            if message['type'] == 'http.response.body' and not message.get(
+                'more_body',
+            ):
+                part = await next_part(parts, None)
+                while part is not None:
+                    for chunk, _ in self.chunk_bytes(part):
+                        await send({
+                            'type': 'http.response.body',
+                            'body': chunk,
+                            'more_body': True,
+                        })
+                    part = await next_part(parts, None)
+            await send(message)
+
+        await super().send_response(response, send_parts)
+
+
+def get_application():
+    """Set up Django and return the ASGI application."""
+    django.setup(set_prefix=False)
+    return AsyncURLConfASGIHandler()
+
+
+application = get_application()
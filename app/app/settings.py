@@ -47,6 +47,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.metrics.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -80,16 +81,71 @@ WSGI_APPLICATION = 'app.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# Connections are kept for DB_CONN_MAX_AGE seconds (0 closes them after
+# every request) and, when DB_CONN_HEALTH_CHECKS is set, a reused
+# connection is pinged when a request first uses it so a dead one is
+# replaced instead of failing the request (see core.db).
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'core.backends.postgresql',
         "HOST": os.environ.get('DB_HOST'),
         "NAME": os.environ.get('DB_NAME'),
         "USER": os.environ.get('DB_USER'),
         "PASSWORD": os.environ.get('DB_PASS'),
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': bool(
+            int(os.environ.get('DB_CONN_HEALTH_CHECKS', 1))
+        ),
+        'OPTIONS': {
+            'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', 5)),
+        },
     }
 }
 
+# Read replicas, one per comma separated host in DB_REPLICA_HOSTS. Safe
+# recipe, tag and ingredient reads use a random replica, unless the user
+# wrote in the last REPLICA_PIN_SECONDS (see core.routers).
+DATABASE_REPLICAS = []
+for index, host in enumerate(
+    filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(',')),
+    start=1,
+):
+    DATABASE_REPLICAS.append(f'replica_{index}')
+    DATABASES[f'replica_{index}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', 10))
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+#
+# The recipe response cache generations, replica pins, token cache and
+# login throttles must be shared by every worker process, so set
+# CACHE_MEMCACHED_LOCATIONS to comma separated memcached host:port pairs.
+# Without it each process gets its own LocMemCache, which is only correct
+# when a single process serves the API; manage.py check --deploy warns
+# about it (see core.checks).
+CACHE_MEMCACHED_LOCATIONS = list(
+    filter(None, os.environ.get('CACHE_MEMCACHED_LOCATIONS', '').split(','))
+)
+if CACHE_MEMCACHED_LOCATIONS:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': CACHE_MEMCACHED_LOCATIONS,
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -140,6 +196,101 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'core.User'
 
+# API media types (see core.renderers). ORJSON swaps DRF's stdlib JSON
+# renderer and parser for orjson ones rendering the same bytes.
+# MessagePack is served and accepted as application/msgpack.
+API_ORJSON = bool(int(os.environ.get('API_ORJSON', 1)))
+JSON_RENDERER, JSON_PARSER = (
+    ('core.renderers.ORJSONRenderer', 'core.renderers.ORJSONParser')
+    if API_ORJSON else
+    ('rest_framework.renderers.JSONRenderer',
+     'rest_framework.parsers.JSONParser')
+)
+
+# Throttles identify clients by REMOTE_ADDR, or behind NUM_PROXIES
+# trusted reverse proxies by the X-Forwarded-For address the nearest one
+# added. Addresses the client put in the header are never trusted.
+NUM_PROXIES = int(os.environ.get('NUM_PROXIES', 0))
+
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_RENDERER_CLASSES': [
+        JSON_RENDERER,
+        'core.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        JSON_PARSER,
+        'core.renderers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': os.environ.get('LOGIN_IP_THROTTLE_RATE', '120/min'),
+        'login_email': os.environ.get('LOGIN_EMAIL_THROTTLE_RATE', '10/min'),
+    },
+    'NUM_PROXIES': NUM_PROXIES,
 }
+
+# Cached token authentication (see user.authentication). Entries live in
+# the Django cache for AUTH_TOKEN_CACHE_TTL seconds and in a per-process
+# LRU for AUTH_TOKEN_LOCAL_CACHE_TTL seconds.
+AUTH_TOKEN_CACHE_TTL = int(os.environ.get('AUTH_TOKEN_CACHE_TTL', 300))
+AUTH_TOKEN_LOCAL_CACHE_TTL = int(
+    os.environ.get('AUTH_TOKEN_LOCAL_CACHE_TTL', 5)
+)
+AUTH_TOKEN_LOCAL_CACHE_SIZE = int(
+    os.environ.get('AUTH_TOKEN_LOCAL_CACHE_SIZE', 1024)
+)
+
+# Seconds a rendered recipe API response stays in the per-user cache.
+RECIPE_RESPONSE_CACHE_TTL = int(
+    os.environ.get('RECIPE_RESPONSE_CACHE_TTL', 300)
+)
+
+# Threads running ORM work for the async views served under ASGI (see
+# core.async_views). 0 runs them like Django's sync views instead.
+ASYNC_VIEW_WORKERS = int(os.environ.get('ASYNC_VIEW_WORKERS', 16))
+
+# Password hashing (see user.hashing). PBKDF2 iterations are configurable;
+# stored hashes using another count are upgraded on login. Hashes run on
+# PASSWORD_HASH_WORKERS threads with up to PASSWORD_HASH_QUEUE_SIZE
+# logins waiting before new ones are refused; 0 workers hash inline.
+AUTHENTICATION_BACKENDS = ['user.backends.PooledModelBackend']
+PASSWORD_HASHERS = [
+    'user.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+PASSWORD_HASH_ITERATIONS = int(
+    os.environ.get('PASSWORD_HASH_ITERATIONS', 260000)
+)
+PASSWORD_HASH_WORKERS = int(os.environ.get(
+    'PASSWORD_HASH_WORKERS',
+    max(1, (os.cpu_count() or 2) // 2),
+))
+PASSWORD_HASH_QUEUE_SIZE = int(
+    os.environ.get('PASSWORD_HASH_QUEUE_SIZE', 16)
+)
+
+# Recipe image uploads (see recipe.images). Thumbnails render on
+# THUMBNAIL_WORKERS processes; 0 renders them inline after commit.
+RECIPE_IMAGE_MAX_BYTES = int(
+    os.environ.get('RECIPE_IMAGE_MAX_BYTES', 10 * 1024 * 1024)
+)
+THUMBNAIL_WORKERS = int(os.environ.get('THUMBNAIL_WORKERS', 2))
+
+# Batched API requests (see core.batch). A batch holds at most
+# BATCH_MAX_REQUESTS sub-requests; runs of GETs use BATCH_WORKERS
+# threads, and 0 runs them one after another.
+BATCH_MAX_REQUESTS = int(os.environ.get('BATCH_MAX_REQUESTS', 20))
+BATCH_WORKERS = int(os.environ.get('BATCH_WORKERS', 4))
+
+# Request instrumentation (see core.metrics). SERVER_TIMING adds the
+# Server-Timing header to responses; /metrics answers only clients in
+# METRICS_ALLOWED_IPS.
+SERVER_TIMING = bool(int(os.environ.get('SERVER_TIMING', 1)))
+METRICS_ALLOWED_IPS = os.environ.get(
+    'METRICS_ALLOWED_IPS', '127.0.0.1,::1'
+).split(',')
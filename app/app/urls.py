@@ -8,6 +8,8 @@ from django.urls import include, path
 from django.conf.urls.static import static
 from django.conf import settings
 
+from core.views import BatchView, metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/schema/', SpectacularAPIView.as_view(), name='api-schema'),
@@ -18,6 +20,9 @@ urlpatterns = [
     ),
     path('api/user/', include('user.urls')),
     path('api/recipe/', include('recipe.urls')),
+    path('api/health/', include('core.urls')),
+    path('api/batch/', BatchView.as_view(), name='batch'),
+    path('metrics', metrics_view, name='metrics'),
 ]
 
 # if dev server and not prod :
@@ -0,0 +1,31 @@
+"""
+URL configuration for the ASGI application.
+
+Matches app.urls, except that the recipe and user read paths are async
+views keeping ORM work on a bounded thread pool.
+"""
+from django.urls import include, path
+
+from app.urls import urlpatterns as sync_urlpatterns
+from recipe import urls as recipe_urls
+from user import urls as user_urls
+
+
+ASYNC_INCLUDES = {
+    'api/recipe/': recipe_urls,
+    'api/user/': user_urls,
+}
+
+
+def _with_async_views(pattern):
+    """Return pattern, preferring the async views of an included app."""
+    module = ASYNC_INCLUDES.get(str(pattern.pattern))
+    if module is None:
+        return pattern
+    return path(str(pattern.pattern), include((
+        module.async_urlpatterns + module.urlpatterns,
+        module.app_name,
+    )))
+
+
+urlpatterns = [_with_async_views(pattern) for pattern in sync_urlpatterns]
@@ -0,0 +1,66 @@
+"""
+Async wrappers serving sync views from a bounded thread pool.
+
+Under ASGI, the event loop awaits the wrapped view while a pool thread
+runs it, including ORM access and rendering, so slow clients hold no
+thread. The pool has ASYNC_VIEW_WORKERS threads, which also bounds the
+database connections the async paths open.
+"""
+import asyncio
+import contextvars
+import functools
+
+from asgiref.sync import sync_to_async
+
+from django.db import close_old_connections
+
+from core import executors, metrics
+
+
+def get_executor():
+    """Return the shared view thread pool, or None when it is disabled."""
+    return executors.get_executor('async-view', 'ASYNC_VIEW_WORKERS')
+
+
+def _render(view, request, *args, **kwargs):
+    """Call a sync view and render its response."""
+    response = view(request, *args, **kwargs)
+    if callable(getattr(response, 'render', None)):
+        response = metrics.timed('render', response.render)
+    return response
+
+
+def _render_in_pool(view, request, *args, **kwargs):
+    """Render a view on a pool thread, like a sync request would."""
+    close_old_connections()
+    try:
+        return _render(view, request, *args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+def async_view(view):
+    """Return an async view running view on the bounded thread pool."""
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        executor = get_executor()
+        if executor is None:
+            return await sync_to_async(_render)(
+                view, request, *args, **kwargs
+            )
+
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            executor,
+            functools.partial(
+                context.run,
+                _render_in_pool,
+                view,
+                request,
+                *args,
+                **kwargs,
+            ),
+        )
+
+    return wrapper
@@ -0,0 +1,10 @@
+"""
+PostgreSQL database backend with connection health checks.
+"""
+from django.db.backends.postgresql import base
+
+from core.db import HealthCheckMixin
+
+
+class DatabaseWrapper(HealthCheckMixin, base.DatabaseWrapper):
+    """PostgreSQL connections pinged on first use in each request."""
@@ -0,0 +1,154 @@
+"""
+Batched API requests.
+
+A batch carries up to BATCH_MAX_REQUESTS sub-requests. Each one is
+dispatched to its view through the sync URLconf, skipping middleware,
+as the batch's already authenticated user. Sub-requests run in order,
+except that consecutive GET and HEAD requests run concurrently on a
+pool of BATCH_WORKERS threads. Any other method waits for the requests
+before it, so later requests see its writes.
+
+A sub-request that raises gets the error response Django would have
+sent for it, without failing the rest of the batch. JSON bodies are
+returned decoded, other bodies as text or, when they are not UTF-8, as
+base64 with "encoding": "base64". Streaming responses such as exports
+cannot be batched.
+"""
+import base64
+from io import BytesIO
+from urllib.parse import urlsplit
+
+import orjson
+
+from django.conf import settings
+from django.core.handlers.exception import response_for_exception
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import close_old_connections
+from django.urls import Resolver404, resolve
+
+from rest_framework.permissions import SAFE_METHODS
+
+from core import executors
+
+
+# Request metadata a sub-request does not inherit from the batch.
+REQUEST_META = {
+    'CONTENT_LENGTH', 'CONTENT_TYPE', 'PATH_INFO', 'QUERY_STRING',
+    'REQUEST_METHOD', 'wsgi.input',
+}
+
+
+def get_executor():
+    """Return the batch thread pool, or None when it is disabled."""
+    return executors.get_executor('batch', 'BATCH_WORKERS')
+
+
+def sub_request(request, item):
+    """Build the request for one sub-request of a batch."""
+    url = urlsplit(item['path'])
+    body = orjson.dumps(item['body']) if 'body' in item else b''
+    environ = {
+        key: value for key, value in request.META.items()
+        if key not in REQUEST_META and not (
+            key.startswith('HTTP_') and key != 'HTTP_HOST'
+        )
+    }
+    environ['HTTP_ACCEPT'] = 'application/json'
+    for name, value in item.get('headers', {}).items():
+        environ[f'HTTP_{name.upper().replace("-", "_")}'] = value
+    environ.update({
+        'REQUEST_METHOD': item['method'],
+        'PATH_INFO': url.path,
+        'QUERY_STRING': url.query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': BytesIO(body),
+        'wsgi.url_scheme': request.scheme,
+    })
+    sub = WSGIRequest(environ)
+    sub.user = request.user
+    # DRF authenticates requests carrying these without checking again.
+    sub._force_auth_user = request.user
+    sub._force_auth_token = request.auth
+    return sub
+
+
+def error(status, detail):
+    """Return an error sub-response made by the batch itself."""
+    return {'status': status, 'headers': {}, 'body': {'detail': detail}}
+
+
+def dispatch(request, item):
+    """Run one sub-request and return its status, headers and body."""
+    try:
+        match = resolve(urlsplit(item['path']).path, settings.ROOT_URLCONF)
+    except Resolver404:
+        return error(404, 'Not found.')
+    if match.view_name == 'batch':
+        return error(400, 'Batches cannot be nested.')
+
+    sub = sub_request(request, item)
+    sub.resolver_match = match
+    try:
+        response = match.func(sub, *match.args, **match.kwargs)
+        if callable(getattr(response, 'render', None)):
+            # Post-render callbacks may replace the response, e.g. with
+            # a 304 from the response cache.
+            response = response.render()
+    except Exception as exc:
+        response = response_for_exception(sub, exc)
+
+    if response.streaming:
+        response.close()
+        return error(400, 'Streaming responses cannot be batched.')
+    return sub_response(response)
+
+
+def sub_response(response):
+    """Return the status, headers and decoded body of a response."""
+    entry = {
+        'status': response.status_code,
+        'headers': dict(response.items()),
+        'body': None,
+    }
+    content = response.content
+    if not content:
+        return entry
+    if response.get('Content-Type', '').startswith('application/json'):
+        entry['body'] = orjson.loads(content)
+        return entry
+    try:
+        entry['body'] = content.decode()
+    except UnicodeDecodeError:
+        entry['body'] = base64.b64encode(content).decode()
+        entry['encoding'] = 'base64'
+    return entry
+
+
+def _dispatch_in_pool(request, item):
+    """Run a sub-request on a pool thread with its own connection."""
+    close_old_connections()
+    try:
+        return dispatch(request, item)
+    finally:
+        close_old_connections()
+
+
+def run(request, items):
+    """Run the sub-requests of a batch and return their responses."""
+    executor = get_executor()
+    responses = []
+    reads = []
+
+    def wait_for_reads():
+        responses.extend(future.result() for future in reads)
+        reads.clear()
+
+    for item in items:
+        if executor is not None and item['method'] in SAFE_METHODS:
+            reads.append(executor.submit(_dispatch_in_pool, request, item))
+            continue
+        wait_for_reads()
+        responses.append(dispatch(request, item))
+    wait_for_reads()
+    return responses
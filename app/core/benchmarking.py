@@ -0,0 +1,8 @@
+"""
+Latency summaries shared by the benchmark and load test commands.
+"""
+
+
+def percentile(timings, fraction):
+    """Return the value below which fraction of sorted timings fall."""
+    return timings[max(0, int(len(timings) * fraction) - 1)]
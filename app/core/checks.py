@@ -0,0 +1,26 @@
+"""
+System checks for the core app.
+"""
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+
+LOCMEM_CACHE = 'django.core.cache.backends.locmem.LocMemCache'
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """Warn when the default cache is not shared between processes."""
+    if settings.CACHES['default']['BACKEND'] != LOCMEM_CACHE:
+        return []
+    return [Warning(
+        'The default cache is a per-process LocMemCache.',
+        hint=(
+            'Response cache generations, replica pins, cached tokens and '
+            'login throttles are not shared between worker processes, so '
+            'other processes can serve stale data after a write. Set '
+            'CACHE_MEMCACHED_LOCATIONS unless a single process serves '
+            'the API.'
+        ),
+        id='core.W001',
+    )]
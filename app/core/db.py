@@ -0,0 +1,64 @@
+"""
+Health checks of persistent database connections.
+
+Django 3.2 reuses connections for CONN_MAX_AGE seconds but only notices
+one has died (database restart, idle timeout in a proxy) when a query
+fails. Databases setting CONN_HEALTH_CHECKS, as Django 4.1 does natively,
+have a reused connection pinged the first time each request uses it and
+replaced if it no longer works. Requests that never touch a database,
+such as ones served from the response cache, are not checked.
+
+The check lives in HealthCheckMixin, which the core.backends database
+engines add to Django's DatabaseWrapper.
+"""
+from django.db import DatabaseError, connections
+
+
+class HealthCheckMixin:
+    """DatabaseWrapper mixin health checking a connection on first use."""
+    health_check_done = False
+
+    def connect(self):
+        # A new connection needs no check until the next request.
+        self.health_check_done = True
+        super().connect()
+
+    def close_if_unusable_or_obsolete(self):
+        # Called by Django when each request starts and finishes.
+        self.health_check_done = False
+        super().close_if_unusable_or_obsolete()
+
+    def close_if_health_check_failed(self):
+        """Close the connection if it is no longer usable."""
+        if (
+            self.connection is None
+            or self.health_check_done
+            or self.in_atomic_block
+            or not self.settings_dict.get('CONN_HEALTH_CHECKS')
+        ):
+            return
+        if not self.is_usable():
+            self.close()
+        self.health_check_done = True
+
+    def set_autocommit(self, *args, **kwargs):
+        self.close_if_health_check_failed()
+        super().set_autocommit(*args, **kwargs)
+
+    def _cursor(self, *args, **kwargs):
+        self.close_if_health_check_failed()
+        return super()._cursor(*args, **kwargs)
+
+
+def is_ready(alias='default'):
+    """Return whether a database answers a trivial query."""
+    conn = connections[alias]
+    try:
+        conn.ensure_connection()
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except DatabaseError:
+        # Reconnect on the next check rather than reuse a broken socket.
+        conn.close()
+        return False
+    return True
@@ -0,0 +1,46 @@
+"""
+Shared worker pools sized from settings.
+
+Each pool is built on first use with as many workers as its setting
+names, and then shared by the whole process. A setting of 0 disables
+the pool, and callers run the work inline instead.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(name, workers_setting, factory=None):
+    """Return the pool called name, or None when it is disabled.
+
+    factory is called with the number of workers to build the pool; by
+    default it is a thread pool whose threads are named after it.
+    """
+    workers = getattr(settings, workers_setting)
+    if not workers:
+        return None
+    with _executors_lock:
+        executor = _executors.get(name)
+        if executor is None:
+            if factory is None:
+                executor = ThreadPoolExecutor(
+                    max_workers=workers,
+                    thread_name_prefix=name,
+                )
+            else:
+                executor = factory(workers)
+            _executors[name] = executor
+    return executor
+
+
+def shutdown(name):
+    """Shut down and forget the pool called name, if it was built."""
+    with _executors_lock:
+        executor = _executors.pop(name, None)
+    if executor is not None:
+        executor.shutdown()
@@ -0,0 +1,209 @@
+"""
+Django command to compare WSGI and ASGI throughput under slow clients
+"""
+import asyncio
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from rest_framework.authtoken.models import Token
+
+from app.asgi import AsyncURLConfASGIHandler
+from core.benchmarking import percentile
+from core.models import Recipe
+
+
+PATH = '/api/recipe/recipes/'
+
+
+def wsgi_request(app, token, delay):
+    """Send one request to a WSGI app, then read it like a slow client."""
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': PATH,
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'localhost',
+        'HTTP_ACCEPT': 'application/json',
+        'HTTP_AUTHORIZATION': f'Token {token}',
+        'wsgi.input': BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.url_scheme': 'http',
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    statuses = []
+    result = app(environ, lambda status, headers, *args: statuses.append(
+        int(status.split()[0])
+    ))
+    try:
+        b''.join(result)
+        # A sync worker stays busy until the client has the response.
+        time.sleep(delay)
+    finally:
+        result.close()
+    return statuses[0]
+
+
+async def asgi_request(app, token, delay):
+    """Send one request to an ASGI app, then read it like a slow client."""
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': PATH,
+        'raw_path': PATH.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [
+            (b'host', b'localhost'),
+            (b'accept', b'application/json'),
+            (b'authorization', f'Token {token}'.encode()),
+        ],
+        'client': ('127.0.0.1', 0),
+        'server': ('localhost', 80),
+    }
+    statuses = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            statuses.append(message['status'])
+        elif not message.get('more_body'):
+            await asyncio.sleep(delay)
+
+    await app(scope, receive, send)
+    return statuses[0]
+
+
+def run_wsgi(app, token, concurrency, requests, workers, delay):
+    """Return latencies and statuses of clients sharing WSGI workers."""
+    timings = []
+    statuses = []
+    lock = threading.Lock()
+    server = ThreadPoolExecutor(max_workers=workers)
+
+    def client(count):
+        for _ in range(count):
+            start = time.perf_counter()
+            status = server.submit(wsgi_request, app, token, delay).result()
+            with lock:
+                timings.append(time.perf_counter() - start)
+                statuses.append(status)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as clients:
+        for count in _split(requests, concurrency):
+            clients.submit(client, count)
+    server.shutdown()
+    return timings, statuses
+
+
+def run_asgi(app, token, concurrency, requests, delay):
+    """Return latencies and statuses of clients sharing one event loop."""
+    timings = []
+    statuses = []
+
+    async def client(count):
+        for _ in range(count):
+            start = time.perf_counter()
+            statuses.append(await asgi_request(app, token, delay))
+            timings.append(time.perf_counter() - start)
+
+    async def main():
+        await asyncio.gather(*(
+            client(count) for count in _split(requests, concurrency)
+        ))
+
+    asyncio.run(main())
+    return timings, statuses
+
+
+def _split(requests, concurrency):
+    """Spread requests over concurrency clients."""
+    return [
+        requests // concurrency + (index < requests % concurrency)
+        for index in range(concurrency)
+    ]
+
+
+class Command(BaseCommand):
+    """Django command to load test the WSGI and ASGI applications."""
+    help = (
+        'Send concurrent recipe list requests from slow clients to the WSGI '
+        'and ASGI applications and report throughput and p99 latency.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            default='1,10,50,100',
+            help='Comma separated numbers of concurrent clients.',
+        )
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument(
+            '--wsgi-workers',
+            type=int,
+            default=8,
+            help='Worker threads of the simulated WSGI server.',
+        )
+        parser.add_argument(
+            '--client-delay',
+            type=float,
+            default=20,
+            help='Milliseconds a client takes to read a response.',
+        )
+        parser.add_argument('--recipes', type=int, default=50)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        delay = options['client_delay'] / 1000
+        user = get_user_model().objects.create_user(
+            'asgi-benchmark@example.com',
+        )
+        try:
+            token = Token.objects.create(user=user).key
+            Recipe.objects.bulk_create(
+                Recipe(user=user, title=f'Recipe {index}', price=Decimal(1))
+                for index in range(options['recipes'])
+            )
+            servers = {
+                'wsgi': lambda concurrency: run_wsgi(
+                    WSGIHandler(), token, concurrency, options['requests'],
+                    options['wsgi_workers'], delay,
+                ),
+                'asgi': lambda concurrency: run_asgi(
+                    AsyncURLConfASGIHandler(), token, concurrency,
+                    options['requests'], delay,
+                ),
+            }
+            for concurrency in options['concurrency'].split(','):
+                results = []
+                for name, run in servers.items():
+                    start = time.perf_counter()
+                    timings, statuses = run(int(concurrency))
+                    elapsed = time.perf_counter() - start
+                    timings.sort()
+                    errors = sum(status != 200 for status in statuses)
+                    results.append(
+                        f'{name} {len(timings) / elapsed:.0f} req/s '
+                        f'p99 {percentile(timings, 0.99) * 1000:.1f}ms '
+                        f'errors {errors}'
+                    )
+                self.stdout.write(
+                    f'concurrency {concurrency}: ' + ' | '.join(results)
+                )
+        finally:
+            user.delete()
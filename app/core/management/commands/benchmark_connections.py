@@ -0,0 +1,99 @@
+"""
+Django command to benchmark requests with and without connection reuse
+"""
+import sys
+import time
+from io import BytesIO
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.backends.signals import connection_created
+
+from core.benchmarking import percentile
+
+
+def call(app, path):
+    """Send one GET request to a WSGI app and return its status code."""
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'localhost',
+        'HTTP_ACCEPT': 'application/json',
+        'wsgi.input': BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.url_scheme': 'http',
+        'wsgi.multithread': False,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    statuses = []
+    result = app(environ, lambda status, headers, *args: statuses.append(
+        int(status.split()[0])
+    ))
+    try:
+        b''.join(result)
+    finally:
+        result.close()
+    return statuses[0]
+
+
+class Command(BaseCommand):
+    """Django command to measure the cost of connecting per request."""
+    help = (
+        'Send requests with CONN_MAX_AGE 0 and with the configured '
+        'CONN_MAX_AGE, and report requests per second and latency. The '
+        'default path, the readiness probe, runs one uncached query.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--path', default='/api/health/ready/')
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        configured = connection.settings_dict['CONN_MAX_AGE']
+        app = WSGIHandler()
+        try:
+            for max_age in (0, configured or 60):
+                self.stdout.write(self._run(
+                    app, options['path'], max_age, options['requests'],
+                ))
+        finally:
+            connection.close()
+            connection.settings_dict['CONN_MAX_AGE'] = configured
+
+    def _run(self, app, path, max_age, requests):
+        """Run requests with one CONN_MAX_AGE and return its report line."""
+        # The age is read when connecting, so start from a new connection.
+        connection.close()
+        connection.settings_dict['CONN_MAX_AGE'] = max_age
+        connects = []
+
+        def count(sender, **kwargs):
+            connects.append(sender)
+
+        connection_created.connect(count)
+        timings = []
+        start = time.perf_counter()
+        try:
+            for _ in range(requests):
+                request_start = time.perf_counter()
+                status = call(app, path)
+                timings.append(time.perf_counter() - request_start)
+                if status != 200:
+                    raise CommandError(f'{path} answered {status}')
+        finally:
+            connection_created.disconnect(count)
+        elapsed = time.perf_counter() - start
+        timings.sort()
+        return (
+            f'CONN_MAX_AGE {max_age}: {requests / elapsed:.0f} req/s, '
+            f'p50 {percentile(timings, 0.5) * 1000:.2f}ms '
+            f'p99 {percentile(timings, 0.99) * 1000:.2f}ms, '
+            f'{len(connects)} connections opened'
+        )
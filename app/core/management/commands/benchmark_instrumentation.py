@@ -0,0 +1,132 @@
+"""
+Django command to measure the overhead of request instrumentation
+"""
+import statistics
+import sys
+import time
+from decimal import Decimal
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test.utils import override_settings
+from rest_framework.authtoken.models import Token
+
+from core import metrics
+from core.models import Recipe
+
+
+PATH = '/api/recipe/recipes/'
+MIDDLEWARE = 'core.metrics.ServerTimingMiddleware'
+
+
+def call(app, token, query_string):
+    """Send one recipe list request to a WSGI app and return its status."""
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': PATH,
+        'QUERY_STRING': query_string,
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'localhost',
+        'HTTP_ACCEPT': 'application/json',
+        'HTTP_AUTHORIZATION': f'Token {token}',
+        'wsgi.input': BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.url_scheme': 'http',
+        'wsgi.multithread': False,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    statuses = []
+    result = app(environ, lambda status, headers, *args: statuses.append(
+        int(status.split()[0])
+    ))
+    try:
+        b''.join(result)
+    finally:
+        result.close()
+    return statuses[0]
+
+
+class Command(BaseCommand):
+    """Django command to compare requests with and without timings."""
+    help = (
+        'Send uncached recipe list requests with and without the '
+        'Server-Timing middleware and query wrapper, and report the '
+        'median overhead per request.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=300)
+        parser.add_argument(
+            '--rounds',
+            type=int,
+            default=5,
+            help='Alternating rounds of requests per configuration.',
+        )
+        parser.add_argument('--recipes', type=int, default=20)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        user = get_user_model().objects.create_user(
+            'instrumentation-benchmark@example.com',
+        )
+        try:
+            token = Token.objects.create(user=user).key
+            Recipe.objects.bulk_create(
+                Recipe(user=user, title=f'Recipe {index}', price=Decimal(1))
+                for index in range(options['recipes'])
+            )
+            plain = [m for m in settings.MIDDLEWARE if m != MIDDLEWARE]
+            with override_settings(MIDDLEWARE=[MIDDLEWARE, *plain]):
+                instrumented = WSGIHandler()
+            with override_settings(MIDDLEWARE=plain):
+                uninstrumented = WSGIHandler()
+
+            timings = {True: [], False: []}
+            sequence = 0
+            for _ in range(options['rounds']):
+                for enabled, app in (
+                    (True, instrumented),
+                    (False, uninstrumented),
+                ):
+                    self._set_query_wrapper(enabled)
+                    start = time.perf_counter()
+                    for _ in range(options['requests']):
+                        sequence += 1
+                        # A new query string misses the response cache.
+                        status = call(app, token, f'n={sequence}')
+                        if status != 200:
+                            raise CommandError(f'{PATH} answered {status}')
+                    timings[enabled].append(
+                        (time.perf_counter() - start) / options['requests']
+                    )
+        finally:
+            self._set_query_wrapper(True)
+            user.delete()
+
+        with_timings = statistics.median(timings[True])
+        without = statistics.median(timings[False])
+        overhead = with_timings - without
+        self.stdout.write(
+            f'with instrumentation {with_timings * 1e6:.0f}us/request, '
+            f'without {without * 1e6:.0f}us/request, '
+            f'overhead {overhead * 1e6:.0f}us '
+            f'({overhead / without:.1%})'
+        )
+
+    def _set_query_wrapper(self, enabled):
+        """Add or remove the query timing wrapper, now and on reconnects."""
+        if enabled:
+            connection_created.connect(metrics.install_query_wrapper)
+            metrics.install_query_wrapper(None, connection)
+        else:
+            connection_created.disconnect(metrics.install_query_wrapper)
+            if metrics.record_query in connection.execute_wrappers:
+                connection.execute_wrappers.remove(metrics.record_query)
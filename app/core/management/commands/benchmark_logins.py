@@ -0,0 +1,170 @@
+"""
+Django command to benchmark logins against latency of the rest of the API
+"""
+import statistics
+import sys
+import threading
+import time
+from decimal import Decimal
+from io import BytesIO
+from urllib.parse import urlencode
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from rest_framework.authtoken.models import Token
+
+from core.benchmarking import percentile
+from core.models import Recipe
+from user.views import CreateTokenView
+
+
+EMAIL_DOMAIN = 'login-benchmark.example.com'
+PASSWORD = 'benchmark-pass'
+
+
+def call(app, method, path, body=b'', **headers):
+    """Send one request to a WSGI app and return its status code."""
+    environ = {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'localhost',
+        'HTTP_ACCEPT': 'application/json',
+        'CONTENT_TYPE': 'application/x-www-form-urlencoded',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.url_scheme': 'http',
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+        **headers,
+    }
+    statuses = []
+    result = app(environ, lambda status, headers, *args: statuses.append(
+        int(status.split()[0])
+    ))
+    try:
+        b''.join(result)
+    finally:
+        result.close()
+    return statuses[0]
+
+
+class Command(BaseCommand):
+    """Django command to measure login throughput under read traffic."""
+    help = (
+        'Run login clients next to recipe list readers and report logins '
+        'per second and reader latency. Login throttles are disabled.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--login-clients',
+            default='0,4,16,64',
+            help='Comma separated numbers of concurrent login clients.',
+        )
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=5,
+            help='Seconds to run each level.',
+        )
+        parser.add_argument('--users', type=int, default=20)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        User = get_user_model()
+        throttle_classes = CreateTokenView.throttle_classes
+        CreateTokenView.throttle_classes = []
+        try:
+            reader = User.objects.create_user(f'reader@{EMAIL_DOMAIN}')
+            token = Token.objects.create(user=reader).key
+            Recipe.objects.bulk_create(
+                Recipe(user=reader, title=f'Recipe {index}', price=Decimal(1))
+                for index in range(50)
+            )
+            encoded = make_password(PASSWORD)
+            emails = [
+                f'user{index}@{EMAIL_DOMAIN}'
+                for index in range(options['users'])
+            ]
+            User.objects.bulk_create(
+                User(email=email, password=encoded) for email in emails
+            )
+
+            app = WSGIHandler()
+            for clients in options['login_clients'].split(','):
+                self.stdout.write(self._run_level(
+                    app,
+                    token,
+                    emails,
+                    int(clients),
+                    options['readers'],
+                    options['duration'],
+                ))
+        finally:
+            CreateTokenView.throttle_classes = throttle_classes
+            User.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}').delete()
+
+    def _run_level(self, app, token, emails, clients, readers, duration):
+        """Run one load level and return its report line."""
+        stop = threading.Event()
+        lock = threading.Lock()
+        logins = []
+        reads = []
+
+        def login(index):
+            while not stop.is_set():
+                body = urlencode({
+                    'email': emails[index % len(emails)],
+                    'password': PASSWORD,
+                }).encode()
+                status = call(app, 'POST', '/api/user/token/', body)
+                with lock:
+                    logins.append(status)
+                index += clients
+
+        def read():
+            while not stop.is_set():
+                start = time.perf_counter()
+                call(
+                    app, 'GET', '/api/recipe/recipes/',
+                    HTTP_AUTHORIZATION=f'Token {token}',
+                )
+                with lock:
+                    reads.append(time.perf_counter() - start)
+
+        threads = [
+            threading.Thread(target=login, args=(index,))
+            for index in range(clients)
+        ] + [threading.Thread(target=read) for _ in range(readers)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        reads.sort()
+        succeeded = logins.count(200)
+        refused = logins.count(503)
+        if reads:
+            latency = (
+                f'reads p50 {statistics.median(reads) * 1000:.1f}ms '
+                f'p99 {percentile(reads, 0.99) * 1000:.1f}ms'
+            )
+        else:
+            latency = 'no reads'
+        return (
+            f'{clients} login clients: {succeeded / elapsed:.1f} logins/s, '
+            f'{refused} refused, {latency}'
+        )
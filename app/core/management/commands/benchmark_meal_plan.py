@@ -0,0 +1,63 @@
+"""
+Django command to benchmark meal plan generation across catalog sizes
+"""
+import statistics
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from core import seeding
+from core.benchmarking import percentile
+from recipe import meal_plan
+
+
+class Command(BaseCommand):
+    """Django command to time meal plans for growing recipe catalogs."""
+    help = (
+        'Seed recipe catalogs in a rolled back transaction and report meal '
+        'plan latency percentiles per catalog size.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            default='1000,10000,100000',
+            help='Comma separated catalog sizes.',
+        )
+        parser.add_argument('--days', type=int, default=7)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        sizes = sorted(int(size) for size in options['sizes'].split(','))
+        with transaction.atomic():
+            for size in sizes:
+                seeded = seeding.generate(1, size, seed=options['seed'])
+                user = get_user_model().objects.get(pk=seeded.users[0])
+                if connection.vendor == 'postgresql':
+                    with connection.cursor() as cursor:
+                        cursor.execute('ANALYZE core_recipe')
+
+                timings = []
+                for repeat in range(options['repeat']):
+                    start = time.perf_counter()
+                    meal_plan.generate(
+                        user,
+                        2000,
+                        days=options['days'],
+                        budget=Decimal('40'),
+                        max_time=90,
+                        seed=repeat,
+                    )
+                    timings.append((time.perf_counter() - start) * 1000)
+                timings.sort()
+                self.stdout.write(
+                    f'{size} recipes: p50 {statistics.median(timings):.1f}ms '
+                    f'p95 {percentile(timings, 0.95):.1f}ms'
+                )
+
+            transaction.set_rollback(True)
@@ -0,0 +1,77 @@
+"""
+Django command to compare payload size and encode time per renderer
+"""
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from core.renderers import MessagePackRenderer, ORJSONRenderer
+
+
+WORDS = ['basil', 'chicken', 'curry', 'garlic', 'lemon', 'rice', 'tofu']
+
+
+def recipe_page(recipes, rng):
+    """Return a recipe list page shaped like the API's responses."""
+    def named(count):
+        return [
+            {'id': rng.randint(1, 10 ** 6), 'name': rng.choice(WORDS)}
+            for _ in range(count)
+        ]
+
+    return {
+        'next': 'http://localhost/api/recipe/recipes/?cursor=cD0xMjM0',
+        'previous': None,
+        'results': [
+            {
+                'id': index,
+                'title': ' '.join(rng.choices(WORDS, k=3)).capitalize(),
+                'time_minutes': rng.randint(5, 120),
+                'price': f'{rng.randint(100, 3000) / 100:.2f}',
+                'link': '',
+                'tags': named(3),
+                'ingredients': named(6),
+                'calories': rng.randint(100, 1200),
+                'thumbnails': {},
+            }
+            for index in range(recipes)
+        ],
+    }
+
+
+class Command(BaseCommand):
+    """Django command to time the stdlib, orjson and MessagePack renderers."""
+    help = (
+        'Render a synthetic recipe list page with each renderer and report '
+        'the payload size and median encode time.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        data = recipe_page(options['recipes'], random.Random(options['seed']))
+        renderers = {
+            'json': JSONRenderer(),
+            'orjson': ORJSONRenderer(),
+            'msgpack': MessagePackRenderer(),
+        }
+        payloads = {}
+        for name, renderer in renderers.items():
+            timings = []
+            for _ in range(options['repeat']):
+                start = time.perf_counter()
+                payloads[name] = renderer.render(data)
+                timings.append(time.perf_counter() - start)
+            self.stdout.write(
+                f'{name}: {len(payloads[name])} bytes, '
+                f'{statistics.median(timings) * 1000:.2f}ms'
+            )
+        if payloads['json'] != payloads['orjson']:
+            raise CommandError('orjson output differs from JSONRenderer')
@@ -0,0 +1,62 @@
+"""
+Django command to benchmark recipe search over a seeded corpus
+"""
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from core import seeding
+from core.benchmarking import percentile
+from core.models import Recipe
+from recipe import search
+
+
+QUERIES = ['curry', 'chicken soup', 'garlic -butter', '"green curry"']
+
+
+class Command(BaseCommand):
+    """Django command to time ranked searches over many recipes."""
+    help = (
+        'Seed recipes in a rolled back transaction and report search '
+        'latency percentiles.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000000)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        with transaction.atomic():
+            start = time.perf_counter()
+            seeded = seeding.generate(1, options['rows'], seed=options['seed'])
+            recipes = Recipe.objects.filter(user_id=seeded.users[0])
+            search.update_search_vectors(recipes)
+            self.stdout.write(
+                f'Seeded {options["rows"]} recipes in '
+                f'{time.perf_counter() - start:.1f}s'
+            )
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE core_recipe')
+
+            for terms in QUERIES:
+                queryset = search.search(
+                    recipes,
+                    terms,
+                ).order_by('-rank', '-id')[:50]
+                timings = []
+                for _ in range(options['repeat']):
+                    start = time.perf_counter()
+                    list(queryset.all())
+                    timings.append((time.perf_counter() - start) * 1000)
+                timings.sort()
+                self.stdout.write(
+                    f'{terms!r}: p50 {statistics.median(timings):.1f}ms '
+                    f'p95 {percentile(timings, 0.95):.1f}ms'
+                )
+
+            transaction.set_rollback(True)
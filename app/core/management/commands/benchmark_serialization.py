@@ -0,0 +1,89 @@
+"""
+Django command to compare recipe list serializers with the values() path
+"""
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from core import seeding
+from core.models import Recipe
+from recipe import fastpath, fieldsets, serializers
+
+
+NAMES_PER_USER = 10
+LINKS_PER_RECIPE = 3
+
+
+def render_serializer(queryset):
+    """Render a recipe list through RecipeSerializer."""
+    return JSONRenderer().render(
+        serializers.RecipeSerializer(queryset, many=True).data
+    )
+
+
+def render_fastpath(queryset):
+    """Render a recipe list through the values() fast path."""
+    return JSONRenderer().render(
+        fastpath.serialize(fastpath.rows(queryset))
+    )
+
+
+class Command(BaseCommand):
+    """Django command to time recipe list serialization per list size."""
+    help = (
+        'Seed recipes in a rolled back transaction and report the time to '
+        'query, serialize and render them with RecipeSerializer and with '
+        'the values() fast path.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            default='1000,10000',
+            help='Comma separated list sizes.',
+        )
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        sizes = sorted(int(size) for size in options['sizes'].split(','))
+        with transaction.atomic():
+            for size in sizes:
+                seeded = seeding.generate(
+                    1,
+                    size,
+                    tags_per_user=NAMES_PER_USER,
+                    ingredients_per_user=NAMES_PER_USER,
+                    tags_per_recipe=LINKS_PER_RECIPE,
+                    ingredients_per_recipe=LINKS_PER_RECIPE,
+                    seed=options['seed'],
+                )
+                queryset = fieldsets.narrow(
+                    Recipe.objects.filter(user_id=seeded.users[0]),
+                    None,
+                ).order_by('-id')
+
+                timings = {render_serializer: [], render_fastpath: []}
+                output = {}
+                for _ in range(options['repeat']):
+                    for render in timings:
+                        start = time.perf_counter()
+                        output[render] = render(queryset.all())
+                        timings[render].append(time.perf_counter() - start)
+                if output[render_serializer] != output[render_fastpath]:
+                    raise CommandError(
+                        f'{size} recipes: fast path output differs'
+                    )
+
+                slow = statistics.median(timings[render_serializer])
+                fast = statistics.median(timings[render_fastpath])
+                self.stdout.write(
+                    f'{size} recipes: serializer {slow * 1000:.1f}ms, '
+                    f'fast path {fast * 1000:.1f}ms ({slow / fast:.1f}x)'
+                )
+
+            transaction.set_rollback(True)
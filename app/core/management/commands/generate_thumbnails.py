@@ -0,0 +1,53 @@
+"""
+Django command to render missing recipe image thumbnails
+"""
+import functools
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.models import RecipeImage
+from recipe import images, thumbnails
+
+
+class Command(BaseCommand):
+    """Django command to fill in thumbnails the pipeline never stored."""
+    help = (
+        'Render the thumbnails of recipe images missing any size, e.g. '
+        'after a restart dropped queued work, on the thumbnail pool.'
+    )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        missing = [
+            image for image in RecipeImage.objects.iterator()
+            if set(image.thumbnails) != set(thumbnails.SIZES)
+        ]
+        executor = images.get_executor()
+        # Queue every image on the pool before waiting on any of them.
+        jobs = {}
+        for image in missing:
+            args = (str(settings.MEDIA_ROOT), image.file.name, image.sha256)
+            if executor is None:
+                jobs[image.sha256] = functools.partial(
+                    thumbnails.render,
+                    *args,
+                )
+            else:
+                future = executor.submit(thumbnails.render, *args)
+                jobs[image.sha256] = future.result
+
+        rendered = failed = 0
+        for sha256, job in jobs.items():
+            try:
+                names = job()
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f'{sha256}: {exc}')
+                continue
+            images.save_thumbnails(sha256, names)
+            rendered += 1
+
+        self.stdout.write(
+            f'Rendered thumbnails of {rendered} images, {failed} failed'
+        )
@@ -0,0 +1,154 @@
+"""
+Django command to check the API querysets are served by indexes
+"""
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connection, transaction
+
+from core import seeding
+from recipe.urls import router
+
+
+# Plan lines flagged per database vendor, with the reason reported.
+PLAN_ISSUES = {
+    'postgresql': [
+        (re.compile(r'Seq Scan on (\w+)'), 'sequential scan on {}'),
+        (re.compile(r'\bSort\b'), 'sort'),
+    ],
+    'sqlite': [
+        (
+            re.compile(r'\bSCAN (?:TABLE )?(\w+)(?!.*USING)'),
+            'sequential scan on {}',
+        ),
+        (re.compile(r'USE TEMP B-TREE FOR ORDER BY'), 'sort'),
+    ],
+}
+
+
+# Query parameters exercising the list filters of each endpoint.
+LIST_FILTERS = {
+    'recipe': {'tags': '0', 'ingredients': '0'},
+    'tag': {'assigned_only': '1'},
+    'ingredient': {'assigned_only': '1'},
+}
+
+
+class AdvisorRequest:
+    """Minimal request used to build viewset querysets.
+
+    Querysets are explained on the primary, where the seed data is, even
+    when the views would read from a replica.
+    """
+    method = 'GET'
+
+    def __init__(self, user, query_params=None):
+        self.user = user
+        self.query_params = query_params or {}
+
+
+def explain(queryset):
+    """Return the query plan for a queryset."""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            # Only fall back to scans and sorts when no index can be used.
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('SET LOCAL enable_sort = off')
+    return queryset.explain()
+
+
+def find_plan_issues(queryset):
+    """Return the problems found in the plan of a queryset."""
+    plan = explain(queryset)
+    issues = []
+    for pattern, reason in PLAN_ISSUES.get(connection.vendor, []):
+        for match in pattern.finditer(plan):
+            issues.append(reason.format(*match.groups()))
+    return issues
+
+
+def endpoint_querysets(user):
+    """Yield (name, queryset) for every queryset the recipe API runs."""
+    for prefix, viewset, basename in router.registry:
+        view = viewset()
+        view.request = AdvisorRequest(user)
+        view.format_kwarg = None
+        view.kwargs = {}
+
+        view.action = 'list'
+        queryset = view.get_queryset().using(DEFAULT_DB_ALIAS)
+        ordering = view.pagination_class.ordering
+        yield f'{basename}-list', queryset.order_by(ordering)[:50]
+
+        if basename in LIST_FILTERS:
+            view.request = AdvisorRequest(user, LIST_FILTERS[basename])
+            queryset = view.get_queryset().using(DEFAULT_DB_ALIAS)
+            yield (
+                f'{basename}-list (filtered)',
+                queryset.order_by(ordering)[:50],
+            )
+            view.request = AdvisorRequest(user)
+
+        view.action = 'retrieve'
+        queryset = view.get_queryset().using(DEFAULT_DB_ALIAS)
+        # get_object() uses QuerySet.get(), which drops the ordering.
+        yield f'{basename}-detail', queryset.filter(pk=0).order_by()
+
+        for lookup in queryset._prefetch_related_lookups:
+            field = queryset.model._meta.get_field(lookup)
+            related = field.related_model.objects.filter(**{
+                f'{field.related_query_name()}__in': [0],
+            })
+            yield f'{basename} ({lookup})', related
+
+
+class Command(BaseCommand):
+    """Django command to flag API queries not served by indexes."""
+    help = (
+        'Run EXPLAIN on the querysets of every recipe endpoint and report '
+        'sequential scans and sorts.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=1000,
+            help='Recipes to seed in a rolled back transaction first.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        problems = {}
+        with transaction.atomic():
+            seeded = seeding.generate(
+                1,
+                options['seed'],
+                tags_per_user=20,
+                ingredients_per_user=20,
+                tags_per_recipe=3,
+                ingredients_per_recipe=3,
+            )
+            user = get_user_model().objects.get(pk=seeded.users[0])
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE')
+
+            for name, queryset in endpoint_querysets(user):
+                issues = find_plan_issues(queryset)
+                if issues:
+                    problems[name] = issues
+                    self.stdout.write(
+                        self.style.WARNING(f'{name}: {", ".join(issues)}')
+                    )
+                else:
+                    self.stdout.write(f'{name}: OK')
+
+            transaction.set_rollback(True)
+
+        if problems:
+            raise CommandError(
+                f'{len(problems)} endpoint queries are not index backed.'
+            )
+        self.stdout.write(self.style.SUCCESS('All endpoint queries indexed.'))
@@ -0,0 +1,368 @@
+"""
+Django command to replay a request mix against the API and report latency
+"""
+import json
+import random
+import re
+import statistics
+import sys
+import threading
+import time
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from django.contrib.auth import get_user_model
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.authtoken.models import Token
+
+from core import seeding
+from core.benchmarking import percentile
+from core.models import Ingredient, Recipe, Tag
+
+
+EMAIL_DOMAIN = 'load-test.example.com'
+
+# Synthetic request mix: weight, method, path template and body. Paths may
+# use {recipe_id}, {tag_id}, {ingredient_id} and {word}, filled in from
+# the requesting user's seeded data.
+SYNTHETIC_MIX = [
+    (30, 'GET', '/api/recipe/recipes/', None),
+    (10, 'GET', '/api/recipe/recipes/?tags={tag_id}', None),
+    (5, 'GET', '/api/recipe/recipes/?search={word}', None),
+    (20, 'GET', '/api/recipe/recipes/{recipe_id}/', None),
+    (10, 'GET', '/api/recipe/tags/', None),
+    (5, 'GET', '/api/recipe/ingredients/?assigned_only=1', None),
+    (5, 'GET', '/api/user/me/', None),
+    (5, 'POST', '/api/recipe/recipes/', {
+        'title': '{word} {word}',
+        'time_minutes': 20,
+        'price': '4.50',
+        'tags': [{'name': '{word}'}],
+    }),
+    (5, 'PATCH', '/api/recipe/recipes/{recipe_id}/', {'title': '{word}'}),
+    (5, 'GET', '/api/recipe/stats/', None),
+]
+
+PLACEHOLDER = re.compile(r'\{(recipe_id|tag_id|ingredient_id|word)\}')
+
+SERVER_TIMING_QUERIES = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+
+def call(app, method, path, token, body=None):
+    """Send one request to a WSGI app and return its status and headers."""
+    url = urlsplit(path)
+    content = json.dumps(body).encode() if body is not None else b''
+    environ = {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': url.path,
+        'QUERY_STRING': url.query,
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'localhost',
+        'HTTP_ACCEPT': 'application/json',
+        'HTTP_AUTHORIZATION': f'Token {token}',
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(content)),
+        'wsgi.input': BytesIO(content),
+        'wsgi.errors': sys.stderr,
+        'wsgi.url_scheme': 'http',
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    started = []
+    result = app(environ, lambda status, headers, *args: started.append(
+        (int(status.split()[0]), dict(headers))
+    ))
+    try:
+        b''.join(result)
+    finally:
+        result.close()
+    return started[0]
+
+
+def read_mix(path):
+    """Return the weighted request mix recorded in an NDJSON file."""
+    mix = []
+    with open(path) as lines:
+        for number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+                mix.append((
+                    entry.get('weight', 1),
+                    entry['method'].upper(),
+                    entry['path'],
+                    entry.get('body'),
+                ))
+            except (ValueError, KeyError, AttributeError) as exc:
+                raise CommandError(f'{path}:{number}: invalid entry {exc}')
+    if not mix:
+        raise CommandError(f'{path} has no requests.')
+    return mix
+
+
+def fill(template, data, rng):
+    """Replace the placeholders of a path or body with seeded values."""
+    if isinstance(template, dict):
+        return {key: fill(value, data, rng) for key, value in template.items()}
+    if isinstance(template, list):
+        return [fill(value, data, rng) for value in template]
+    if not isinstance(template, str):
+        return template
+    return PLACEHOLDER.sub(
+        lambda match: str(rng.choice(data[match.group(1)])),
+        template,
+    )
+
+
+class Command(BaseCommand):
+    """Django command to load test the API with a weighted request mix."""
+    help = (
+        'Seed users with recipes, tags and ingredients, replay a synthetic '
+        'or recorded request mix on concurrent workers, and report '
+        'throughput, latency percentiles and queries per endpoint. '
+        'Results can be saved and compared against a baseline run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument(
+            '--recipes',
+            type=int,
+            default=200,
+            help='Recipes seeded per user.',
+        )
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--replay',
+            help='NDJSON file of {"method", "path", "body", "weight"} '
+                 'entries to replay instead of the synthetic mix.',
+        )
+        parser.add_argument('--output', help='Write the results as JSON.')
+        parser.add_argument(
+            '--baseline',
+            help='Results JSON of an earlier run to compare against.',
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.2,
+            help='Relative p95 increase reported as a regression.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        rng = random.Random(options['seed'])
+        if options['replay']:
+            mix = read_mix(options['replay'])
+        else:
+            mix = SYNTHETIC_MIX
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline']) as baseline_file:
+                baseline = json.load(baseline_file)
+
+        try:
+            start = time.perf_counter()
+            users = self._seed(
+                options['users'],
+                options['recipes'],
+                options['seed'],
+            )
+            self.stdout.write(
+                f'Seeded {options["users"]} users with '
+                f'{options["recipes"]} recipes each in '
+                f'{time.perf_counter() - start:.1f}s'
+            )
+            plan = [
+                self._plan_request(mix, users, rng)
+                for _ in range(options['requests'])
+            ]
+            samples, elapsed = self._replay(plan, options['concurrency'])
+        finally:
+            get_user_model().objects.filter(
+                email__endswith=f'@{EMAIL_DOMAIN}',
+            ).delete()
+
+        results = self._summarise(samples, elapsed)
+        self._report(results)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2)
+        if baseline is not None:
+            regressions = self._compare(
+                baseline,
+                results,
+                options['threshold'],
+            )
+            if regressions:
+                raise CommandError(
+                    f'{regressions} endpoints regressed against '
+                    f'{options["baseline"]}.'
+                )
+
+    def _seed(self, users, recipes, seed):
+        """Create users with tokens and recipes, return their seeded ids."""
+        seeded = seeding.generate(
+            users,
+            recipes,
+            tags_per_user=10,
+            ingredients_per_user=20,
+            tags_per_recipe=3,
+            ingredients_per_recipe=6,
+            seed=seed,
+            email_domain=EMAIL_DOMAIN,
+        )
+        # Keep search and similarity current, as uploads through the API do.
+        seeding.index(seeded.recipes)
+        tokens = Token.objects.bulk_create(
+            Token(user_id=user_id, key=Token.generate_key())
+            for user_id in seeded.users
+        )
+        return [
+            (token.key, {
+                'recipe_id': list(Recipe.objects.filter(
+                    user_id=token.user_id,
+                ).values_list('id', flat=True)),
+                'tag_id': list(Tag.objects.filter(
+                    user_id=token.user_id,
+                ).values_list('id', flat=True)),
+                'ingredient_id': list(Ingredient.objects.filter(
+                    user_id=token.user_id,
+                ).values_list('id', flat=True)),
+                'word': seeding.WORDS,
+            })
+            for token in tokens
+        ]
+
+    def _plan_request(self, mix, users, rng):
+        """Return one (endpoint, method, path, token, body) to send."""
+        weight, method, template, body = rng.choices(
+            mix,
+            weights=[entry[0] for entry in mix],
+        )[0]
+        token, data = rng.choice(users)
+        return (
+            f'{method} {template}',
+            method,
+            fill(template, data, rng),
+            token,
+            fill(body, data, rng),
+        )
+
+    def _replay(self, plan, concurrency):
+        """Send the planned requests on concurrent workers."""
+        app = WSGIHandler()
+        samples = []
+        lock = threading.Lock()
+        pending = iter(plan)
+
+        def worker():
+            while True:
+                with lock:
+                    request = next(pending, None)
+                if request is None:
+                    return
+                endpoint, method, path, token, body = request
+                start = time.perf_counter()
+                status, headers = call(app, method, path, token, body)
+                duration = time.perf_counter() - start
+                match = SERVER_TIMING_QUERIES.search(
+                    headers.get('Server-Timing', ''),
+                )
+                queries = int(match.group(1)) if match else None
+                with lock:
+                    samples.append((endpoint, status, duration, queries))
+
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return samples, time.perf_counter() - start
+
+    def _summarise(self, samples, elapsed):
+        """Return throughput and per-endpoint latency and query stats."""
+        endpoints = {}
+        for endpoint in sorted({sample[0] for sample in samples}):
+            matching = [sample for sample in samples if sample[0] == endpoint]
+            timings = sorted(sample[2] for sample in matching)
+            queries = [
+                sample[3] for sample in matching if sample[3] is not None
+            ]
+            endpoints[endpoint] = {
+                'requests': len(matching),
+                'errors': sum(sample[1] >= 400 for sample in matching),
+                'p50_ms': percentile(timings, 0.5) * 1000,
+                'p95_ms': percentile(timings, 0.95) * 1000,
+                'p99_ms': percentile(timings, 0.99) * 1000,
+                'queries': statistics.mean(queries) if queries else None,
+            }
+        timings = sorted(sample[2] for sample in samples)
+        return {
+            'requests': len(samples),
+            'throughput': len(samples) / elapsed,
+            'p50_ms': percentile(timings, 0.5) * 1000,
+            'p95_ms': percentile(timings, 0.95) * 1000,
+            'p99_ms': percentile(timings, 0.99) * 1000,
+            'endpoints': endpoints,
+        }
+
+    def _report(self, results):
+        """Write the results as a table."""
+        self.stdout.write(
+            f'{results["requests"]} requests, '
+            f'{results["throughput"]:.0f} req/s, '
+            f'p50 {results["p50_ms"]:.1f}ms p95 {results["p95_ms"]:.1f}ms '
+            f'p99 {results["p99_ms"]:.1f}ms'
+        )
+        for endpoint, stats in results['endpoints'].items():
+            queries = stats['queries']
+            self.stdout.write(
+                f'  {endpoint}: {stats["requests"]} requests, '
+                f'{stats["errors"]} errors, p50 {stats["p50_ms"]:.1f}ms '
+                f'p95 {stats["p95_ms"]:.1f}ms p99 {stats["p99_ms"]:.1f}ms, '
+                + (
+                    f'{queries:.1f} queries' if queries is not None
+                    else 'queries unknown'
+                )
+            )
+
+    def _compare(self, baseline, results, threshold):
+        """Report endpoints slower or querying more than the baseline."""
+        regressions = 0
+        for endpoint, stats in results['endpoints'].items():
+            before = baseline.get('endpoints', {}).get(endpoint)
+            if before is None:
+                continue
+            problems = []
+            if stats['p95_ms'] > before['p95_ms'] * (1 + threshold):
+                problems.append(
+                    f'p95 {before["p95_ms"]:.1f}ms -> {stats["p95_ms"]:.1f}ms'
+                )
+            if (
+                stats['queries'] is not None
+                and before['queries'] is not None
+                and stats['queries'] > before['queries'] + 0.5
+            ):
+                problems.append(
+                    f'queries {before["queries"]:.1f} -> '
+                    f'{stats["queries"]:.1f}'
+                )
+            if problems:
+                regressions += 1
+                self.stdout.write(self.style.WARNING(
+                    f'{endpoint} regressed: {", ".join(problems)}'
+                ))
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS(
+                'No regressions against the baseline.'
+            ))
+        return regressions
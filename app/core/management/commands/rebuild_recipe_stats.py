@@ -0,0 +1,96 @@
+"""
+Django command to rebuild per-user recipe stats from the recipes
+"""
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from core.models import Recipe, RecipeStats
+from recipe import stats
+
+
+BATCH_SIZE = 1000
+
+COUNTER_FIELDS = [
+    field.attname for field in RecipeStats._meta.concrete_fields
+    if not field.primary_key
+]
+
+
+class Command(BaseCommand):
+    """Django command to recompute recipe stats and fix any drift."""
+    help = (
+        'Recompute every user\'s recipe stats in bulk and repair rows '
+        'that drifted from their recipes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drifted rows without changing them.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        with transaction.atomic():
+            # Lock the stats before reading the recipes. Recipe writes
+            # committing meanwhile then wait and apply their deltas on top
+            # of the rebuilt rows instead of being overwritten by them.
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f'LOCK TABLE {RecipeStats._meta.db_table} '
+                        'IN EXCLUSIVE MODE'
+                    )
+            current = RecipeStats.objects.select_for_update().in_bulk()
+            rows = Recipe.objects.values('user').annotate(
+                **stats.stats_annotations()
+            ).order_by()
+            expected = {}
+            for row in rows:
+                user_id = row.pop('user')
+                expected[user_id] = RecipeStats(
+                    user_id=user_id,
+                    **{field: value or 0 for field, value in row.items()},
+                )
+
+            changed = [
+                row for user_id, row in expected.items()
+                if user_id in current
+                and _values(row) != _values(current[user_id])
+            ]
+            missing = [
+                row for user_id, row in expected.items()
+                if user_id not in current
+            ]
+            stale = [
+                user_id for user_id, row in current.items()
+                if user_id not in expected
+                and _values(row) != _values(RecipeStats())
+            ]
+            self.stdout.write(
+                f'{len(changed)} drifted, {len(missing)} missing and '
+                f'{len(stale)} stale stats rows'
+            )
+            if options['dry_run']:
+                return
+
+            RecipeStats.objects.bulk_update(
+                changed,
+                COUNTER_FIELDS,
+                batch_size=BATCH_SIZE,
+            )
+            RecipeStats.objects.bulk_create(
+                missing,
+                batch_size=BATCH_SIZE,
+                ignore_conflicts=True,
+            )
+            RecipeStats.objects.filter(user_id__in=stale).update(
+                **{field: 0 for field in COUNTER_FIELDS}
+            )
+        self.stdout.write(self.style.SUCCESS('Recipe stats rebuilt'))
+
+
+def _values(row):
+    """Return the counters of a stats row for comparison."""
+    return [getattr(row, field) for field in COUNTER_FIELDS]
@@ -0,0 +1,32 @@
+"""
+Django command to rebuild the recipe similarity index
+"""
+from django.core.management.base import BaseCommand
+
+from core.models import Recipe
+from recipe import similarity
+
+
+class Command(BaseCommand):
+    """Django command to recompute every recipe's similarity index rows."""
+    help = (
+        'Rebuild the MinHash signatures and LSH buckets of all recipes and '
+        'report the stored bytes per indexed recipe.'
+    )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        ids = Recipe.objects.order_by('id').values_list('id', flat=True)
+        batch = []
+        for recipe_id in ids.iterator(chunk_size=similarity.BATCH_SIZE):
+            batch.append(recipe_id)
+            if len(batch) == similarity.BATCH_SIZE:
+                similarity.update_index(batch)
+                batch = []
+        if batch:
+            similarity.update_index(batch)
+
+        count, per_recipe = similarity.index_size()
+        self.stdout.write(
+            f'Indexed {count} recipes, {per_recipe:.0f} bytes per recipe'
+        )
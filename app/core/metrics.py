@@ -0,0 +1,213 @@
+"""
+Per-request timings, Server-Timing headers and Prometheus histograms.
+
+ServerTimingMiddleware times each request and splits out the time spent
+in SQL (with the query count), in serializers and in rendering. Only
+serializers using TimedSerializerMixin, and work the views pass to
+timed('serialize', ...), count as serializer time. The
+split is sent back in a Server-Timing header and added to per-view
+histograms, which /metrics serves in the Prometheus text format. The
+histograms are per process; scrape each worker.
+"""
+import bisect
+import contextvars
+import threading
+import time
+
+from django.conf import settings
+from django.utils.deprecation import MiddlewareMixin
+
+
+# Histogram bucket upper bounds, per metric.
+SECONDS_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5,
+)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# Metric name -> (help text, buckets, RequestTimings attribute).
+METRICS = {
+    'request_duration_seconds': (
+        'Time spent handling requests.', SECONDS_BUCKETS, 'total',
+    ),
+    'request_db_seconds': (
+        'Time spent in SQL queries.', SECONDS_BUCKETS, 'db',
+    ),
+    'request_serialize_seconds': (
+        'Time spent in serializers.', SECONDS_BUCKETS, 'serialize',
+    ),
+    'request_render_seconds': (
+        'Time spent rendering responses.', SECONDS_BUCKETS, 'render',
+    ),
+    'request_queries': (
+        'SQL queries run per request.', QUERY_BUCKETS, 'queries',
+    ),
+}
+
+_current = contextvars.ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """Durations accumulated while handling one request."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.total = 0.0
+        self.db = 0.0
+        self.serialize = 0.0
+        self.render = 0.0
+        self.queries = 0
+        self._timing = set()
+
+    def finish(self):
+        self.total = time.perf_counter() - self.start
+
+    def header(self):
+        """Return the Server-Timing header value, in milliseconds."""
+        return ', '.join([
+            f'db;dur={self.db * 1000:.2f};desc="{self.queries} queries"',
+            f'serialize;dur={self.serialize * 1000:.2f}',
+            f'render;dur={self.render * 1000:.2f}',
+            f'total;dur={self.total * 1000:.2f}',
+        ])
+
+
+def timed(phase, func, *args, **kwargs):
+    """Call func, adding its duration to phase of the current request.
+
+    Nested calls for the same phase are only counted once.
+    """
+    timings = _current.get()
+    if timings is None or phase in timings._timing:
+        return func(*args, **kwargs)
+    timings._timing.add(phase)
+    start = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        setattr(
+            timings,
+            phase,
+            getattr(timings, phase) + time.perf_counter() - start,
+        )
+        timings._timing.discard(phase)
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper counting and timing queries."""
+    timings = _current.get()
+    if timings is not None:
+        timings.queries += 1
+    return timed('db', execute, sql, params, many, context)
+
+
+def install_query_wrapper(sender, connection, **kwargs):
+    """connection_created receiver adding record_query to a connection."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class TimedSerializerMixin:
+    """Serializer mixin adding to_representation to the serialize time."""
+
+    def to_representation(self, instance):
+        return timed('serialize', super().to_representation, instance)
+
+
+class Histogram:
+    """Cumulative histogram in the Prometheus style."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    """Histograms of every metric, per view and method."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def observe(self, view, method, timings):
+        with self._lock:
+            for name, (_, buckets, attribute) in METRICS.items():
+                histogram = self._histograms.get((name, view, method))
+                if histogram is None:
+                    histogram = Histogram(buckets)
+                    self._histograms[(name, view, method)] = histogram
+                histogram.observe(getattr(timings, attribute))
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def render(self):
+        """Return every histogram in the Prometheus text format."""
+        lines = []
+        with self._lock:
+            for name, (help_text, buckets, _) in METRICS.items():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} histogram')
+                for (metric, view, method), histogram in sorted(
+                    self._histograms.items()
+                ):
+                    if metric != name:
+                        continue
+                    labels = f'view="{view}",method="{method}"'
+                    cumulative = 0
+                    bounds = [f'{bound:g}' for bound in buckets] + ['+Inf']
+                    for bound, count in zip(bounds, histogram.counts):
+                        cumulative += count
+                        lines.append(
+                            f'{name}_bucket{{{labels},le="{bound}"}} '
+                            f'{cumulative}'
+                        )
+                    lines.append(f'{name}_sum{{{labels}}} {histogram.sum:g}')
+                    lines.append(
+                        f'{name}_count{{{labels}}} {histogram.count}'
+                    )
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+class ServerTimingMiddleware(MiddlewareMixin):
+    """Time requests, report them in Server-Timing and the registry."""
+
+    def process_request(self, request):
+        request.timings = RequestTimings()
+        _current.set(request.timings)
+
+    def process_template_response(self, request, response):
+        timings = getattr(request, 'timings', None)
+        if timings is None or response.is_rendered:
+            return response
+        start = time.perf_counter()
+
+        def rendered(response):
+            timings.render += time.perf_counter() - start
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def process_response(self, request, response):
+        timings = getattr(request, 'timings', None)
+        if timings is None:
+            return response
+        timings.finish()
+        _current.set(None)
+
+        match = request.resolver_match
+        if match is not None:
+            registry.observe(match.view_name, request.method, timings)
+        if settings.SERVER_TIMING:
+            response['Server-Timing'] = timings.header()
+        return response
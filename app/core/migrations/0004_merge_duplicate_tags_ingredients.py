@@ -0,0 +1,47 @@
+# Generated by Django 3.2.25 on 2026-10-17 19:14
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def merge_duplicates(apps, schema_editor):
+    """Merge tags and ingredients sharing a name for the same user."""
+    Recipe = apps.get_model('core', 'Recipe')
+    for model_name, field in (('Tag', 'tags'), ('Ingredient', 'ingredients')):
+        model = apps.get_model('core', model_name)
+        through = getattr(Recipe, field).through
+        target = f'{model_name.lower()}_id'
+        dupes = (
+            model.objects.values('user', 'name')
+            .annotate(keep=Min('id'), total=Count('id'))
+            .filter(total__gt=1)
+        )
+        for dupe in dupes:
+            others = model.objects.filter(
+                user=dupe['user'],
+                name=dupe['name'],
+            ).exclude(id=dupe['keep'])
+            recipe_ids = set(
+                through.objects.filter(**{f'{target}__in': others})
+                .values_list('recipe_id', flat=True)
+            )
+            linked = set(
+                through.objects.filter(**{target: dupe['keep']})
+                .values_list('recipe_id', flat=True)
+            )
+            through.objects.bulk_create([
+                through(recipe_id=recipe_id, **{target: dupe['keep']})
+                for recipe_id in recipe_ids - linked
+            ])
+            others.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_auto_20240621_1611'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 3.2.25 on 2026-10-17 19:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_recipe_search_vector_gin'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='recipe_stats', serialize=False, to='core.user')),
+                ('recipe_count', models.PositiveIntegerField(default=0)),
+                ('calories_count', models.PositiveIntegerField(default=0)),
+                ('calories_total', models.PositiveBigIntegerField(default=0)),
+                ('time_minutes_count', models.PositiveIntegerField(default=0)),
+                ('time_minutes_total', models.BigIntegerField(default=0)),
+                ('price_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('price_under_5', models.PositiveIntegerField(default=0)),
+                ('price_under_10', models.PositiveIntegerField(default=0)),
+                ('price_under_20', models.PositiveIntegerField(default=0)),
+                ('price_20_and_over', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
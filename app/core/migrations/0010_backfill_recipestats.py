@@ -0,0 +1,52 @@
+from django.db import migrations
+from django.db.models import Count, Q, Sum
+
+
+PRICE_BUCKETS = {
+    'price_under_5': Q(price__lt=5),
+    'price_under_10': Q(price__gte=5, price__lt=10),
+    'price_under_20': Q(price__gte=10, price__lt=20),
+    'price_20_and_over': Q(price__gte=20),
+}
+
+
+def backfill_recipe_stats(apps, schema_editor):
+    """Compute a stats row for every user owning recipes."""
+    Recipe = apps.get_model('core', 'Recipe')
+    RecipeStats = apps.get_model('core', 'RecipeStats')
+    rows = Recipe.objects.values('user').annotate(
+        recipe_count=Count('id'),
+        calories_count=Count('calories'),
+        calories_total=Sum('calories'),
+        time_minutes_count=Count('time_minutes'),
+        time_minutes_total=Sum('time_minutes'),
+        price_total=Sum('price'),
+        **{
+            field: Count('id', filter=condition)
+            for field, condition in PRICE_BUCKETS.items()
+        },
+    ).order_by()
+    RecipeStats.objects.bulk_create(
+        (
+            RecipeStats(
+                user_id=row.pop('user'),
+                **{field: value or 0 for field, value in row.items()},
+            )
+            for row in rows.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_recipestats'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            backfill_recipe_stats,
+            migrations.RunPython.noop,
+        ),
+    ]
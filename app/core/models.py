@@ -2,6 +2,7 @@
 Database models.
 """
 from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.contrib.auth.models import (
     AbstractBaseUser,
@@ -33,6 +34,32 @@ class UserManager(BaseUserManager):
         return user
 
 
+class RecipeAttrManager(models.Manager):
+    """Manager for user owned, uniquely named recipe attributes."""
+
+    def get_or_create_named(self, user, names):
+        """Return a name to object map, creating missing names in bulk."""
+        names = list(dict.fromkeys(names))
+        if not names:
+            return {}
+
+        objs = {
+            obj.name: obj
+            for obj in self.filter(user=user, name__in=names)
+        }
+        missing = [name for name in names if name not in objs]
+        if missing:
+            self.bulk_create(
+                [self.model(user=user, name=name) for name in missing],
+                ignore_conflicts=True,
+            )
+            objs.update(
+                (obj.name, obj)
+                for obj in self.filter(user=user, name__in=missing)
+            )
+        return objs
+
+
 class User(AbstractBaseUser, PermissionsMixin):
     """User in the system."""
     email = models.EmailField(max_length=255, unique=True)
@@ -48,6 +75,20 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = 'email'
 
 
+class RecipeImage(models.Model):
+    """Uploaded image stored once per distinct content."""
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    file = models.ImageField(max_length=255)
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    # Thumbnail label -> storage name, filled in once generated.
+    thumbnails = models.JSONField(default=dict, blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.sha256
+
+
 class Recipe(models.Model):
     """Recipe object."""
     user = models.ForeignKey(
@@ -62,11 +103,61 @@ class Recipe(models.Model):
     link = models.CharField(max_length=255, blank=True)
     tags = models.ManyToManyField('Tag')
     ingredients = models.ManyToManyField('Ingredient')
+    search_vector = SearchVectorField(null=True, editable=False)
+    image = models.ForeignKey(
+        RecipeImage,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='recipes',
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['user', '-id'],
+                name='recipe_user_id_desc_idx',
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the loaded values, so saves can compute deltas."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
 
     def __str__(self):
         return self.title
 
 
+class RecipeStats(models.Model):
+    """Running totals over a user's recipes, updated by deltas."""
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='recipe_stats',
+    )
+    recipe_count = models.PositiveIntegerField(default=0)
+    calories_count = models.PositiveIntegerField(default=0)
+    calories_total = models.PositiveBigIntegerField(default=0)
+    time_minutes_count = models.PositiveIntegerField(default=0)
+    time_minutes_total = models.BigIntegerField(default=0)
+    price_total = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+    )
+    price_under_5 = models.PositiveIntegerField(default=0)
+    price_under_10 = models.PositiveIntegerField(default=0)
+    price_under_20 = models.PositiveIntegerField(default=0)
+    price_20_and_over = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f'Recipe stats for {self.user_id}'
+
+
 class Tag(models.Model):
     """Tag for filtering recipes."""
     name = models.CharField(max_length=255)
@@ -75,6 +166,16 @@ class Tag(models.Model):
         on_delete=models.CASCADE,
     )
 
+    objects = RecipeAttrManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'name'],
+                name='unique_tag_name_per_user',
+            ),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -87,5 +188,54 @@ class Ingredient(models.Model):
         on_delete=models.CASCADE,
     )
 
+    objects = RecipeAttrManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'name'],
+                name='unique_ingredient_name_per_user',
+            ),
+        ]
+
     def __str__(self):
         return self.name
+
+
+class RecipeSignature(models.Model):
+    """MinHash signature of a recipe's tags and ingredients."""
+    recipe = models.OneToOneField(
+        Recipe,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='signature',
+    )
+    signature = models.BinaryField()
+
+    def __str__(self):
+        return f'Signature for {self.recipe_id}'
+
+
+class SimilarityBucket(models.Model):
+    """LSH bucket of one band of a recipe signature."""
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='similarity_buckets',
+    )
+    bucket = models.BigIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['user', 'bucket'],
+                name='similarity_user_bucket_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'Bucket {self.bucket} for {self.recipe_id}'
@@ -0,0 +1,65 @@
+"""
+Database routing between the primary and read replicas.
+
+Writes, migrations and unrouted reads use the primary. Views opt their
+safe-method querysets into the replicas with read_alias(). A user who
+has just written is pinned to the primary for REPLICA_PIN_SECONDS so
+they never read data older than their own write.
+"""
+import random
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+from rest_framework.permissions import SAFE_METHODS
+
+
+def pin_key(user_id):
+    """Return the cache key marking a user as pinned to the primary."""
+    return f'replica-pin:{user_id}'
+
+
+def pin(user_id):
+    """Send a user's reads to the primary until replicas have caught up."""
+    cache.set(pin_key(user_id), True, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned(user_id):
+    """Return whether a user's reads must use the primary."""
+    return cache.get(pin_key(user_id), False)
+
+
+def read_alias(request):
+    """Return the database alias to run a request's queryset on."""
+    replicas = settings.DATABASE_REPLICAS
+    if (
+        not replicas
+        or request.method not in SAFE_METHODS
+        or is_pinned(request.user.pk)
+    ):
+        return DEFAULT_DB_ALIAS
+    return random.choice(replicas)
+
+
+class PrimaryReplicaRouter:
+    """Route writes to the primary and keep replicas out of migrations.
+
+    Reads are left to Django, which uses the database of a related
+    instance (so prefetches follow a replica read) or else the primary.
+    """
+
+    def db_for_write(self, model, **hints):
+        # Objects read from a replica are saved to the primary too.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
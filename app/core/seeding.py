@@ -0,0 +1,245 @@
+"""
+Deterministic synthetic users, recipes, tags and ingredients.
+
+generate() buffers rows for every table and writes them in batches, with
+COPY on PostgreSQL and bulk_create elsewhere, assigning primary keys
+itself so links and recipe stats need no lookups. It backs the `seed`
+command and the seeding of the benchmark and load test commands, which
+share its WORDS vocabulary.
+"""
+import io
+import random
+from collections import namedtuple
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.db.models import Max
+
+from core.models import Ingredient, Recipe, RecipeStats, Tag
+from recipe import search, similarity, stats
+
+
+EMAIL_DOMAIN = 'seed.example.com'
+
+WORDS = [
+    'apple', 'basil', 'bean', 'beef', 'bread', 'broccoli', 'butter',
+    'carrot', 'cheese', 'chicken', 'chili', 'coconut', 'curry', 'egg',
+    'fish', 'garlic', 'ginger', 'honey', 'lamb', 'lemon', 'lentil',
+    'mango', 'mushroom', 'noodle', 'oat', 'onion', 'pasta', 'pepper',
+    'pork', 'potato', 'rice', 'salad', 'salmon', 'soup', 'spinach',
+    'steak', 'stew', 'tofu', 'tomato', 'yogurt',
+]
+
+# Tag and ingredient names are unique per user, so draw them from pairs.
+NAMES = [f'{first} {second}' for first in WORDS for second in WORDS
+         if first != second]
+
+USER_COLUMNS = [
+    'id', 'password', 'last_login', 'is_superuser', 'email', 'name',
+    'is_active', 'is_staff', 'age', 'weight', 'height', 'phone',
+]
+RECIPE_COLUMNS = [
+    'id', 'user_id', 'title', 'description', 'time_minutes', 'calories',
+    'price', 'link',
+]
+STATS_COLUMNS = [field.attname for field in RecipeStats._meta.concrete_fields]
+
+# Characters with a meaning in the COPY text format.
+COPY_ESCAPES = str.maketrans({
+    '\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r',
+})
+
+
+def copy_value(value):
+    """Return a value in the COPY text format."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, str):
+        return value.translate(COPY_ESCAPES)
+    return str(value)
+
+
+def reserve_ids(model, count):
+    """Reserve count consecutive primary keys and return the first one."""
+    if not count:
+        return 0
+    if connection.vendor == 'postgresql':
+        table = model._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT nextval(pg_get_serial_sequence(%s, 'id'))", [table],
+            )
+            start = cursor.fetchone()[0]
+            cursor.execute(
+                "SELECT setval(pg_get_serial_sequence(%s, 'id'), %s)",
+                [table, start + count - 1],
+            )
+        return start
+    # SQLite keeps its AUTOINCREMENT counter above explicit ids.
+    return (model.objects.aggregate(latest=Max('id'))['latest'] or 0) + 1
+
+
+class RowWriter:
+    """Buffer rows for one table and write them in batches."""
+
+    def __init__(self, model, columns):
+        self.model = model
+        self.columns = columns
+        self.rows = []
+        self.written = 0
+
+    def flush(self):
+        if not self.rows:
+            return
+        if connection.vendor == 'postgresql':
+            self._copy()
+        else:
+            self.model.objects.bulk_create([
+                self.model(**dict(zip(self.columns, row)))
+                for row in self.rows
+            ])
+        self.written += len(self.rows)
+        self.rows = []
+
+    def _copy(self):
+        """Stream the buffered rows into the table with COPY."""
+        buffer = io.StringIO()
+        buffer.writelines(
+            '\t'.join(map(copy_value, row)) + '\n' for row in self.rows
+        )
+        buffer.seek(0)
+        quote = connection.ops.quote_name
+        columns = ', '.join(quote(column) for column in self.columns)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f'COPY {quote(self.model._meta.db_table)} ({columns}) '
+                'FROM STDIN',
+                buffer,
+            )
+
+
+# Ids of the generated users and recipes, and rows written per table.
+Seeded = namedtuple('Seeded', ['users', 'recipes', 'rows'])
+
+
+def generate(users, recipes_per_user, tags_per_user=0,
+             ingredients_per_user=0, tags_per_recipe=0,
+             ingredients_per_recipe=0, seed=0, batch_size=100000,
+             password=None, email_domain=EMAIL_DOMAIN):
+    """Generate and write users with their recipes, tags and ingredients.
+
+    Each recipe links tags_per_recipe of its owner's tags and
+    ingredients_per_recipe of their ingredients. The same seed generates
+    the same rows. Returns the new ids as ranges, which stay small at any
+    size.
+    """
+    rng = random.Random(seed)
+    # Hashing once keeps PBKDF2 out of the per-user cost.
+    password = make_password(password)
+
+    user_writer = RowWriter(get_user_model(), USER_COLUMNS)
+    tag_writer = RowWriter(Tag, ['id', 'name', 'user_id'])
+    ingredient_writer = RowWriter(Ingredient, ['id', 'name', 'user_id'])
+    recipe_writer = RowWriter(Recipe, RECIPE_COLUMNS)
+    recipe_tag_writer = RowWriter(
+        Recipe.tags.through, ['recipe_id', 'tag_id'],
+    )
+    recipe_ingredient_writer = RowWriter(
+        Recipe.ingredients.through, ['recipe_id', 'ingredient_id'],
+    )
+    stats_writer = RowWriter(RecipeStats, STATS_COLUMNS)
+    # Parents come before the rows referencing them.
+    writers = [
+        user_writer, tag_writer, ingredient_writer, recipe_writer,
+        recipe_tag_writer, recipe_ingredient_writer, stats_writer,
+    ]
+
+    user_id = first_user = reserve_ids(get_user_model(), users)
+    tag_id = reserve_ids(Tag, users * tags_per_user)
+    ingredient_id = reserve_ids(Ingredient, users * ingredients_per_user)
+    recipe_id = first_recipe = reserve_ids(Recipe, users * recipes_per_user)
+    tag_range = range(tags_per_user)
+    ingredient_range = range(ingredients_per_user)
+
+    for _ in range(users):
+        user_writer.rows.append((
+            user_id, password, None, False,
+            f'seed-{user_id}@{email_domain}',
+            f'{rng.choice(WORDS).title()} {rng.choice(WORDS).title()}',
+            True, False, rng.randint(18, 80), None, None, None,
+        ))
+        for name in rng.sample(NAMES, tags_per_user):
+            tag_writer.rows.append((tag_id, name, user_id))
+            tag_id += 1
+        for name in rng.sample(NAMES, ingredients_per_user):
+            ingredient_writer.rows.append((ingredient_id, name, user_id))
+            ingredient_id += 1
+
+        totals = {field: 0 for field in STATS_COLUMNS[1:]}
+        for _ in range(recipes_per_user):
+            cents = rng.randint(100, 3000)
+            values = {
+                'time_minutes': rng.randint(5, 120),
+                'calories': (
+                    rng.randint(100, 1200) if rng.random() < 0.9
+                    else None
+                ),
+                'price': f'{cents // 100}.{cents % 100:02d}',
+            }
+            recipe_writer.rows.append((
+                recipe_id, user_id,
+                ' '.join(rng.choices(WORDS, k=3)).capitalize(),
+                ' '.join(rng.choices(WORDS, k=12)),
+                values['time_minutes'], values['calories'],
+                values['price'], '',
+            ))
+            # The user's tags and ingredients end at tag_id and
+            # ingredient_id.
+            for index in rng.sample(tag_range, tags_per_recipe):
+                recipe_tag_writer.rows.append(
+                    (recipe_id, tag_id - tags_per_user + index)
+                )
+            for index in rng.sample(
+                ingredient_range, ingredients_per_recipe,
+            ):
+                recipe_ingredient_writer.rows.append((
+                    recipe_id,
+                    ingredient_id - ingredients_per_user + index,
+                ))
+            for field, value in stats.row_delta(values).items():
+                totals[field] += value
+            recipe_id += 1
+        stats_writer.rows.append((user_id, *totals.values()))
+        user_id += 1
+
+        pending = sum(len(writer.rows) for writer in writers)
+        if pending >= batch_size:
+            _flush(writers)
+    _flush(writers)
+    return Seeded(
+        users=range(first_user, user_id),
+        recipes=range(first_recipe, recipe_id),
+        rows={writer.model._meta.db_table: writer.written
+              for writer in writers},
+    )
+
+
+def _flush(writers):
+    """Write every buffered row in one transaction."""
+    with transaction.atomic():
+        for writer in writers:
+            writer.flush()
+
+
+def index(recipe_ids):
+    """Rebuild the search vectors and similarity rows of recipe_ids.
+
+    recipe_ids is a range of ids, as generate() returns.
+    """
+    for offset in range(0, len(recipe_ids), similarity.BATCH_SIZE):
+        batch = recipe_ids[offset:offset + similarity.BATCH_SIZE]
+        search.update_search_vectors(
+            Recipe.objects.filter(id__range=(batch[0], batch[-1]))
+        )
+        similarity.update_index(batch)
@@ -0,0 +1,36 @@
+"""
+Serializers for the core APIs.
+"""
+from django.conf import settings
+
+from rest_framework import serializers
+
+
+class BatchItemSerializer(serializers.Serializer):
+    """Serializer for one sub-request of a batch."""
+    method = serializers.ChoiceField(
+        choices=['GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE'],
+    )
+    path = serializers.RegexField(
+        r'^/',
+        max_length=2000,
+        help_text='Path and query string, e.g. /api/user/me/.',
+    )
+    headers = serializers.DictField(
+        child=serializers.CharField(),
+        required=False,
+    )
+    body = serializers.JSONField(required=False)
+
+
+class BatchSerializer(serializers.Serializer):
+    """Serializer for batch requests."""
+    requests = BatchItemSerializer(many=True, allow_empty=False)
+
+    def validate_requests(self, value):
+        """Enforce the per-batch size limit."""
+        if len(value) > settings.BATCH_MAX_REQUESTS:
+            raise serializers.ValidationError(
+                f'At most {settings.BATCH_MAX_REQUESTS} requests per batch.'
+            )
+        return value
@@ -0,0 +1,88 @@
+"""
+Tests for the async view wrappers.
+"""
+import asyncio
+import threading
+import time
+
+from asgiref.sync import async_to_sync
+
+from django.http import HttpResponse
+from django.test import SimpleTestCase, override_settings
+from django.test.client import RequestFactory
+
+from core import async_views, executors
+
+
+class AsyncViewTests(SimpleTestCase):
+    """Test running sync views on the bounded pool."""
+
+    def setUp(self):
+        executors.shutdown('async-view')
+        self.addCleanup(executors.shutdown, 'async-view')
+        self.request = RequestFactory().get('/')
+
+    @override_settings(ASYNC_VIEW_WORKERS=2)
+    def test_view_runs_on_bounded_pool(self):
+        """Test views run on at most ASYNC_VIEW_WORKERS pool threads."""
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def view(request):
+            with lock:
+                running.append(threading.current_thread().name)
+                peak.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.pop()
+            return HttpResponse(threading.current_thread().name)
+
+        wrapped = async_views.async_view(view)
+
+        async def requests():
+            return await asyncio.gather(*(
+                wrapped(self.request) for _ in range(6)
+            ))
+
+        responses = async_to_sync(requests)()
+
+        self.assertTrue(asyncio.iscoroutinefunction(wrapped))
+        self.assertEqual(max(peak), 2)
+        for response in responses:
+            self.assertTrue(response.content.startswith(b'async-view'))
+
+    @override_settings(ASYNC_VIEW_WORKERS=1)
+    def test_event_loop_not_blocked(self):
+        """Test the event loop keeps running while a view works."""
+        def view(request):
+            time.sleep(0.1)
+            return HttpResponse()
+
+        wrapped = async_views.async_view(view)
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+
+        async def main():
+            await asyncio.gather(wrapped(self.request), ticker())
+
+        async_to_sync(main)()
+
+        self.assertEqual(len(ticks), 5)
+        self.assertLess(ticks[-1] - ticks[0], 0.09)
+
+    @override_settings(ASYNC_VIEW_WORKERS=0)
+    def test_pool_disabled(self):
+        """Test views run without the pool when it is disabled."""
+        wrapped = async_views.async_view(
+            lambda request: HttpResponse(threading.current_thread().name)
+        )
+
+        response = async_to_sync(wrapped)(self.request)
+
+        self.assertFalse(response.content.startswith(b'async-view'))
+        self.assertIsNone(async_views.get_executor())
@@ -0,0 +1,276 @@
+"""
+Tests for the batch API.
+"""
+import base64
+from decimal import Decimal
+from unittest import skipIf
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.http import HttpResponse
+from django.test.client import RequestFactory
+from django.urls import ResolverMatch, reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core import batch
+from core.models import Recipe, Tag
+from user.authentication import CachedTokenAuthentication
+
+
+BATCH_URL = reverse('batch')
+
+LAUNCH_REQUESTS = [
+    {'method': 'GET', 'path': '/api/user/me/'},
+    {'method': 'GET', 'path': '/api/recipe/recipes/?fields=id,title'},
+    {'method': 'GET', 'path': '/api/recipe/tags/'},
+    {'method': 'GET', 'path': '/api/recipe/ingredients/'},
+]
+
+
+def create_user(email='batch@example.com'):
+    """Create and return a user with a token."""
+    user = get_user_model().objects.create_user(email, 'testpass123')
+    Token.objects.create(user=user)
+    return user
+
+
+class PublicBatchApiTests(TestCase):
+    """Test unauthenticated batch requests."""
+
+    def test_auth_required(self):
+        """Test batches require authentication."""
+        res = APIClient().post(
+            BATCH_URL,
+            {'requests': LAUNCH_REQUESTS},
+            format='json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@override_settings(BATCH_WORKERS=0)
+class PrivateBatchApiTests(TestCase):
+    """Test authenticated batch requests."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Token {self.user.auth_token.key}',
+        )
+        self.recipe = Recipe.objects.create(
+            user=self.user,
+            title='Soup',
+            price=Decimal('4.50'),
+        )
+        Tag.objects.create(user=self.user, name='Vegan')
+
+    def test_launch_requests(self):
+        """Test sub-requests return in order, authenticated once."""
+        authenticate = CachedTokenAuthentication.authenticate_credentials
+        with patch.object(
+            CachedTokenAuthentication,
+            'authenticate_credentials',
+            autospec=True,
+            side_effect=authenticate,
+        ) as patched:
+            res = self.client.post(
+                BATCH_URL,
+                {'requests': LAUNCH_REQUESTS},
+                format='json',
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        patched.assert_called_once()
+        me, recipes, tags, ingredients = res.data['responses']
+        self.assertEqual(me['status'], 200)
+        self.assertEqual(me['body']['email'], 'batch@example.com')
+        self.assertEqual(
+            recipes['body']['results'],
+            [{'id': self.recipe.id, 'title': 'Soup'}],
+        )
+        self.assertEqual(tags['body']['results'][0]['name'], 'Vegan')
+        self.assertEqual(ingredients['body']['results'], [])
+
+    def test_reads_see_earlier_writes(self):
+        """Test a write is visible to the sub-requests after it."""
+        res = self.client.post(BATCH_URL, {'requests': [
+            {
+                'method': 'PATCH',
+                'path': f'/api/recipe/recipes/{self.recipe.id}/',
+                'body': {'title': 'Stew'},
+            },
+            {
+                'method': 'GET',
+                'path': f'/api/recipe/recipes/{self.recipe.id}/',
+            },
+        ]}, format='json')
+
+        patched, fetched = res.data['responses']
+        self.assertEqual(patched['status'], 200)
+        self.assertEqual(fetched['body']['title'], 'Stew')
+
+    def test_sub_request_errors(self):
+        """Test errors are returned per sub-request."""
+        other = create_user('other@example.com')
+        theirs = Recipe.objects.create(user=other, title='X', price=1)
+
+        res = self.client.post(BATCH_URL, {'requests': [
+            {'method': 'GET', 'path': '/api/missing/'},
+            {'method': 'GET', 'path': f'/api/recipe/recipes/{theirs.id}/'},
+            {'method': 'POST', 'path': '/api/recipe/recipes/', 'body': {}},
+            {'method': 'POST', 'path': '/api/batch/', 'body': {}},
+        ]}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item['status'] for item in res.data['responses']],
+            [404, 404, 400, 400],
+        )
+        self.assertIn('title', res.data['responses'][2]['body'])
+
+    @override_settings(METRICS_ALLOWED_IPS=[])
+    def test_failing_sub_request_keeps_others(self):
+        """Test an exception in a view fails only its own entry."""
+        res = self.client.post(BATCH_URL, {'requests': [
+            {'method': 'GET', 'path': '/api/user/me/'},
+            {'method': 'GET', 'path': '/metrics'},
+        ]}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        me, metrics = res.data['responses']
+        self.assertEqual(me['body']['email'], 'batch@example.com')
+        self.assertEqual(metrics['status'], 404)
+
+    def test_streaming_response_rejected(self):
+        """Test streaming responses return an error entry."""
+        res = self.client.post(BATCH_URL, {'requests': [
+            {'method': 'GET', 'path': '/api/recipe/recipes/export/'},
+        ]}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['responses'][0]['status'], 400)
+
+    def test_binary_body_base64(self):
+        """Test bodies that are not UTF-8 are returned as base64."""
+        res = self.client.post(BATCH_URL, {'requests': [{
+            'method': 'GET',
+            'path': '/api/user/me/',
+            'headers': {'Accept': 'application/msgpack'},
+        }]}, format='json')
+
+        entry = res.data['responses'][0]
+        self.assertEqual(entry['status'], 200)
+        self.assertEqual(entry['encoding'], 'base64')
+        self.assertIn(b'batch@example.com', base64.b64decode(entry['body']))
+
+    def test_uncaught_exception_is_500(self):
+        """Test other exceptions become a server error entry."""
+        def broken(request):
+            raise RuntimeError('broken')
+
+        def working(request):
+            return HttpResponse('ok')
+
+        request = RequestFactory().get('/api/batch/')
+        request.user = self.user
+        request.auth = None
+        items = [
+            {'method': 'GET', 'path': '/broken/'},
+            {'method': 'GET', 'path': '/working/'},
+        ]
+        matches = [
+            ResolverMatch(broken, (), {}, url_name='broken'),
+            ResolverMatch(working, (), {}, url_name='working'),
+        ]
+        with patch('core.batch.resolve', side_effect=matches):
+            responses = batch.run(request, items)
+
+        self.assertEqual(responses[0]['status'], 500)
+        self.assertEqual(responses[1]['body'], 'ok')
+
+    def test_headers_passed(self):
+        """Test sub-request headers reach the view."""
+        first = self.client.post(
+            BATCH_URL,
+            {'requests': [{'method': 'GET', 'path': '/api/recipe/tags/'}]},
+            format='json',
+        ).data['responses'][0]
+
+        res = self.client.post(BATCH_URL, {'requests': [{
+            'method': 'GET',
+            'path': '/api/recipe/tags/',
+            'headers': {'If-None-Match': first['headers']['ETag']},
+        }]}, format='json')
+
+        self.assertEqual(res.data['responses'][0]['status'], 304)
+
+    def test_conditional_response_on_cache_miss(self):
+        """Test a 304 made while rendering reaches the batch."""
+        first = self.client.post(
+            BATCH_URL,
+            {'requests': [{'method': 'GET', 'path': '/api/recipe/tags/'}]},
+            format='json',
+        ).data['responses'][0]
+        cache.clear()
+
+        res = self.client.post(BATCH_URL, {'requests': [{
+            'method': 'GET',
+            'path': '/api/recipe/tags/',
+            'headers': {'If-None-Match': first['headers']['ETag']},
+        }]}, format='json')
+
+        self.assertEqual(res.data['responses'][0]['status'], 304)
+        self.assertIsNone(res.data['responses'][0]['body'])
+
+    @override_settings(BATCH_MAX_REQUESTS=3)
+    def test_size_limit(self):
+        """Test batches over BATCH_MAX_REQUESTS are rejected."""
+        res = self.client.post(
+            BATCH_URL,
+            {'requests': LAUNCH_REQUESTS},
+            format='json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('requests', res.data)
+
+
+@skipIf(
+    connection.vendor == 'sqlite',
+    'SQLite test databases do not support concurrent connections.',
+)
+@override_settings(BATCH_WORKERS=4)
+class ConcurrentBatchApiTests(TransactionTestCase):
+    """Test GETs dispatched on the batch thread pool."""
+
+    def test_concurrent_reads(self):
+        """Test pooled reads return the same responses in order."""
+        user = create_user()
+        Recipe.objects.create(user=user, title='Soup', price=Decimal('1'))
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Token {user.auth_token.key}',
+        )
+
+        res = client.post(
+            BATCH_URL,
+            {'requests': LAUNCH_REQUESTS},
+            format='json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item['status'] for item in res.data['responses']],
+            [200, 200, 200, 200],
+        )
+        self.assertEqual(
+            res.data['responses'][1]['body']['results'][0]['title'],
+            'Soup',
+        )
@@ -0,0 +1,22 @@
+"""
+Tests for the benchmark latency summaries.
+"""
+from django.test import SimpleTestCase
+
+from core.benchmarking import percentile
+
+
+class PercentileTests(SimpleTestCase):
+    """Test picking percentiles from sorted timings."""
+
+    def test_percentile(self):
+        """Test the value at or below the fraction is returned."""
+        timings = list(range(1, 101))
+
+        self.assertEqual(percentile(timings, 0.5), 50)
+        self.assertEqual(percentile(timings, 0.95), 95)
+        self.assertEqual(percentile(timings, 1), 100)
+
+    def test_percentile_few_timings(self):
+        """Test small samples return their first value, not wrap around."""
+        self.assertEqual(percentile([3, 7], 0.1), 3)
@@ -0,0 +1,27 @@
+"""
+Tests for the core system checks.
+"""
+from django.test import SimpleTestCase, override_settings
+
+from core.checks import check_shared_cache
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    """Test the shared cache deploy check."""
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }})
+    def test_locmem_warns(self):
+        """Test a per-process cache is reported."""
+        errors = check_shared_cache(None)
+
+        self.assertEqual([error.id for error in errors], ['core.W001'])
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': ['cache:11211'],
+    }})
+    def test_shared_cache_passes(self):
+        """Test a shared cache is accepted."""
+        self.assertEqual(check_shared_cache(None), [])
@@ -1,13 +1,40 @@
 """
 Test custom Django management commands.
 """
+import json
+import os
+import shutil
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from unittest import skipIf
 from unittest.mock import patch
 
+from PIL import Image
 from psycopg2 import OperationalError as Psycopg2Error
 
+from django.contrib.auth import get_user_model
 from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
 from django.db.utils import OperationalError
-from django.test import SimpleTestCase
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+
+from core.management.commands import index_advisor, load_test
+from core.models import (
+    Recipe,
+    RecipeImage,
+    RecipeSignature,
+    RecipeStats,
+    Tag,
+)
+from recipe import thumbnails
 
 
 @patch('core.management.commands.wait_for_db.Command.check')
@@ -31,3 +58,454 @@ class CommandTests(SimpleTestCase):
 
         self.assertEqual(patched_check.call_count, 6)
         patched_check.asser_called_with(databases=['default'])
+
+    @patch('core.management.commands.wait_for_db.random.uniform')
+    @patch('time.sleep')
+    def test_wait_for_db_backoff(
+        self, patched_sleep, patched_uniform, patched_check,
+    ):
+        """Test waits double up to the maximum delay."""
+        patched_uniform.side_effect = lambda low, high: high
+        patched_check.side_effect = [OperationalError] * 5 + [True]
+
+        call_command(
+            'wait_for_db', initial_delay=1, max_delay=4, stdout=StringIO(),
+        )
+
+        self.assertEqual(
+            [c.args[0] for c in patched_sleep.call_args_list],
+            [1, 2, 4, 4, 4],
+        )
+
+    @patch('time.sleep')
+    def test_wait_for_db_timeout(self, patched_sleep, patched_check):
+        """Test giving up once the deadline has passed."""
+        patched_check.side_effect = OperationalError
+
+        with self.assertRaises(CommandError):
+            call_command('wait_for_db', timeout=0, stdout=StringIO())
+
+        patched_sleep.assert_not_called()
+
+
+class IndexAdvisorTests(TestCase):
+    """Test the index advisor command."""
+
+    def test_endpoints_indexed(self):
+        """Test every endpoint query is served by an index."""
+        out = StringIO()
+
+        call_command('index_advisor', seed=50, stdout=out)
+
+        self.assertIn('recipe-list: OK', out.getvalue())
+        self.assertIn('tag-list: OK', out.getvalue())
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_unindexed_query_flagged(self):
+        """Test scans and sorts are reported."""
+        scan = index_advisor.find_plan_issues(
+            Recipe.objects.filter(title='Soup'),
+        )
+        sort = index_advisor.find_plan_issues(
+            Recipe.objects.filter(user_id=1).order_by('title'),
+        )
+
+        self.assertEqual(scan, ['sequential scan on core_recipe'])
+        self.assertEqual(sort, ['sort'])
+
+    @patch.object(index_advisor, 'find_plan_issues', return_value=['sort'])
+    def test_unindexed_endpoint_fails(self, patched_find):
+        """Test the command fails when an endpoint is not indexed."""
+        with self.assertRaises(CommandError):
+            call_command('index_advisor', seed=0, stdout=StringIO())
+
+
+class BenchmarkSearchTests(TestCase):
+    """Test the search benchmark command."""
+
+    def test_benchmark_reports_and_rolls_back(self):
+        """Test the benchmark reports latency and leaves no rows."""
+        out = StringIO()
+
+        call_command('benchmark_search', rows=50, repeat=2, stdout=out)
+
+        self.assertIn("'curry': p50", out.getvalue())
+        self.assertFalse(Recipe.objects.exists())
+
+
+class RebuildRecipeStatsTests(TestCase):
+    """Test the recipe stats repair command."""
+
+    def test_rebuild_repairs_drift(self):
+        """Test drifted, missing and stale rows are rebuilt."""
+        user = get_user_model().objects.create_user('stats@example.com')
+        other = get_user_model().objects.create_user('other@example.com')
+        Recipe.objects.create(
+            user=user, title='Soup', time_minutes=10, price=Decimal('4.50'),
+        )
+        Recipe.objects.bulk_create([
+            Recipe(user=other, title='Stew', price=Decimal('12.00')),
+        ])
+        RecipeStats.objects.filter(user=other).delete()
+        RecipeStats.objects.filter(user=user).update(recipe_count=7)
+        stale = get_user_model().objects.create_user('stale@example.com')
+        RecipeStats.objects.filter(user=stale).update(recipe_count=3)
+        out = StringIO()
+
+        call_command('rebuild_recipe_stats', stdout=out)
+
+        self.assertIn('1 drifted, 1 missing and 1 stale', out.getvalue())
+        stats = RecipeStats.objects.get(user=user)
+        self.assertEqual(stats.recipe_count, 1)
+        self.assertEqual(stats.time_minutes_total, 10)
+        self.assertEqual(stats.price_under_5, 1)
+        other_stats = RecipeStats.objects.get(user=other)
+        self.assertEqual(other_stats.price_under_20, 1)
+        self.assertEqual(other_stats.calories_count, 0)
+        self.assertEqual(RecipeStats.objects.get(user=stale).recipe_count, 0)
+
+    def test_dry_run_changes_nothing(self):
+        """Test a dry run only reports drift."""
+        user = get_user_model().objects.create_user('stats@example.com')
+        Recipe.objects.create(user=user, title='Soup', price=Decimal('1'))
+        RecipeStats.objects.filter(user=user).update(recipe_count=7)
+
+        call_command('rebuild_recipe_stats', dry_run=True, stdout=StringIO())
+
+        self.assertEqual(RecipeStats.objects.get(user=user).recipe_count, 7)
+
+    def test_stats_locked_before_aggregating(self):
+        """Test the stats rows are read, and locked, before the recipes."""
+        with CaptureQueriesContext(connection) as queries:
+            call_command('rebuild_recipe_stats', stdout=StringIO())
+
+        tables = [
+            table for query in queries for table in (
+                RecipeStats._meta.db_table,
+                Recipe._meta.db_table,
+            )
+            if f'FROM "{table}"' in query['sql']
+        ]
+        self.assertEqual(tables[0], RecipeStats._meta.db_table)
+
+
+class BenchmarkMealPlanTests(TestCase):
+    """Test the meal plan benchmark command."""
+
+    def test_benchmark_reports_and_rolls_back(self):
+        """Test the benchmark reports latency per size and leaves no rows."""
+        out = StringIO()
+
+        call_command(
+            'benchmark_meal_plan', sizes='10,50', repeat=2, stdout=out,
+        )
+
+        self.assertIn('10 recipes: p50', out.getvalue())
+        self.assertIn('50 recipes: p50', out.getvalue())
+        self.assertFalse(Recipe.objects.exists())
+
+
+class RebuildSimilarityIndexTests(TestCase):
+    """Test the similarity index rebuild command."""
+
+    def test_rebuild_indexes_recipes(self):
+        """Test recipes with tags are indexed and sizes reported."""
+        user = get_user_model().objects.create_user('index@example.com')
+        tag = Tag.objects.create(user=user, name='Vegan')
+        recipe = Recipe.objects.create(user=user, title='Soup', price=1)
+        recipe.tags.add(tag)
+        Recipe.objects.create(user=user, title='Water', price=1)
+        out = StringIO()
+
+        call_command('rebuild_similarity_index', stdout=out)
+
+        self.assertIn('Indexed 1 recipes, 512 bytes', out.getvalue())
+        self.assertTrue(RecipeSignature.objects.filter(recipe=recipe).exists())
+
+
+@skipIf(
+    connection.vendor == 'sqlite',
+    'SQLite test databases do not support concurrent connections.',
+)
+@override_settings(ALLOWED_HOSTS=['localhost'])
+class BenchmarkAsgiTests(TransactionTestCase):
+    """Test the WSGI and ASGI load benchmark command."""
+
+    def test_benchmark_reports_both_servers(self):
+        """Test both servers are measured and the seed data removed."""
+        out = StringIO()
+
+        call_command(
+            'benchmark_asgi', concurrency='1,4', requests=8,
+            client_delay=1, recipes=5, stdout=out,
+        )
+
+        self.assertIn('concurrency 4: wsgi', out.getvalue())
+        self.assertIn('errors 0 | asgi', out.getvalue())
+        self.assertFalse(get_user_model().objects.exists())
+
+
+@skipIf(
+    connection.vendor == 'sqlite',
+    'SQLite test databases do not support concurrent connections.',
+)
+@override_settings(ALLOWED_HOSTS=['localhost'])
+class BenchmarkLoginsTests(TransactionTestCase):
+    """Test the login throughput benchmark command."""
+
+    def test_benchmark_reports_levels(self):
+        """Test each level is reported and the seed data removed."""
+        out = StringIO()
+
+        call_command(
+            'benchmark_logins', login_clients='0,1', readers=1,
+            duration=0.2, users=2, stdout=out,
+        )
+
+        self.assertIn('1 login clients:', out.getvalue())
+        self.assertIn('reads p50', out.getvalue())
+        self.assertFalse(get_user_model().objects.exists())
+
+
+class GenerateThumbnailsTests(TestCase):
+    """Test the thumbnail repair command."""
+
+    def test_renders_missing_thumbnails(self):
+        """Test images missing thumbnails get them, others are skipped."""
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        os.makedirs(os.path.join(media_root, 'images'))
+        Image.new('RGB', (300, 200)).save(
+            os.path.join(media_root, 'images', 'a.png'),
+        )
+        missing = RecipeImage.objects.create(
+            sha256='a' * 64, file='images/a.png', width=300, height=200,
+        )
+        RecipeImage.objects.create(
+            sha256='b' * 64, file='images/b.png', width=1, height=1,
+            thumbnails={label: 'x.jpg' for label in thumbnails.SIZES},
+        )
+        RecipeImage.objects.create(
+            sha256='c' * 64, file='images/c.png', width=1, height=1,
+        )
+        out = StringIO()
+
+        with override_settings(MEDIA_ROOT=media_root, THUMBNAIL_WORKERS=0):
+            call_command('generate_thumbnails', stdout=out, stderr=StringIO())
+
+        self.assertIn(
+            'Rendered thumbnails of 1 images, 1 failed',
+            out.getvalue(),
+        )
+        missing.refresh_from_db()
+        self.assertEqual(set(missing.thumbnails), set(thumbnails.SIZES))
+
+
+@override_settings(ALLOWED_HOSTS=['localhost'])
+class BenchmarkConnectionsTests(TransactionTestCase):
+    """Test the connection reuse benchmark command."""
+
+    def test_benchmark_reports_both_settings(self):
+        """Test both CONN_MAX_AGE values are reported and restored."""
+        max_age = connection.settings_dict['CONN_MAX_AGE']
+        out = StringIO()
+
+        call_command('benchmark_connections', requests=5, stdout=out)
+
+        self.assertIn('CONN_MAX_AGE 0: ', out.getvalue())
+        self.assertIn('connections opened', out.getvalue())
+        self.assertEqual(connection.settings_dict['CONN_MAX_AGE'], max_age)
+
+
+@override_settings(ALLOWED_HOSTS=['localhost'])
+class BenchmarkInstrumentationTests(TransactionTestCase):
+    """Test the instrumentation overhead benchmark command."""
+
+    def test_benchmark_reports_overhead(self):
+        """Test the overhead is reported and the seed data removed."""
+        out = StringIO()
+
+        call_command(
+            'benchmark_instrumentation', requests=2, rounds=1, recipes=2,
+            stdout=out,
+        )
+
+        self.assertIn('overhead', out.getvalue())
+        self.assertFalse(get_user_model().objects.exists())
+
+
+@skipIf(
+    connection.vendor == 'sqlite',
+    'SQLite test databases do not support concurrent connections.',
+)
+@override_settings(ALLOWED_HOSTS=['localhost'])
+class LoadTestTests(TransactionTestCase):
+    """Test the load test command."""
+
+    def test_load_test_reports_endpoints(self):
+        """Test a run reports each endpoint, saves results and cleans up."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        output = os.path.join(directory, 'results.json')
+        out = StringIO()
+
+        call_command(
+            'load_test', users=2, recipes=5, requests=40, concurrency=2,
+            output=output, stdout=out,
+        )
+
+        with open(output) as results_file:
+            results = json.load(results_file)
+        self.assertEqual(results['requests'], 40)
+        for stats in results['endpoints'].values():
+            self.assertEqual(stats['errors'], 0)
+            self.assertIsNotNone(stats['queries'])
+        self.assertIn('req/s', out.getvalue())
+        self.assertFalse(get_user_model().objects.exists())
+
+
+class LoadTestCompareTests(SimpleTestCase):
+    """Test the load test's replay files and baseline comparison."""
+
+    def _results(self, p95_ms, queries):
+        return {'endpoints': {
+            'GET /api/recipe/tags/': {'p95_ms': p95_ms, 'queries': queries},
+        }}
+
+    def test_regressions_reported(self):
+        """Test slower or chattier endpoints count as regressions."""
+        command = load_test.Command(stdout=StringIO())
+        baseline = self._results(10.0, 2.0)
+
+        self.assertEqual(
+            command._compare(baseline, self._results(11.0, 2.0), 0.2),
+            0,
+        )
+        self.assertEqual(
+            command._compare(baseline, self._results(13.0, 2.0), 0.2),
+            1,
+        )
+        self.assertEqual(
+            command._compare(baseline, self._results(10.0, 3.0), 0.2),
+            1,
+        )
+
+    def test_invalid_replay_file(self):
+        """Test a replay entry without a path is refused before seeding."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        replay = os.path.join(directory, 'mix.ndjson')
+        with open(replay, 'w') as replay_file:
+            replay_file.write('{"method": "GET"}\n')
+
+        with self.assertRaisesMessage(CommandError, 'mix.ndjson:1'):
+            call_command('load_test', replay=replay)
+
+    def test_fill_placeholders(self):
+        """Test paths and bodies are filled from the seeded data."""
+        rng = load_test.random.Random(0)
+        data = {'recipe_id': [7], 'tag_id': [3], 'word': ['curry']}
+
+        self.assertEqual(
+            load_test.fill('/api/recipe/recipes/{recipe_id}/', data, rng),
+            '/api/recipe/recipes/7/',
+        )
+        self.assertEqual(
+            load_test.fill(
+                {'title': '{word}', 'tags': [{'name': 'tag {tag_id}'}]},
+                data,
+                rng,
+            ),
+            {'title': 'curry', 'tags': [{'name': 'tag 3'}]},
+        )
+
+
+class SeedTests(TestCase):
+    """Test the synthetic data generator."""
+
+    def seed(self, **options):
+        """Run the seed command with small sizes and return its output."""
+        out = StringIO()
+        sizes = {
+            'users': 3,
+            'recipes_per_user': 4,
+            'tags_per_user': 5,
+            'ingredients_per_user': 6,
+            'tags_per_recipe': 2,
+            'ingredients_per_recipe': 3,
+        }
+        call_command('seed', stdout=out, **{**sizes, **options})
+        return out.getvalue()
+
+    def test_seed_writes_linked_rows(self):
+        """Test users own their recipes, links and consistent stats."""
+        out = self.seed(password='testpass123')
+
+        self.assertIn('core_recipe_tags: 24 rows', out)
+        self.assertIn('Indexed 12 recipes', out)
+        users = get_user_model().objects.filter(
+            email__endswith='@seed.example.com',
+        )
+        self.assertEqual(users.count(), 3)
+        self.assertTrue(users.first().check_password('testpass123'))
+        for recipe in Recipe.objects.prefetch_related('tags', 'ingredients'):
+            self.assertEqual(len(recipe.tags.all()), 2)
+            self.assertEqual(len(recipe.ingredients.all()), 3)
+            owners = {tag.user_id for tag in recipe.tags.all()}
+            owners |= {item.user_id for item in recipe.ingredients.all()}
+            self.assertEqual(owners, {recipe.user_id})
+        self.assertTrue(RecipeSignature.objects.exists())
+        check = StringIO()
+        call_command('rebuild_recipe_stats', dry_run=True, stdout=check)
+        self.assertIn('0 drifted, 0 missing and 0 stale', check.getvalue())
+
+    def test_seed_is_deterministic(self):
+        """Test the same seed generates the same data."""
+        self.seed(seed=7, skip_indexes=True)
+        first = list(Recipe.objects.order_by('id').values_list(
+            'title', 'price', 'calories',
+        ))
+        Recipe.objects.all().delete()
+
+        self.seed(seed=7, skip_indexes=True)
+
+        second = list(Recipe.objects.order_by('id').values_list(
+            'title', 'price', 'calories',
+        ))
+        self.assertEqual(first, second)
+        user = get_user_model().objects.first()
+        self.assertFalse(user.has_usable_password())
+
+    def test_links_limited_to_user_pool(self):
+        """Test more links per recipe than tags per user is refused."""
+        with self.assertRaises(CommandError):
+            self.seed(tags_per_recipe=6)
+
+
+class BenchmarkSerializationTests(TestCase):
+    """Test the recipe list serialization benchmark command."""
+
+    def test_benchmark_reports_and_rolls_back(self):
+        """Test both paths are timed per size and no rows are left."""
+        out = StringIO()
+
+        call_command(
+            'benchmark_serialization', sizes='5,20', repeat=1, stdout=out,
+        )
+
+        self.assertIn('5 recipes: serializer', out.getvalue())
+        self.assertIn('20 recipes: serializer', out.getvalue())
+        self.assertFalse(Recipe.objects.exists())
+
+
+class BenchmarkRenderersTests(SimpleTestCase):
+    """Test the renderer benchmark command."""
+
+    def test_benchmark_reports_each_renderer(self):
+        """Test size and encode time are reported per renderer."""
+        out = StringIO()
+
+        call_command('benchmark_renderers', recipes=10, repeat=1, stdout=out)
+
+        for name in ('json', 'orjson', 'msgpack'):
+            self.assertIn(f'{name}: ', out.getvalue())
@@ -0,0 +1,49 @@
+"""
+Tests for the shared worker pools.
+"""
+from unittest.mock import Mock
+
+from django.test import SimpleTestCase, override_settings
+
+from core import executors
+
+
+@override_settings(TEST_WORKERS=3)
+class ExecutorTests(SimpleTestCase):
+    """Test building and sharing pools from settings."""
+
+    def setUp(self):
+        self.addCleanup(executors.shutdown, 'test')
+
+    def test_pool_built_once(self):
+        """Test a pool is built on first use and then shared."""
+        executor = executors.get_executor('test', 'TEST_WORKERS')
+
+        self.assertIs(executors.get_executor('test', 'TEST_WORKERS'), executor)
+        self.assertEqual(executor._max_workers, 3)
+
+    def test_factory_gets_workers(self):
+        """Test a custom factory is called with the configured workers."""
+        factory = Mock()
+
+        executor = executors.get_executor('test', 'TEST_WORKERS', factory)
+        executors.get_executor('test', 'TEST_WORKERS', factory)
+
+        factory.assert_called_once_with(3)
+        self.assertIs(executor, factory.return_value)
+
+    @override_settings(TEST_WORKERS=0)
+    def test_pool_disabled(self):
+        """Test no pool is built when its setting is 0."""
+        self.assertIsNone(executors.get_executor('test', 'TEST_WORKERS'))
+
+    def test_shutdown_forgets_pool(self):
+        """Test a shut down pool is rebuilt on next use."""
+        executor = executors.get_executor('test', 'TEST_WORKERS')
+
+        executors.shutdown('test')
+
+        self.assertIsNot(
+            executors.get_executor('test', 'TEST_WORKERS'),
+            executor,
+        )
@@ -0,0 +1,134 @@
+"""
+Tests for the health check API and connection health checks.
+"""
+from unittest.mock import MagicMock, patch
+
+from django.db import connection
+from django.db.backends.sqlite3 import base as sqlite3
+from django.db.utils import OperationalError
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import db
+from core.backends.postgresql import base as postgresql
+
+
+LIVE_URL = reverse('health:live')
+READY_URL = reverse('health:ready')
+
+
+class HealthApiTests(TestCase):
+    """Test the liveness and readiness probes."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_live(self):
+        """Test liveness answers without touching the database."""
+        with self.assertNumQueries(0):
+            res = self.client.get(LIVE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {'status': 'ok'})
+
+    def test_ready(self):
+        """Test readiness runs a single query when the database is up."""
+        with self.assertNumQueries(1):
+            res = self.client.get(READY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['database'], 'ok')
+
+    @patch('core.db.connections')
+    def test_ready_database_down(self, patched_connections):
+        """Test readiness fails and drops the connection when it is down."""
+        conn = MagicMock()
+        conn.ensure_connection.side_effect = OperationalError
+        patched_connections.__getitem__.return_value = conn
+
+        res = self.client.get(READY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(res.data['database'], 'unavailable')
+        conn.close.assert_called_once()
+
+
+class HealthCheckWrapper(db.HealthCheckMixin, sqlite3.DatabaseWrapper):
+    """SQLite connection using the health check mixin."""
+
+
+class HealthCheckMixinTests(SimpleTestCase):
+    """Test reused connections are health checked on first use."""
+
+    def _wrapper(self, health_checks=True):
+        """Return an open connection as left by an earlier request."""
+        wrapper = HealthCheckWrapper({
+            **connection.settings_dict,
+            'NAME': ':memory:',
+            'CONN_HEALTH_CHECKS': health_checks,
+        }, alias='health')
+        wrapper.ensure_connection()
+        self.addCleanup(wrapper.close)
+        # Request started.
+        wrapper.close_if_unusable_or_obsolete()
+        return wrapper
+
+    def test_checked_once_on_first_use(self):
+        """Test a reused connection is pinged once, when first used."""
+        wrapper = self._wrapper()
+
+        with patch.object(wrapper, 'is_usable', return_value=True) as usable:
+            usable.assert_not_called()
+            for _ in range(2):
+                with wrapper.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+
+            usable.assert_called_once()
+            wrapper.close_if_unusable_or_obsolete()
+            wrapper.cursor().close()
+
+        self.assertEqual(usable.call_count, 2)
+
+    def test_unusable_connection_closed(self):
+        """Test a dead connection is closed so the request reconnects."""
+        wrapper = self._wrapper()
+
+        with patch.object(wrapper, 'is_usable', return_value=False), \
+                patch.object(wrapper, 'close') as close:
+            wrapper.set_autocommit(True)
+
+        close.assert_called_once()
+
+    def test_new_connection_not_checked(self):
+        """Test a connection opened by the request is not pinged."""
+        wrapper = self._wrapper()
+        wrapper.close_if_unusable_or_obsolete()
+        wrapper.connection = None
+
+        with patch.object(wrapper, 'is_usable') as usable:
+            wrapper.cursor().close()
+
+        usable.assert_not_called()
+
+    def test_checks_skipped(self):
+        """Test connections opted out or in a transaction are left alone."""
+        opted_out = self._wrapper(health_checks=False)
+        in_atomic = self._wrapper()
+        in_atomic.in_atomic_block = True
+        self.addCleanup(setattr, in_atomic, 'in_atomic_block', False)
+
+        for wrapper in (opted_out, in_atomic):
+            with patch.object(wrapper, 'is_usable') as usable:
+                wrapper.cursor().close()
+
+            usable.assert_not_called()
+
+    def test_postgresql_backend_checks(self):
+        """Test the configured PostgreSQL engine uses the mixin."""
+        self.assertTrue(issubclass(
+            postgresql.DatabaseWrapper,
+            db.HealthCheckMixin,
+        ))
@@ -0,0 +1,164 @@
+"""
+Tests for request instrumentation and the metrics endpoint.
+"""
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.serializers import BaseSerializer
+from rest_framework.test import APIClient
+
+from core import metrics
+from core.models import Recipe, Tag
+
+
+RECIPES_URL = reverse('recipe:recipe-list')
+TAGS_URL = reverse('recipe:tag-list')
+METRICS_URL = reverse('metrics')
+
+
+def parse_server_timing(header):
+    """Return metric name -> (duration, description) of a header."""
+    parsed = {}
+    for entry in header.split(', '):
+        name, *params = entry.split(';')
+        values = dict(param.split('=', 1) for param in params)
+        parsed[name] = (float(values['dur']), values.get('desc'))
+    return parsed
+
+
+class ServerTimingTests(TestCase):
+    """Test timings are reported for each request."""
+
+    def setUp(self):
+        metrics.registry.clear()
+        self.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'testpass123',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        Recipe.objects.create(
+            user=self.user,
+            title='Sample recipe',
+            price=Decimal('5.00'),
+        )
+
+    def test_server_timing_header(self):
+        """Test responses carry the time spent in each phase."""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        timing = parse_server_timing(res['Server-Timing'])
+        self.assertEqual(
+            set(timing),
+            {'db', 'serialize', 'render', 'total'},
+        )
+        self.assertEqual(timing['db'][1], f'"{len(queries)} queries"')
+        self.assertGreater(timing['db'][0], 0)
+        self.assertGreater(timing['serialize'][0], 0)
+        self.assertGreater(timing['render'][0], 0)
+        self.assertGreaterEqual(
+            timing['total'][0],
+            timing['db'][0] + timing['render'][0],
+        )
+
+    def test_serializer_time_reported(self):
+        """Test views using DRF serializers report their serialize time."""
+        Tag.objects.create(user=self.user, name='Vegan')
+
+        res = self.client.get(TAGS_URL)
+
+        timing = parse_server_timing(res['Server-Timing'])
+        self.assertGreater(timing['serialize'][0], 0)
+        self.assertNotIn('timed', vars(BaseSerializer.data.fget))
+
+    @override_settings(SERVER_TIMING=False)
+    def test_server_timing_disabled(self):
+        """Test the header can be turned off."""
+        res = self.client.get(RECIPES_URL)
+
+        self.assertNotIn('Server-Timing', res)
+
+    def test_histograms_per_view(self):
+        """Test requests are counted in their view's histograms."""
+        self.client.get(RECIPES_URL)
+        self.client.get(RECIPES_URL)
+        self.client.post(RECIPES_URL, {
+            'title': 'New recipe',
+            'time_minutes': 5,
+            'price': Decimal('1.00'),
+        })
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res['Content-Type'].startswith('text/plain'))
+        body = res.content.decode()
+        labels = 'view="recipe:recipe-list",method="GET"'
+        self.assertIn(f'request_duration_seconds_count{{{labels}}} 2', body)
+        self.assertIn(
+            f'request_queries_bucket{{{labels},le="+Inf"}} 2',
+            body,
+        )
+        self.assertIn(
+            'request_db_seconds_count'
+            '{view="recipe:recipe-list",method="POST"} 1',
+            body,
+        )
+        self.assertIn('# TYPE request_render_seconds histogram', body)
+
+    def test_metrics_only_local(self):
+        """Test the metrics endpoint is hidden from remote clients."""
+        res = self.client.get(METRICS_URL, REMOTE_ADDR='203.0.113.5')
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class HistogramTests(SimpleTestCase):
+    """Test the Prometheus histograms."""
+
+    def test_cumulative_buckets(self):
+        """Test bucket counts are cumulative and include the bound."""
+        registry = metrics.Registry()
+        timings = metrics.RequestTimings()
+        for queries in (0, 1, 3, 500):
+            timings.queries = queries
+            registry.observe('view', 'GET', timings)
+
+        body = registry.render()
+
+        labels = 'view="view",method="GET"'
+        self.assertIn(f'request_queries_bucket{{{labels},le="0"}} 1', body)
+        self.assertIn(f'request_queries_bucket{{{labels},le="1"}} 2', body)
+        self.assertIn(f'request_queries_bucket{{{labels},le="5"}} 3', body)
+        self.assertIn(f'request_queries_bucket{{{labels},le="100"}} 3', body)
+        self.assertIn(f'request_queries_bucket{{{labels},le="+Inf"}} 4', body)
+        self.assertIn(f'request_queries_sum{{{labels}}} 504', body)
+
+    def test_nested_timers_counted_once(self):
+        """Test time in a phase is not counted twice when nested."""
+        timings = metrics.RequestTimings()
+        token = metrics._current.set(timings)
+        self.addCleanup(metrics._current.reset, token)
+
+        with patch(
+            'core.metrics.time.perf_counter',
+            side_effect=[1.0, 3.5],
+        ) as patched_perf_counter:
+            metrics.timed(
+                'serialize',
+                metrics.timed,
+                'serialize',
+                lambda: None,
+            )
+
+        self.assertEqual(timings.serialize, 2.5)
+        self.assertEqual(patched_perf_counter.call_count, 2)
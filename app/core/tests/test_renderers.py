@@ -0,0 +1,134 @@
+"""
+Tests for the orjson and MessagePack renderers and parsers.
+"""
+import datetime
+import json
+from decimal import Decimal
+
+import msgpack
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+from core.models import Recipe
+from core.renderers import ORJSONRenderer
+
+
+RECIPES_URL = reverse('recipe:recipe-list')
+TOKEN_URL = reverse('user:token')
+MSGPACK = 'application/msgpack'
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    """Test the orjson renderer matches DRF's JSON renderer."""
+
+    def test_same_bytes_as_json_renderer(self):
+        """Test Decimals, datetimes, unicode and line separators match."""
+        data = ReturnDict({
+            'price': '4.50',
+            'average': Decimal('1.25'),
+            'created': datetime.datetime(
+                2024, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc,
+            ),
+            'title': 'Crème brûlée\u2028',
+            'counts': {1: [True, None, 2.5]},
+        }, serializer=None)
+
+        self.assertEqual(
+            ORJSONRenderer().render(data),
+            JSONRenderer().render(data),
+        )
+
+    def test_indent_uses_json_renderer(self):
+        """Test indented output falls back to the stdlib renderer."""
+        rendered = ORJSONRenderer().render(
+            {'a': 1},
+            'application/json; indent=2',
+        )
+
+        self.assertEqual(rendered, b'{\n  "a": 1\n}')
+
+
+class MediaTypeApiTests(TestCase):
+    """Test MessagePack and JSON negotiation on the APIs."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'media@example.com',
+            'testpass123',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        Recipe.objects.create(
+            user=self.user,
+            title='Soup',
+            price=Decimal('4.50'),
+        )
+
+    def test_list_as_msgpack(self):
+        """Test Accept selects MessagePack with the same data as JSON."""
+        as_json = self.client.get(RECIPES_URL)
+        res = self.client.get(RECIPES_URL, HTTP_ACCEPT=MSGPACK)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], MSGPACK)
+        self.assertEqual(
+            msgpack.unpackb(res.content),
+            json.loads(as_json.content),
+        )
+        self.assertEqual(
+            msgpack.unpackb(res.content)['results'][0]['price'],
+            '4.50',
+        )
+
+    def test_create_from_msgpack(self):
+        """Test MessagePack request bodies are parsed."""
+        payload = {'title': 'Stew', 'price': '12.25', 'tags': [{'name': 'A'}]}
+
+        res = self.client.post(
+            RECIPES_URL,
+            msgpack.packb(payload),
+            content_type=MSGPACK,
+            HTTP_ACCEPT=MSGPACK,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(msgpack.unpackb(res.content)['price'], '12.25')
+        recipe = Recipe.objects.get(title='Stew')
+        self.assertEqual(recipe.price, Decimal('12.25'))
+        self.assertEqual(recipe.tags.get().name, 'A')
+
+    def test_invalid_bodies_rejected(self):
+        """Test malformed MessagePack and JSON bodies return a 400."""
+        for content_type, body in ((MSGPACK, b'\xc1'), (
+            'application/json', b'{"title": ',
+        )):
+            res = self.client.post(
+                RECIPES_URL,
+                body,
+                content_type=content_type,
+            )
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('parse error', res.data['detail'])
+
+    def test_token_from_msgpack(self):
+        """Test logging in with a MessagePack body."""
+        res = APIClient().post(
+            TOKEN_URL,
+            msgpack.packb({
+                'email': 'media@example.com',
+                'password': 'testpass123',
+            }),
+            content_type=MSGPACK,
+            HTTP_ACCEPT=MSGPACK,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('token', msgpack.unpackb(res.content))
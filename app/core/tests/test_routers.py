@@ -0,0 +1,100 @@
+"""
+Tests for the primary and replica database router.
+"""
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from core import routers
+from core.models import Recipe
+
+
+def make_request(method='GET', user_id=1):
+    """Return a minimal request for read_alias."""
+    return MagicMock(method=method, user=MagicMock(pk=user_id))
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1', 'replica_2'])
+class ReadAliasTests(SimpleTestCase):
+    """Test choosing the database a request reads from."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_safe_methods_use_replicas(self):
+        """Test safe requests read from a replica."""
+        for method in ('GET', 'HEAD', 'OPTIONS'):
+            self.assertIn(
+                routers.read_alias(make_request(method)),
+                ['replica_1', 'replica_2'],
+            )
+
+    @patch('core.routers.random.choice')
+    def test_replicas_chosen_at_random(self, patched_choice):
+        """Test reads are spread over the replicas."""
+        patched_choice.return_value = 'replica_2'
+
+        self.assertEqual(routers.read_alias(make_request()), 'replica_2')
+        patched_choice.assert_called_once_with(['replica_1', 'replica_2'])
+
+    def test_unsafe_methods_use_primary(self):
+        """Test writing requests read from the primary."""
+        for method in ('POST', 'PUT', 'PATCH', 'DELETE'):
+            self.assertEqual(
+                routers.read_alias(make_request(method)),
+                'default',
+            )
+
+    def test_pinned_user_uses_primary(self):
+        """Test a user who wrote recently reads from the primary."""
+        routers.pin(1)
+
+        self.assertEqual(routers.read_alias(make_request()), 'default')
+        self.assertIn(
+            routers.read_alias(make_request(user_id=2)),
+            ['replica_1', 'replica_2'],
+        )
+
+    @override_settings(REPLICA_PIN_SECONDS=0)
+    def test_pin_expires(self):
+        """Test pins only last REPLICA_PIN_SECONDS."""
+        routers.pin(1)
+
+        self.assertNotEqual(routers.read_alias(make_request()), 'default')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas(self):
+        """Test everything reads from the primary without replicas."""
+        self.assertEqual(routers.read_alias(make_request()), 'default')
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'])
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    """Test the database router."""
+
+    def setUp(self):
+        self.router = routers.PrimaryReplicaRouter()
+
+    def test_writes_use_primary(self):
+        """Test objects read from a replica are written to the primary."""
+        recipe = Recipe()
+        recipe._state.db = 'replica_1'
+
+        self.assertEqual(
+            self.router.db_for_write(Recipe, instance=recipe),
+            'default',
+        )
+
+    def test_replicas_not_migrated(self):
+        """Test migrations only run on the primary."""
+        self.assertFalse(self.router.allow_migrate('replica_1', 'core'))
+        self.assertIsNone(self.router.allow_migrate('default', 'core'))
+
+    def test_relations_across_replicas(self):
+        """Test objects from the primary and a replica may be related."""
+        primary, replica = Recipe(), Recipe()
+        primary._state.db = 'default'
+        replica._state.db = 'replica_1'
+
+        self.assertTrue(self.router.allow_relation(primary, replica))
@@ -0,0 +1,14 @@
+"""
+URL mapping for the health check API.
+"""
+from django.urls import path
+
+from core import views
+
+
+app_name = 'health'
+
+urlpatterns = [
+    path('live/', views.LivenessView.as_view(), name='live'),
+    path('ready/', views.ReadinessView.as_view(), name='ready'),
+]
@@ -0,0 +1,73 @@
+"""
+Views for the health check API, batches and metrics.
+"""
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core import batch, metrics
+from core.db import is_ready
+from core.serializers import BatchSerializer
+from user.authentication import CachedTokenAuthentication
+
+
+class HealthView(APIView):
+    """Base view for probes, which skip authentication entirely."""
+    authentication_classes = []
+    permission_classes = []
+
+
+class LivenessView(HealthView):
+    """Report the process is serving requests."""
+
+    @extend_schema(responses=OpenApiTypes.OBJECT)
+    def get(self, request):
+        """Answer without touching any backing service."""
+        return Response({'status': 'ok'})
+
+
+class ReadinessView(HealthView):
+    """Report whether the process can serve API requests."""
+
+    @extend_schema(responses=OpenApiTypes.OBJECT)
+    def get(self, request):
+        """Check the database over the reused connection."""
+        if not is_ready():
+            return Response(
+                {'status': 'unavailable', 'database': 'unavailable'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        return Response({'status': 'ok', 'database': 'ok'})
+
+
+class BatchView(APIView):
+    """Run many API requests in one round trip."""
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(request=BatchSerializer, responses=OpenApiTypes.OBJECT)
+    def post(self, request):
+        """Dispatch the sub-requests and return every response in order."""
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response({'responses': batch.run(
+            request,
+            serializer.validated_data['requests'],
+        )})
+
+
+def metrics_view(request):
+    """Serve the request histograms to local Prometheus scrapers."""
+    if request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        raise Http404()
+    return HttpResponse(
+        metrics.registry.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
@@ -0,0 +1,107 @@
+"""
+Per-user response cache with ETags for the recipe APIs.
+
+Every user has a generation counter in the Django cache that is bumped
+whenever one of their recipes, tags or ingredients changes. Cached
+responses are keyed by the generation they were rendered at, so a bump
+makes all of the user's cached responses unreachable at once.
+"""
+import functools
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+
+
+def generation_key(user_id):
+    """Return the cache key holding a user's generation."""
+    return f'recipe-generation:{user_id}'
+
+
+def get_generation(user_id):
+    """Return the current generation for a user."""
+    key = generation_key(user_id)
+    generation = cache.get(key)
+    if generation is None:
+        # Start from the clock so a lost counter never reuses old entries.
+        cache.add(key, time.time_ns(), None)
+        generation = cache.get(key)
+    return generation
+
+
+def _bump(user_id):
+    key = generation_key(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), None)
+
+
+def invalidate_user(user_id):
+    """Make every cached response for a user stale.
+
+    The generation is bumped now and again on commit, so a response
+    rendered from data read before the commit is never served afterwards.
+    """
+    _bump(user_id)
+    transaction.on_commit(lambda: _bump(user_id))
+
+
+def response_key(request):
+    """Return the cache key for a request's response."""
+    generation = get_generation(request.user.pk)
+    variant = hashlib.sha256(
+        f'{request.get_full_path()}|{request.accepted_media_type}'.encode()
+    ).hexdigest()
+    return f'recipe-response:{request.user.pk}:{generation}:{variant}'
+
+
+def _conditional_response(request, response, etag):
+    """Add validators to a response, or turn it into a 304."""
+    if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+        response = HttpResponseNotModified()
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    patch_vary_headers(response, ['Accept', 'Authorization'])
+    return response
+
+
+def _store_response(request, key, response):
+    """Post render callback caching a rendered response."""
+    etag = quote_etag(hashlib.sha256(response.content).hexdigest())
+    cache.set(
+        key,
+        (etag, response.content, response['Content-Type']),
+        getattr(settings, 'RECIPE_RESPONSE_CACHE_TTL', 300),
+    )
+    return _conditional_response(request, response, etag)
+
+
+def cache_user_response(handler):
+    """Serve a GET handler from the per-user response cache with ETags."""
+
+    @functools.wraps(handler)
+    def wrapper(view, request, *args, **kwargs):
+        if request.accepted_renderer.format == 'api':
+            return handler(view, request, *args, **kwargs)
+
+        key = response_key(request)
+        entry = cache.get(key)
+        if entry is not None:
+            etag, content, content_type = entry
+            response = HttpResponse(content, content_type=content_type)
+            return _conditional_response(request, response, etag)
+
+        response = handler(view, request, *args, **kwargs)
+        if response.status_code == 200:
+            response.add_post_render_callback(
+                functools.partial(_store_response, request, key)
+            )
+        return response
+
+    return wrapper
@@ -0,0 +1,80 @@
+"""
+Streaming export of recipes as NDJSON or CSV.
+"""
+import csv
+
+from django.db.models import prefetch_related_objects
+
+from rest_framework.utils.encoders import JSONEncoder
+
+
+# Recipes read from the database cursor and serialized at a time.
+CHUNK_SIZE = 1000
+
+CSV_FIELDS = [
+    'id', 'title', 'description', 'time_minutes', 'calories', 'price',
+    'link', 'tags', 'ingredients',
+]
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+class Echo:
+    """File-like object returning what is written, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def iter_chunks(queryset):
+    """Yield lists of recipes read through a server-side cursor.
+
+    Tags and ingredients are prefetched for each chunk, so the number of
+    queries grows with the number of chunks and not with the rows.
+    """
+    recipes = queryset.prefetch_related(None).iterator(chunk_size=CHUNK_SIZE)
+    chunk = []
+    for recipe in recipes:
+        chunk.append(recipe)
+        if len(chunk) == CHUNK_SIZE:
+            prefetch_related_objects(chunk, 'tags', 'ingredients')
+            yield chunk
+            chunk = []
+
+    if chunk:
+        prefetch_related_objects(chunk, 'tags', 'ingredients')
+        yield chunk
+
+
+def iter_ndjson(queryset, serializer_class):
+    """Yield one JSON encoded line per recipe."""
+    encoder = JSONEncoder()
+    for chunk in iter_chunks(queryset):
+        for row in serializer_class(chunk, many=True).data:
+            yield encoder.encode(row) + '\n'
+
+
+def iter_csv(queryset, serializer_class):
+    """Yield a CSV header and one line per recipe.
+
+    Tag and ingredient names are joined with ';' in their columns.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_FIELDS)
+    for chunk in iter_chunks(queryset):
+        for row in serializer_class(chunk, many=True).data:
+            row['tags'] = ';'.join(tag['name'] for tag in row['tags'])
+            row['ingredients'] = ';'.join(
+                ingredient['name'] for ingredient in row['ingredients']
+            )
+            yield writer.writerow(row.get(field) for field in CSV_FIELDS)
+
+
+def iter_export(queryset, serializer_class, export_format):
+    """Return the line iterator for an export format."""
+    if export_format == 'csv':
+        return iter_csv(queryset, serializer_class)
+    return iter_ndjson(queryset, serializer_class)
@@ -0,0 +1,89 @@
+"""
+Sparse fieldsets for the recipe APIs.
+
+`?fields=id,title` limits a response to the named fields and `?expand=`
+names the relations rendered as nested objects. A relation listed in
+`fields` but not expanded is rendered as a list of IDs, and an expanded
+relation is included even if `fields` leaves it out. Without `fields`
+every field is returned and relations are expanded.
+
+The fieldset also narrows the SQL: only the columns behind the chosen
+fields are loaded, and relations are only prefetched when requested.
+"""
+from collections import namedtuple
+
+from django.db.models import Prefetch
+
+from rest_framework.exceptions import ValidationError
+
+from core.models import Ingredient, Tag
+
+
+# Relations that can be expanded, with their related model.
+RELATIONS = {'tags': Tag, 'ingredients': Ingredient}
+
+# Serializer fields computed from model fields of another name.
+SOURCES = {'thumbnails': ['image'], 'image': ['image']}
+
+Fieldset = namedtuple('Fieldset', ['fields', 'collapsed'])
+
+
+def _names(request, param):
+    """Return the comma separated names of a query parameter."""
+    value = request.query_params.get(param, '')
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def parse(request, field_names):
+    """Return the request's Fieldset, or None to return every field."""
+    fields = _names(request, 'fields')
+    expand = _names(request, 'expand')
+    errors = {}
+    unknown = [name for name in fields if name not in field_names]
+    if unknown:
+        errors['fields'] = f'Unknown fields: {", ".join(unknown)}.'
+    unknown = [name for name in expand if name not in RELATIONS]
+    if unknown:
+        errors['expand'] = (
+            f'Unknown relations: {", ".join(unknown)}. '
+            f'Choose from {", ".join(RELATIONS)}.'
+        )
+    if errors:
+        raise ValidationError(errors)
+    if not fields:
+        return None
+
+    return Fieldset(
+        fields=set(fields) | set(expand),
+        collapsed={
+            name for name in fields if name in RELATIONS
+            and name not in expand
+        },
+    )
+
+
+def narrow(queryset, fieldset):
+    """Load only the columns and relations a fieldset renders."""
+    if fieldset is None:
+        return queryset.defer('search_vector').select_related(
+            'image',
+        ).prefetch_related(
+            'tags',
+            'ingredients',
+        )
+
+    columns = {'id'}
+    for name in fieldset.fields - set(RELATIONS):
+        columns.update(SOURCES.get(name, [name]))
+    queryset = queryset.only(*columns)
+    if 'image' in columns:
+        queryset = queryset.select_related('image')
+
+    for name, model in RELATIONS.items():
+        if name in fieldset.collapsed:
+            queryset = queryset.prefetch_related(
+                Prefetch(name, queryset=model.objects.only('id')),
+            )
+        elif name in fieldset.fields:
+            queryset = queryset.prefetch_related(name)
+    return queryset
@@ -0,0 +1,209 @@
+"""
+Recipe image uploads with content-addressed storage.
+
+Uploads stream to a temporary file while being hashed, and are stored
+under their SHA-256, so identical images are kept once however often
+they are uploaded. Thumbnails are rendered by a process pool after the
+upload commits; the generate_thumbnails command fills in any that are
+missing, e.g. after a restart dropped queued work.
+"""
+import hashlib
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, UnidentifiedImageError
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import (
+    SkipFile,
+    TemporaryFileUploadHandler,
+)
+from django.db import IntegrityError, connections, transaction
+from django.http.multipartparser import (
+    MultiPartParser as DjangoMultiPartParser,
+    MultiPartParserError,
+)
+
+from rest_framework.exceptions import ParseError, ValidationError
+from rest_framework.parsers import DataAndFiles, MultiPartParser
+
+from core import executors
+from core.models import Recipe, RecipeImage
+from recipe import thumbnails
+from recipe.caching import invalidate_user
+
+
+logger = logging.getLogger(__name__)
+
+# Pillow formats accepted for upload and their file extensions.
+FORMATS = {
+    'JPEG': '.jpg',
+    'PNG': '.png',
+    'GIF': '.gif',
+    'WEBP': '.webp',
+}
+
+
+class HashingFileUploadHandler(TemporaryFileUploadHandler):
+    """Stream uploads to a temporary file, hashing them as they arrive."""
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.sha256 = hashlib.sha256()
+        self.too_large = False
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > settings.RECIPE_IMAGE_MAX_BYTES:
+            self.too_large = True
+            raise SkipFile()
+        self.sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        upload = super().file_complete(file_size)
+        upload.sha256 = self.sha256.hexdigest()
+        return upload
+
+
+class ImageUploadParser(MultiPartParser):
+    """Multipart parser writing files to disk, never to memory."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        request = parser_context['request']
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        meta = request.META.copy()
+        meta['CONTENT_TYPE'] = media_type
+        handler = HashingFileUploadHandler()
+
+        try:
+            parser = DjangoMultiPartParser(meta, stream, [handler], encoding)
+            data, files = parser.parse()
+        except MultiPartParserError as exc:
+            raise ParseError(f'Multipart form parse error - {exc}')
+        if getattr(handler, 'too_large', False):
+            raise ValidationError({'image': (
+                'Images may be at most '
+                f'{settings.RECIPE_IMAGE_MAX_BYTES} bytes.'
+            )})
+        return DataAndFiles(data, files)
+
+
+def _inspect(upload):
+    """Return the Pillow format and size of an uploaded image."""
+    try:
+        with Image.open(upload.temporary_file_path()) as image:
+            image.verify()
+            return image.format, image.size
+    except (UnidentifiedImageError, OSError, SyntaxError):
+        raise ValidationError({'image': 'Upload a valid image.'})
+
+
+def store(upload):
+    """Store an upload under its content hash and return its RecipeImage."""
+    image = RecipeImage.objects.filter(pk=upload.sha256).first()
+    if image is not None:
+        return image
+
+    image_format, (width, height) = _inspect(upload)
+    if image_format not in FORMATS:
+        raise ValidationError({
+            'image': f'Supported formats are {", ".join(FORMATS)}.',
+        })
+    name = (
+        f'images/{upload.sha256[:2]}/{upload.sha256}{FORMATS[image_format]}'
+    )
+    if not default_storage.exists(name):
+        saved = default_storage.save(name, upload)
+        if saved != name:
+            # A concurrent upload stored the same bytes first.
+            default_storage.delete(saved)
+
+    try:
+        with transaction.atomic():
+            image = RecipeImage.objects.create(
+                sha256=upload.sha256,
+                file=name,
+                width=width,
+                height=height,
+            )
+    except IntegrityError:
+        return RecipeImage.objects.get(pk=upload.sha256)
+    transaction.on_commit(lambda: schedule_thumbnails(image))
+    return image
+
+
+def _process_pool(workers):
+    """Build the thumbnail process pool."""
+    # Spawned workers share no database connections with us.
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+    )
+
+
+def get_executor():
+    """Return the thumbnail process pool, or None when it is disabled."""
+    return executors.get_executor(
+        'thumbnails',
+        'THUMBNAIL_WORKERS',
+        _process_pool,
+    )
+
+
+def save_thumbnails(sha256, names):
+    """Record rendered thumbnails and refresh responses showing them."""
+    RecipeImage.objects.filter(pk=sha256).update(thumbnails=names)
+    owners = Recipe.objects.filter(image_id=sha256).values_list(
+        'user_id',
+        flat=True,
+    ).distinct()
+    for user_id in owners:
+        invalidate_user(user_id)
+
+
+def _thumbnails_done(sha256, future, scheduler):
+    """Record the result of a pool job."""
+    try:
+        save_thumbnails(sha256, future.result())
+    except Exception:
+        logger.exception('Rendering thumbnails of %s failed', sha256)
+    finally:
+        # Callbacks normally run on the pool's own thread, whose
+        # connections nothing else closes.
+        if threading.current_thread() is not scheduler:
+            connections.close_all()
+
+
+def schedule_thumbnails(image):
+    """Render an image's thumbnails off the request path."""
+    args = (str(settings.MEDIA_ROOT), image.file.name, image.sha256)
+    executor = get_executor()
+    if executor is None:
+        save_thumbnails(image.sha256, thumbnails.render(*args))
+        return
+
+    future = executor.submit(thumbnails.render, *args)
+    scheduler = threading.current_thread()
+    future.add_done_callback(
+        lambda future: _thumbnails_done(image.sha256, future, scheduler)
+    )
+
+
+def thumbnail_urls(image, request=None):
+    """Return label -> URL of an image's generated thumbnails."""
+    if image is None:
+        return {}
+    return storage_urls(image.thumbnails, request)
+
+
+def storage_urls(names, request=None):
+    """Return label -> URL of the stored files in a label -> name dict."""
+    urls = {}
+    for label, name in names.items():
+        url = default_storage.url(name)
+        urls[label] = request.build_absolute_uri(url) if request else url
+    return urls
@@ -0,0 +1,212 @@
+"""
+Bulk import of recipes from streamed JSON or NDJSON uploads.
+"""
+import codecs
+import json
+from collections import Counter
+from itertools import islice
+
+from django.db import connection, transaction
+
+from rest_framework import serializers
+
+from core.models import Recipe, Tag, Ingredient
+from recipe import search, similarity, stats
+from recipe.caching import invalidate_user
+
+
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+
+# Rows validated and written per transaction.
+CHUNK_SIZE = 500
+
+# Bytes read from the upload at a time when decoding a JSON array.
+READ_SIZE = 64 * 1024
+
+# Per-row errors kept in the response, so bad uploads stay bounded too.
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportFormatError(ValueError):
+    """Raised when an upload can not be decoded any further."""
+
+    def __init__(self, message, row):
+        super().__init__(message)
+        self.row = row
+
+
+def iter_ndjson(stream):
+    """Yield (row, record) pairs from a newline delimited JSON stream.
+
+    Lines that are not valid JSON yield a ValidationError as the record,
+    so they are reported without stopping the import.
+    """
+    row = 0
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            record = serializers.ValidationError(f'Invalid JSON: {exc}')
+        yield row, record
+        row += 1
+
+
+def iter_json_array(stream):
+    """Yield (row, record) pairs from a stream holding one JSON array.
+
+    The array is decoded incrementally, so only the current record and one
+    read buffer are held in memory.
+    """
+    decoder = json.JSONDecoder()
+    reader = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    eof = False
+    row = 0
+
+    def fill():
+        nonlocal buffer, eof
+        chunk = stream.read(READ_SIZE)
+        if not chunk:
+            eof = True
+        buffer += reader.decode(chunk or b'', final=eof)
+
+    def skip_whitespace():
+        nonlocal buffer
+        while True:
+            buffer = buffer.lstrip()
+            if buffer or eof:
+                return
+            fill()
+
+    skip_whitespace()
+    if not buffer.startswith('['):
+        raise ImportFormatError('Expected a JSON array.', row)
+    buffer = buffer[1:]
+
+    skip_whitespace()
+    if buffer.startswith(']'):
+        return
+
+    while True:
+        skip_whitespace()
+        while True:
+            try:
+                record, end = decoder.raw_decode(buffer)
+                break
+            except ValueError as exc:
+                if eof:
+                    raise ImportFormatError(f'Invalid JSON: {exc}', row)
+                fill()
+        buffer = buffer[end:]
+        yield row, record
+        row += 1
+
+        skip_whitespace()
+        if buffer.startswith(','):
+            buffer = buffer[1:]
+        elif buffer.startswith(']'):
+            return
+        else:
+            raise ImportFormatError('Expected "," or "]".', row)
+
+
+def _create_recipes(recipes):
+    """Insert recipes and make sure each one has its primary key set."""
+    if connection.features.can_return_rows_from_bulk_insert:
+        return Recipe.objects.bulk_create(recipes)
+
+    # Raw saves tell the signal handlers to leave the work to write_chunk.
+    for recipe in recipes:
+        recipe.save_base(raw=True)
+    return recipes
+
+
+def _link(recipes, rows, field, model, user):
+    """Bulk insert the through rows linking recipes to named objects."""
+    names = [item['name'] for row in rows for item in row.get(field, [])]
+    objs = model.objects.get_or_create_named(user, names)
+    through = getattr(Recipe, field).through
+    target = f'{model._meta.model_name}_id'
+    through.objects.bulk_create(
+        [
+            through(recipe_id=recipe.id, **{target: objs[name].id})
+            for recipe, row in zip(recipes, rows)
+            for name in dict.fromkeys(
+                item['name'] for item in row.get(field, [])
+            )
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def write_chunk(user, rows):
+    """Write one chunk of validated rows with a fixed number of queries."""
+    with transaction.atomic():
+        recipes = _create_recipes([
+            Recipe(
+                user=user,
+                **{
+                    key: value for key, value in row.items()
+                    if key not in ('tags', 'ingredients')
+                },
+            )
+            for row in rows
+        ])
+        _link(recipes, rows, 'tags', Tag, user)
+        _link(recipes, rows, 'ingredients', Ingredient, user)
+        # Bulk inserts send no signals, so do their work here.
+        invalidate_user(user.pk)
+        search.schedule_update(recipe.id for recipe in recipes)
+        similarity.schedule_update(recipe.id for recipe in recipes)
+        delta = Counter()
+        for recipe in recipes:
+            delta.update(stats.row_delta(stats.recipe_values(recipe)))
+        stats.apply_delta(user.pk, delta)
+
+
+def _validate_and_write(chunk, serializer, result):
+    """Validate one chunk of records and write the valid ones."""
+    valid = []
+    for row, record in chunk:
+        try:
+            if isinstance(record, serializers.ValidationError):
+                raise record
+            if not isinstance(record, dict):
+                raise serializers.ValidationError('Expected a JSON object.')
+            valid.append(serializer.run_validation(record))
+        except serializers.ValidationError as exc:
+            result['failed'] += 1
+            if len(result['errors']) < MAX_REPORTED_ERRORS:
+                result['errors'].append({'row': row, 'errors': exc.detail})
+
+    if valid:
+        write_chunk(serializer.context['request'].user, valid)
+        result['created'] += len(valid)
+
+
+def import_recipes(records, serializer):
+    """Validate and write records chunk by chunk, collecting row errors.
+
+    Returns a summary with the number of created and failed rows. When the
+    upload can not be decoded any further, the rows read so far are still
+    written and the ImportFormatError is re-raised with the summary
+    attached as `exc.result`.
+    """
+    result = {'created': 0, 'failed': 0, 'errors': []}
+    records = iter(records)
+
+    while True:
+        chunk = []
+        try:
+            chunk.extend(islice(records, CHUNK_SIZE))
+        except ImportFormatError as exc:
+            _validate_and_write(chunk, serializer, result)
+            exc.result = result
+            raise
+
+        if not chunk:
+            return result
+        _validate_and_write(chunk, serializer, result)
@@ -0,0 +1,168 @@
+"""
+Meal plans built from a user's recipes and body metrics.
+
+Candidates are narrowed in the database to the recipes closest to the
+per-meal calorie target, then plans are scored with NumPy over whole
+arrays of candidate combinations. The search does a fixed amount of work
+(SAMPLES random combinations plus SWAP_ROUNDS of single-slot swaps), so
+its cost does not grow with the size of the catalog.
+
+The daily budget is a hard limit: combinations over it are never
+preferred, and a day that still ends up over it drops its most expensive
+meals until it fits.
+"""
+import numpy as np
+
+from django.db.models import F
+from django.db.models.functions import Abs
+
+from core.models import Recipe
+
+
+# Multipliers applied to the basal metabolic rate.
+ACTIVITY_FACTORS = {
+    'sedentary': 1.2,
+    'light': 1.375,
+    'moderate': 1.55,
+    'active': 1.725,
+    'very_active': 1.9,
+}
+
+# Bounds of a daily calorie target, given or computed.
+MIN_CALORIES = 500
+MAX_CALORIES = 10000
+
+CANDIDATE_LIMIT = 2000
+SAMPLES = 4096
+SWAP_ROUNDS = 3
+
+# Penalty added to the relative calorie error of a day.
+DUPLICATE_PENALTY = 100.0
+
+
+def calorie_target(user, activity='sedentary'):
+    """Return a user's daily calorie target, or None without metrics.
+
+    Uses the Mifflin-St Jeor equation with weight in kg and height in cm.
+    Users have no recorded sex, so the constant is the midpoint of the
+    male (+5) and female (-161) values.
+    """
+    if None in (user.age, user.weight, user.height):
+        return None
+    bmr = 10 * user.weight + 6.25 * user.height - 5 * user.age - 78
+    return round(bmr * ACTIVITY_FACTORS[activity])
+
+
+def load_candidates(user, meal_calories, budget=None, max_time=None):
+    """Return ids, calories, prices (cents) and times of the candidates."""
+    queryset = Recipe.objects.filter(user=user, calories__gt=0)
+    if budget is not None:
+        queryset = queryset.filter(price__lte=budget)
+    if max_time is not None:
+        queryset = queryset.filter(time_minutes__lte=max_time)
+    rows = list(
+        queryset.order_by(Abs(F('calories') - meal_calories), 'id')
+        .values_list('id', 'calories', 'price', 'time_minutes')
+        [:CANDIDATE_LIMIT]
+    )
+    if not rows:
+        empty = np.empty(0)
+        return empty.astype(np.int64), empty, empty, empty
+    ids, calories, prices, times = zip(*rows)
+    return (
+        np.array(ids, dtype=np.int64),
+        np.array(calories, dtype=np.float64),
+        np.array([round(price * 100) for price in prices], dtype=np.int64),
+        np.array(times, dtype=np.float64),
+    )
+
+
+class DayScorer:
+    """Score arrays of recipe combinations for one day."""
+
+    def __init__(self, calories, prices, target, budget=None):
+        # prices and budget are in cents.
+        self.calories = calories
+        self.prices = prices
+        self.target = target
+        self.budget = budget
+
+    def __call__(self, combos):
+        """Return a score per row of combos, lower is better."""
+        total = self.calories[combos].sum(axis=1)
+        score = np.abs(total - self.target) / self.target
+        if self.budget is not None:
+            over = self.prices[combos].sum(axis=1) > self.budget
+            score[over] = np.inf
+        if combos.shape[1] > 1:
+            ordered = np.sort(combos, axis=1)
+            repeats = (ordered[:, 1:] == ordered[:, :-1]).any(axis=1)
+            score += repeats * DUPLICATE_PENALTY
+        return score
+
+
+def plan_day(score, pool, meals, rng):
+    """Pick meals indexes from pool minimising score."""
+    combos = pool[rng.integers(len(pool), size=(SAMPLES, meals))]
+    scores = score(combos)
+    best = combos[scores.argmin()]
+    best_score = scores.min()
+    for _ in range(SWAP_ROUNDS):
+        improved = False
+        for slot in range(meals):
+            trials = np.repeat(best[np.newaxis, :], len(pool), axis=0)
+            trials[:, slot] = pool
+            scores = score(trials)
+            if scores.min() < best_score:
+                best = trials[scores.argmin()]
+                best_score = scores.min()
+                improved = True
+        if not improved:
+            break
+    return best
+
+
+def within_budget(chosen, prices, budget):
+    """Drop the most expensive of chosen until their prices fit budget."""
+    keep = np.ones(len(chosen), dtype=bool)
+    total = prices[chosen].sum()
+    for index in np.argsort(-prices[chosen], kind='stable'):
+        if total <= budget:
+            break
+        keep[index] = False
+        total -= prices[chosen[index]]
+    return chosen[keep]
+
+
+def generate(user, target, days=1, meals=3, budget=None, max_time=None,
+             seed=None):
+    """Return a list of recipe id lists, one per day.
+
+    A day has fewer meals when no combination of meals fits the budget.
+    """
+    ids, calories, prices, _ = load_candidates(
+        user,
+        target / meals,
+        budget=budget,
+        max_time=max_time,
+    )
+    if not len(ids):
+        return []
+
+    meals = min(meals, len(ids))
+    if budget is not None:
+        budget = round(budget * 100)
+    score = DayScorer(calories, prices, target, budget=budget)
+    rng = np.random.default_rng(user.pk if seed is None else seed)
+    available = np.ones(len(ids), dtype=bool)
+    plan = []
+    for _ in range(days):
+        # Prefer recipes not used on earlier days while enough remain.
+        if available.sum() < meals:
+            available[:] = True
+        chosen = plan_day(score, np.flatnonzero(available), meals, rng)
+        if budget is not None:
+            chosen = within_budget(chosen, prices, budget)
+        available[chosen] = False
+        plan.append(ids[chosen].tolist())
+    return plan
@@ -0,0 +1,102 @@
+"""
+Full-text search over recipes.
+
+On PostgreSQL recipes keep a weighted `search_vector` built from the
+title, description and tag and ingredient names, served by a GIN index.
+Other databases fall back to case-insensitive substring matching.
+"""
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+)
+from django.db import connection, transaction
+from django.db.models import (
+    Case,
+    Exists,
+    F,
+    FloatField,
+    OuterRef,
+    Q,
+    Subquery,
+    Value,
+    When,
+)
+
+from core.models import Recipe, Tag, Ingredient
+
+
+SEARCH_CONFIG = 'english'
+
+
+def is_supported():
+    """Return whether the database maintains search vectors."""
+    return connection.vendor == 'postgresql'
+
+
+def _names(model):
+    """Return a subquery joining the names linked to the outer recipe."""
+    return Subquery(
+        model.objects.filter(recipe=OuterRef('pk'))
+        .values('recipe')
+        .annotate(names=StringAgg('name', ' '))
+        .values('names')
+    )
+
+
+def update_search_vectors(queryset):
+    """Rebuild the search vector of every recipe in a queryset."""
+    if not is_supported():
+        return
+
+    queryset.update(search_vector=(
+        SearchVector('title', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='B', config=SEARCH_CONFIG)
+        + SearchVector(_names(Tag), weight='C', config=SEARCH_CONFIG)
+        + SearchVector(_names(Ingredient), weight='C', config=SEARCH_CONFIG)
+    ))
+
+
+def schedule_update(recipe_ids):
+    """Rebuild search vectors for recipe_ids once the transaction commits."""
+    if not is_supported() or not recipe_ids:
+        return
+
+    recipe_ids = list(recipe_ids)
+    transaction.on_commit(lambda: update_search_vectors(
+        Recipe.objects.filter(id__in=recipe_ids)
+    ))
+
+
+def _linked(model, terms):
+    """Return an EXISTS matching recipes linked to a name containing terms."""
+    return Exists(model.objects.filter(
+        recipe=OuterRef('pk'),
+        name__icontains=terms,
+    ))
+
+
+def search(queryset, terms):
+    """Filter a recipe queryset by terms and annotate a `rank`."""
+    if is_supported():
+        query = SearchQuery(
+            terms,
+            config=SEARCH_CONFIG,
+            search_type='websearch',
+        )
+        return queryset.filter(search_vector=query).annotate(
+            rank=SearchRank(F('search_vector'), query),
+        )
+
+    title = Q(title__icontains=terms)
+    description = Q(description__icontains=terms)
+    linked = Q(_linked(Tag, terms)) | Q(_linked(Ingredient, terms))
+    return queryset.filter(title | description | linked).annotate(
+        rank=Case(
+            When(title, then=Value(1.0)),
+            When(description, then=Value(0.4)),
+            default=Value(0.2),
+            output_field=FloatField(),
+        ),
+    )
@@ -1,12 +1,43 @@
 """
 serializers for recipe APIs
 """
+from decimal import Decimal
+
+from django.db import transaction
+
 from rest_framework import serializers
 
-from core.models import Recipe, Tag, Ingredient
+from core.metrics import TimedSerializerMixin
+from core.models import (
+    Recipe,
+    RecipeImage,
+    RecipeStats,
+    Tag,
+    Ingredient,
+)
+from recipe import images
+from recipe.meal_plan import ACTIVITY_FACTORS, MAX_CALORIES, MIN_CALORIES
+
+
+class RecipeAttrSerializer(TimedSerializerMixin,
+                           serializers.ModelSerializer):
+    """Base serializer for user owned recipe attributes."""
+
+    def validate_name(self, value):
+        """Reject renaming to a name the user already has."""
+        if self.instance is not None:
+            duplicates = self.Meta.model.objects.filter(
+                user=self.instance.user,
+                name=value,
+            ).exclude(id=self.instance.id)
+            if duplicates.exists():
+                raise serializers.ValidationError(
+                    'An item with this name already exists.'
+                )
+        return value
 
 
-class IngredientSerializer(serializers.ModelSerializer):
+class IngredientSerializer(RecipeAttrSerializer):
     """Serializer for Ingredients."""
 
     class Meta:
@@ -15,7 +46,7 @@ class IngredientSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(RecipeAttrSerializer):
     """Serializer for tags"""
 
     class Meta:
@@ -24,39 +55,67 @@ class TagSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
-class RecipeSerializer(serializers.ModelSerializer):
+class SparseFieldsetMixin:
+    """Trim fields to the Fieldset passed in the serializer context."""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fieldset = self.context.get('fieldset')
+        if fieldset is None:
+            return fields
+        for name in list(fields):
+            if name not in fieldset.fields:
+                del fields[name]
+        for name in fieldset.collapsed:
+            fields[name] = serializers.PrimaryKeyRelatedField(
+                many=True,
+                read_only=True,
+            )
+        return fields
+
+
+class RecipeSerializer(TimedSerializerMixin,
+                       SparseFieldsetMixin,
+                       serializers.ModelSerializer):
     """Serializer for Recipes."""
     tags = TagSerializer(many=True, required=False)
     ingredients = IngredientSerializer(many=True, required=False)
+    thumbnails = serializers.SerializerMethodField()
 
     class Meta:
         model = Recipe
         fields = [
             'id', 'title', 'time_minutes', 'price', 'link', 'tags',
-            'ingredients','calories'
+            'ingredients','calories', 'thumbnails'
         ]
         read_only_fields = ['id']
 
+    def get_thumbnails(self, obj) -> dict:
+        return images.thumbnail_urls(obj.image, self.context.get('request'))
+
+    def _get_or_create_objects(self, model, items, related_manager):
+        """Bulk get or create named objects and link them to the recipe."""
+        auth_user = self.context['request'].user
+        objs = model.objects.get_or_create_named(
+            auth_user,
+            (item['name'] for item in items),
+        )
+        if objs:
+            related_manager.add(*objs.values())
+
     def _get_or_create_tags(self, tags, recipe):
         """Handle getting or creating tags as needed"""
-        auth_user = self.context["request"].user
-        for tag in tags:
-            tag_obj, created = Tag.objects.get_or_create(
-                user=auth_user,
-                **tag,
-            )
-            recipe.tags.add(tag_obj)
+        self._get_or_create_objects(Tag, tags, recipe.tags)
 
     def _get_or_create_ingredients(self, ingredients, recipe):
         """Handle getting or creating ingredients as needed"""
-        auth_user = self.context['request'].user
-        for ingredient in ingredients:
-            ingredient_obj, created = Ingredient.objects.get_or_create(
-                user=auth_user,
-                **ingredient,
-            )
-            recipe.ingredients.add(ingredient_obj)
+        self._get_or_create_objects(
+            Ingredient,
+            ingredients,
+            recipe.ingredients,
+        )
 
+    @transaction.atomic
     def create(self, validated_data):
         """Create a recipe."""
         tags = validated_data.pop('tags', [])
@@ -66,6 +125,7 @@ class RecipeSerializer(serializers.ModelSerializer):
         self._get_or_create_ingredients(ingredients, recipe)
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         """Update recipe."""
         tags = validated_data.pop('tags', None)
@@ -87,6 +147,118 @@ class RecipeSerializer(serializers.ModelSerializer):
 
 class RecipeDetailSerializer(RecipeSerializer):
     """Serializer for recipe detail view."""
+    image = serializers.SerializerMethodField()
 
     class Meta(RecipeSerializer.Meta):
-        fields = RecipeSerializer.Meta.fields + ['description']
+        fields = RecipeSerializer.Meta.fields + ['description', 'image']
+
+    def get_image(self, obj) -> str:
+        if obj.image is None:
+            return None
+        url = obj.image.file.url
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+
+class RecipeImageUploadSerializer(serializers.Serializer):
+    """Serializer describing recipe image uploads."""
+    image = serializers.ImageField()
+
+
+class RecipeImageSerializer(TimedSerializerMixin,
+                            serializers.ModelSerializer):
+    """Serializer for uploaded recipe images."""
+    image = serializers.ImageField(source='file', read_only=True)
+    thumbnails = serializers.SerializerMethodField()
+
+    class Meta:
+        model = RecipeImage
+        fields = ['image', 'width', 'height', 'thumbnails']
+        read_only_fields = fields
+
+    def get_thumbnails(self, obj) -> dict:
+        return images.thumbnail_urls(obj, self.context.get('request'))
+
+
+def _average(total, count):
+    """Return total / count rounded to two places, or None without data."""
+    if not count:
+        return None
+    return round(Decimal(total) / count, 2)
+
+
+def _money(value):
+    """Return a price as a two place string, like Recipe.price, or None."""
+    if value is None:
+        return None
+    return str(Decimal(value).quantize(Decimal('0.01')))
+
+
+class RecipeStatsSerializer(TimedSerializerMixin,
+                            serializers.ModelSerializer):
+    """Serializer for a user's recipe summary."""
+    calories = serializers.SerializerMethodField()
+    time_minutes = serializers.SerializerMethodField()
+    price = serializers.SerializerMethodField()
+
+    class Meta:
+        model = RecipeStats
+        fields = ['recipe_count', 'calories', 'time_minutes', 'price']
+        read_only_fields = fields
+
+    def get_calories(self, obj) -> dict:
+        return {
+            'total': obj.calories_total,
+            'average': _average(obj.calories_total, obj.calories_count),
+        }
+
+    def get_time_minutes(self, obj) -> dict:
+        return {
+            'total': obj.time_minutes_total,
+            'average': _average(
+                obj.time_minutes_total,
+                obj.time_minutes_count,
+            ),
+        }
+
+    def get_price(self, obj) -> dict:
+        return {
+            'total': _money(obj.price_total),
+            'average': _money(
+                _average(obj.price_total, obj.recipe_count),
+            ),
+            'distribution': {
+                'under_5': obj.price_under_5,
+                '5_to_10': obj.price_under_10,
+                '10_to_20': obj.price_under_20,
+                '20_and_over': obj.price_20_and_over,
+            },
+        }
+
+
+class MealPlanQuerySerializer(serializers.Serializer):
+    """Serializer for meal plan query parameters."""
+    days = serializers.IntegerField(min_value=1, max_value=7, default=1)
+    meals = serializers.IntegerField(min_value=1, max_value=6, default=3)
+    calories = serializers.IntegerField(
+        min_value=MIN_CALORIES,
+        max_value=MAX_CALORIES,
+        required=False,
+        help_text='Daily calorie target, computed from the profile if unset.',
+    )
+    activity = serializers.ChoiceField(
+        choices=list(ACTIVITY_FACTORS),
+        default='sedentary',
+    )
+    budget = serializers.DecimalField(
+        max_digits=7,
+        decimal_places=2,
+        min_value=0,
+        required=False,
+        help_text='Maximum total price per day.',
+    )
+    max_time = serializers.IntegerField(
+        min_value=0,
+        required=False,
+        help_text='Maximum preparation time per recipe in minutes.',
+    )
@@ -0,0 +1,152 @@
+"""
+Signal handlers for the recipe app.
+"""
+from django.conf import settings
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from core.models import Recipe, RecipeStats, Tag, Ingredient
+from recipe import search, similarity, stats
+from recipe.caching import invalidate_user
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def invalidate_owner_responses(sender, instance, **kwargs):
+    """Drop the owner's cached responses when their data changes."""
+    if kwargs.get('action', 'post_').startswith('post_'):
+        invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def start_user_generation(sender, instance, created, **kwargs):
+    """Give new users a fresh response cache generation."""
+    if created:
+        invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def create_recipe_stats(sender, instance, created, raw, **kwargs):
+    """Give new users an empty stats row for deltas to update."""
+    if created and not raw:
+        RecipeStats.objects.create(user=instance)
+
+
+@receiver(post_save, sender=Recipe)
+def update_recipe_search_vector(sender, instance, raw, **kwargs):
+    """Rebuild a saved recipe's search vector."""
+    if not raw:
+        search.schedule_update([instance.pk])
+
+
+def _changed_recipe_ids(instance, action, reverse, pk_set):
+    """Return the ids of recipes whose links an m2m_changed signal changes.
+
+    Returns None for actions to ignore. A reverse clear is handled before
+    it happens, while the linked recipes can still be looked up.
+    """
+    if action in ('post_add', 'post_remove'):
+        return pk_set if reverse else [instance.pk]
+    if action == 'pre_clear' and reverse:
+        return list(instance.recipe_set.values_list('id', flat=True))
+    if action == 'post_clear' and not reverse:
+        return [instance.pk]
+    return None
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def update_linked_search_vectors(sender, instance, action, reverse, pk_set,
+                                 **kwargs):
+    """Rebuild search vectors of recipes whose tags or ingredients change."""
+    if not search.is_supported():
+        return
+
+    recipe_ids = _changed_recipe_ids(instance, action, reverse, pk_set)
+    if recipe_ids is not None:
+        search.schedule_update(recipe_ids)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def update_linked_similarity(sender, instance, action, reverse, pk_set,
+                             **kwargs):
+    """Reindex recipes whose tags or ingredients change."""
+    recipe_ids = _changed_recipe_ids(instance, action, reverse, pk_set)
+    if recipe_ids is not None:
+        similarity.schedule_update(recipe_ids)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(pre_delete, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(pre_delete, sender=Ingredient)
+def update_named_search_vectors(sender, instance, created=False, **kwargs):
+    """Rebuild search vectors of recipes using a renamed or deleted name."""
+    if created or not search.is_supported():
+        return
+
+    search.schedule_update(instance.recipe_set.values_list('id', flat=True))
+
+
+@receiver(pre_delete, sender=Tag)
+@receiver(pre_delete, sender=Ingredient)
+def update_deleted_similarity(sender, instance, **kwargs):
+    """Reindex recipes losing a deleted tag or ingredient."""
+    similarity.schedule_update(
+        instance.recipe_set.values_list('id', flat=True)
+    )
+
+
+@receiver(pre_save, sender=Recipe)
+def load_recipe_stat_values(sender, instance, raw, **kwargs):
+    """Load the stored values of a recipe saved without being fetched."""
+    loaded = getattr(instance, '_loaded_values', None) or {}
+    if raw or instance.pk is None:
+        return
+    if not loaded.keys() >= set(stats.STAT_FIELDS):
+        instance._loaded_values = (
+            Recipe.objects.filter(pk=instance.pk)
+            .values(*stats.STAT_FIELDS)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Recipe)
+def update_stats_on_save(sender, instance, created, raw, **kwargs):
+    """Apply the stats delta of a created or changed recipe."""
+    new = stats.recipe_values(instance)
+    if raw:
+        instance._loaded_values = new
+        return
+
+    old = None if created else getattr(instance, '_loaded_values', None)
+    stats.record_change(
+        old and {field: old[field] for field in stats.STAT_FIELDS},
+        new,
+    )
+    instance._loaded_values = new
+
+
+@receiver(post_delete, sender=Recipe)
+def update_stats_on_delete(sender, instance, **kwargs):
+    """Remove a deleted recipe from its owner's stats."""
+    old = getattr(instance, '_loaded_values', None)
+    if old is None:
+        old = stats.recipe_values(instance)
+    stats.record_change(
+        {field: old[field] for field in stats.STAT_FIELDS},
+        None,
+    )
@@ -0,0 +1,189 @@
+"""
+Recipe similarity over tag and ingredient sets.
+
+Each recipe with tags or ingredients keeps a fixed size MinHash signature
+(NUM_PERM 32-bit hashes) and one LSH bucket per band of the signature.
+Recipes sharing a bucket are candidates, which are then ranked by the
+fraction of equal signature hashes, an estimate of their Jaccard
+similarity. Index rows are rebuilt after commit whenever a recipe's
+tags or ingredients change.
+"""
+from collections import defaultdict
+from itertools import chain
+
+import numpy as np
+
+from django.db import connection, transaction
+from django.db.models import Count
+
+from core.models import Recipe, RecipeSignature, SimilarityBucket
+
+
+NUM_PERM = 64
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+
+CANDIDATE_LIMIT = 500
+BATCH_SIZE = 1000
+
+_rng = np.random.default_rng(13)
+_MAX = np.iinfo(np.uint64).max
+# Multiply-shift hashing: odd multipliers, 64-bit wraparound, top bits.
+_MULTIPLIERS = _rng.integers(0, _MAX, size=NUM_PERM, dtype=np.uint64) | 1
+_OFFSETS = _rng.integers(0, _MAX, size=NUM_PERM, dtype=np.uint64)
+_BAND_SALTS = _rng.integers(0, _MAX, size=BANDS, dtype=np.uint64)
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _tokens(recipe_ids):
+    """Return the tag and ingredient tokens of each recipe."""
+    tokens = defaultdict(list)
+    for kind, field, column in (
+        (0, 'tags', 'tag_id'),
+        (1, 'ingredients', 'ingredient_id'),
+    ):
+        through = getattr(Recipe, field).through
+        rows = through.objects.filter(
+            recipe_id__in=recipe_ids,
+        ).values_list('recipe_id', column)
+        for recipe_id, obj_id in rows:
+            tokens[recipe_id].append(obj_id * 2 + kind)
+    return tokens
+
+
+def signatures(token_lists):
+    """Return one MinHash signature row per non-empty token list."""
+    lengths = [len(tokens) for tokens in token_lists]
+    flat = np.fromiter(
+        chain.from_iterable(token_lists),
+        dtype=np.uint64,
+        count=sum(lengths),
+    )
+    hashed = (
+        (flat[:, np.newaxis] * _MULTIPLIERS + _OFFSETS) >> np.uint64(32)
+    ).astype(np.uint32)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    return np.minimum.reduceat(hashed, starts, axis=0)
+
+
+def band_buckets(signature_rows):
+    """Return the LSH bucket of every band of each signature row."""
+    bands = signature_rows.reshape(-1, BANDS, ROWS).astype(np.uint64)
+    buckets = np.tile(_BAND_SALTS, (len(bands), 1))
+    for row in range(ROWS):
+        buckets = (buckets ^ bands[:, :, row]) * _MIX
+    return buckets.view(np.int64)
+
+
+def update_index(recipe_ids):
+    """Rebuild the signatures and buckets of recipe_ids."""
+    recipe_ids = list(recipe_ids)
+    owners = dict(
+        Recipe.objects.filter(id__in=recipe_ids).values_list('id', 'user_id')
+    )
+    tokens = _tokens(list(owners))
+    indexed = [recipe_id for recipe_id in owners if tokens[recipe_id]]
+    if indexed:
+        rows = signatures([tokens[recipe_id] for recipe_id in indexed])
+        buckets = band_buckets(rows)
+
+    with transaction.atomic():
+        RecipeSignature.objects.filter(recipe_id__in=recipe_ids).delete()
+        SimilarityBucket.objects.filter(recipe_id__in=recipe_ids).delete()
+        if not indexed:
+            return
+        RecipeSignature.objects.bulk_create(
+            [
+                RecipeSignature(recipe_id=recipe_id, signature=row.tobytes())
+                for recipe_id, row in zip(indexed, rows)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        SimilarityBucket.objects.bulk_create(
+            [
+                SimilarityBucket(
+                    user_id=owners[recipe_id],
+                    recipe_id=recipe_id,
+                    bucket=bucket,
+                )
+                for recipe_id, recipe_buckets in zip(indexed, buckets.tolist())
+                for bucket in recipe_buckets
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+
+def schedule_update(recipe_ids):
+    """Rebuild the index for recipe_ids once the transaction commits."""
+    recipe_ids = list(recipe_ids)
+    if recipe_ids:
+        transaction.on_commit(lambda: update_index(recipe_ids))
+
+
+def _decode(signature):
+    """Return a stored signature as an array."""
+    return np.frombuffer(bytes(signature), dtype=np.uint32)
+
+
+def similar(recipe, limit=10):
+    """Return (recipe id, similarity) pairs of the recipes most like recipe.
+
+    Only recipes of the same owner that share an LSH bucket are compared.
+    """
+    stored = RecipeSignature.objects.filter(recipe=recipe).values_list(
+        'signature',
+        flat=True,
+    ).first()
+    if stored is None:
+        return []
+
+    signature = _decode(stored)
+    candidates = (
+        SimilarityBucket.objects.filter(
+            user_id=recipe.user_id,
+            bucket__in=band_buckets(signature).ravel().tolist(),
+        )
+        .exclude(recipe=recipe)
+        .values('recipe')
+        .annotate(shared=Count('id'))
+        .order_by('-shared', '-recipe')
+        .values_list('recipe', flat=True)[:CANDIDATE_LIMIT]
+    )
+    rows = list(RecipeSignature.objects.filter(
+        recipe_id__in=list(candidates),
+    ).values_list('recipe_id', 'signature'))
+    if not rows:
+        return []
+
+    ids = np.array([recipe_id for recipe_id, _ in rows])
+    matrix = np.stack([_decode(stored) for _, stored in rows])
+    scores = (matrix == signature).mean(axis=1)
+    order = np.lexsort((-ids, -scores))[:limit]
+    return [(int(ids[i]), float(scores[i])) for i in order]
+
+
+def index_size():
+    """Return the indexed recipe count and stored bytes per recipe.
+
+    On PostgreSQL this is the on-disk size of both tables with their
+    indexes, elsewhere the size of the signature and bucket values.
+    """
+    count = RecipeSignature.objects.count()
+    if not count:
+        return 0, 0
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT pg_total_relation_size(%s) '
+                '+ pg_total_relation_size(%s)',
+                [
+                    RecipeSignature._meta.db_table,
+                    SimilarityBucket._meta.db_table,
+                ],
+            )
+            total = cursor.fetchone()[0]
+    else:
+        total = count * (NUM_PERM * 4) + (
+            SimilarityBucket.objects.count() * 8
+        )
+    return count, total / count
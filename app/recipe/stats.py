@@ -0,0 +1,110 @@
+"""
+Incrementally maintained per-user recipe statistics.
+
+Every recipe write applies a delta to the owner's RecipeStats row instead
+of recomputing aggregates, so reading the stats is a single row lookup.
+The `rebuild_recipe_stats` command recomputes the rows in bulk.
+"""
+from collections import Counter
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+
+from core.models import RecipeStats
+
+
+STAT_FIELDS = ('user_id', 'calories', 'price', 'time_minutes')
+
+# Upper price bound and counter field for each price bucket.
+PRICE_BUCKETS = [
+    (Decimal('5'), 'price_under_5'),
+    (Decimal('10'), 'price_under_10'),
+    (Decimal('20'), 'price_under_20'),
+    (None, 'price_20_and_over'),
+]
+
+
+def price_bucket(price):
+    """Return the counter field for a price."""
+    for bound, field in PRICE_BUCKETS:
+        if bound is None or price < bound:
+            return field
+
+
+def recipe_values(recipe):
+    """Return the values of a recipe that feed the stats."""
+    return {field: getattr(recipe, field) for field in STAT_FIELDS}
+
+
+def row_delta(values, sign=1):
+    """Return the counter changes for adding (or removing) one recipe."""
+    delta = Counter({'recipe_count': sign})
+    if values['calories'] is not None:
+        delta['calories_count'] += sign
+        delta['calories_total'] += sign * values['calories']
+    if values['time_minutes'] is not None:
+        delta['time_minutes_count'] += sign
+        delta['time_minutes_total'] += sign * values['time_minutes']
+    price = Decimal(values['price'])
+    delta['price_total'] += sign * price
+    delta[price_bucket(price)] += sign
+    return delta
+
+
+def apply_delta(user_id, delta):
+    """Add counter changes to a user's stats row, creating it if needed."""
+    changes = {
+        field: F(field) + value for field, value in delta.items() if value
+    }
+    if not changes:
+        return
+
+    if RecipeStats.objects.filter(user_id=user_id).update(**changes):
+        return
+    # Without a row there is nothing to take recipes away from, e.g. while
+    # the owner is being deleted.
+    if delta['recipe_count'] <= 0:
+        return
+    try:
+        with transaction.atomic():
+            RecipeStats.objects.create(user_id=user_id)
+    except IntegrityError:
+        pass
+    RecipeStats.objects.filter(user_id=user_id).update(**changes)
+
+
+def record_change(old, new):
+    """Apply the stats change between two recipe value dicts.
+
+    Either side may be None for a created or deleted recipe.
+    """
+    deltas = {}
+    for values, sign in ((old, -1), (new, 1)):
+        if values is not None:
+            user_deltas = deltas.setdefault(values['user_id'], Counter())
+            user_deltas.update(row_delta(values, sign))
+    for user_id, delta in deltas.items():
+        apply_delta(user_id, delta)
+
+
+def stats_annotations():
+    """Return aggregates computing stats from a Recipe queryset."""
+    annotations = {
+        'recipe_count': Count('id'),
+        'calories_count': Count('calories'),
+        'calories_total': Sum('calories'),
+        'time_minutes_count': Count('time_minutes'),
+        'time_minutes_total': Sum('time_minutes'),
+        'price_total': Sum('price'),
+    }
+    lower = None
+    for bound, field in PRICE_BUCKETS:
+        condition = Q()
+        if lower is not None:
+            condition &= Q(price__gte=lower)
+        if bound is not None:
+            condition &= Q(price__lt=bound)
+        annotations[field] = Count('id', filter=condition)
+        lower = bound
+    return annotations
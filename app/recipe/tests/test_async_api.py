@@ -0,0 +1,192 @@
+"""
+Tests for the recipe and user APIs served by the ASGI application.
+"""
+import json
+from decimal import Decimal
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core import signals
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.test import TestCase, override_settings
+from django.urls import resolve, reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from app.asgi import application
+from core.models import Recipe, Tag
+
+
+RECIPES_URL = reverse('recipe:recipe-list')
+EXPORT_URL = reverse('recipe:recipe-export')
+TAGS_URL = reverse('recipe:tag-list')
+ME_URL = reverse('user:me')
+
+
+def detail_url(recipe_id):
+    """Create and return a recipe detail URL."""
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+def create_user(email='user@example.com', password='pass123'):
+    """Create and return a user."""
+    return get_user_model().objects.create_user(email, password)
+
+
+def create_recipe(user, **params):
+    """Create and return a sample recipe."""
+    defaults = {
+        'title': 'Sample recipe',
+        'time_minutes': 10,
+        'price': Decimal('5.00'),
+    }
+    defaults.update(params)
+    return Recipe.objects.create(user=user, **defaults)
+
+
+@override_settings(ROOT_URLCONF='app.urls_async', ASYNC_VIEW_WORKERS=0)
+class AsyncReadApiTests(TestCase):
+    """Test the async read paths."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.recipe = create_recipe(self.user)
+        Tag.objects.create(user=self.user, name='Vegan')
+        token = Token.objects.create(user=self.user)
+        self.auth = {'HTTP_AUTHORIZATION': f'Token {token.key}'}
+        # The async client takes headers without the HTTP_ prefix.
+        self.async_auth = {'AUTHORIZATION': f'Token {token.key}'}
+
+    def test_read_paths_are_async(self):
+        """Test the read paths resolve to async views."""
+        for url in (RECIPES_URL, detail_url(1), TAGS_URL, ME_URL):
+            match = resolve(url, urlconf='app.urls_async')
+            self.assertTrue(
+                match.func.__code__.co_flags & 0x80,
+                f'{url} is not async',
+            )
+        self.assertEqual(reverse('recipe:recipe-list'), RECIPES_URL)
+
+    async def test_list_and_retrieve(self):
+        """Test listing and retrieving recipes asynchronously."""
+        res = await self.async_client.get(RECIPES_URL, **self.async_auth)
+        detail = await self.async_client.get(
+            detail_url(self.recipe.id),
+            **self.async_auth,
+        )
+        tags = await self.async_client.get(TAGS_URL, **self.async_auth)
+        me = await self.async_client.get(ME_URL, **self.async_auth)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [recipe['id'] for recipe in res.json()['results']],
+            [self.recipe.id],
+        )
+        self.assertEqual(detail.json()['title'], 'Sample recipe')
+        self.assertEqual(tags.json()['results'][0]['name'], 'Vegan')
+        self.assertEqual(me.json()['email'], 'user@example.com')
+
+    async def test_auth_required(self):
+        """Test the async paths still require authentication."""
+        res = await self.async_client.get(RECIPES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_writes_on_async_paths(self):
+        """Test writes to the async paths still work."""
+        res = self.client.patch(
+            detail_url(self.recipe.id),
+            {'title': 'Renamed'},
+            content_type='application/json',
+            **self.auth,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.title, 'Renamed')
+
+    async def test_server_timing(self):
+        """Test async responses report their database and render time."""
+        cache.clear()
+
+        res = await self.async_client.get(RECIPES_URL, **self.async_auth)
+
+        timing = dict(
+            entry.split(';')[:2] for entry in res['Server-Timing'].split(', ')
+        )
+        self.assertNotEqual(timing['db'], 'dur=0.00')
+        self.assertNotEqual(timing['render'], 'dur=0.00')
+
+
+@override_settings(ASYNC_VIEW_WORKERS=0)
+class ASGIApplicationTests(TestCase):
+    """Test requests driven through the ASGI application itself."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.recipe = create_recipe(self.user)
+        self.token = Token.objects.create(user=self.user)
+        # Keep the test transaction's connection open, as the test
+        # clients do.
+        signals.request_started.disconnect(close_old_connections)
+        signals.request_finished.disconnect(close_old_connections)
+        self.addCleanup(
+            signals.request_started.connect, close_old_connections,
+        )
+        self.addCleanup(
+            signals.request_finished.connect, close_old_connections,
+        )
+
+    def asgi_get(self, path):
+        """Send a GET through the ASGI application, returning messages."""
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode(),
+            'query_string': b'',
+            'root_path': '',
+            'headers': [
+                (b'host', b'testserver'),
+                (b'authorization', f'Token {self.token.key}'.encode()),
+            ],
+            'client': ('127.0.0.1', 50000),
+            'server': ('testserver', 80),
+        }
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            messages.append(message)
+
+        async_to_sync(application)(scope, receive, send)
+        return messages
+
+    def test_streaming_export(self):
+        """Test exports stream their rows through the ASGI application."""
+        start, *body = self.asgi_get(EXPORT_URL)
+
+        self.assertEqual(start['status'], status.HTTP_200_OK)
+        self.assertFalse(body[-1].get('more_body'))
+        lines = b''.join(message.get('body', b'') for message in body)
+        self.assertEqual(
+            [json.loads(line)['id'] for line in lines.splitlines()],
+            [self.recipe.id],
+        )
+
+    def test_list(self):
+        """Test regular responses are sent unchanged."""
+        start, body = self.asgi_get(RECIPES_URL)
+
+        self.assertEqual(start['status'], status.HTTP_200_OK)
+        self.assertEqual(
+            [item['id'] for item in json.loads(body['body'])['results']],
+            [self.recipe.id],
+        )
@@ -0,0 +1,123 @@
+"""
+Tests for the recipe export API.
+"""
+import csv
+import io
+import json
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import (
+    Recipe,
+    Tag,
+    Ingredient,
+)
+
+
+EXPORT_URL = reverse('recipe:recipe-export')
+
+
+def create_user(email='user@example.com', password='pass123'):
+    """Create and return a user."""
+    return get_user_model().objects.create_user(email, password)
+
+
+def create_recipe(user, **params):
+    """Create and return a sample recipe with a tag and an ingredient."""
+    defaults = {
+        'title': 'Sample recipe',
+        'time_minutes': 22,
+        'price': Decimal('5.25'),
+        'description': 'Sample description',
+    }
+    defaults.update(params)
+    recipe = Recipe.objects.create(user=user, **defaults)
+    tag, _ = Tag.objects.get_or_create(user=user, name='Dinner')
+    ingredient, _ = Ingredient.objects.get_or_create(user=user, name='Salt')
+    recipe.tags.add(tag)
+    recipe.ingredients.add(ingredient)
+    return recipe
+
+
+def content(res):
+    """Return the decoded body of a streaming response."""
+    return b''.join(res.streaming_content).decode()
+
+
+class PublicExportApiTests(TestCase):
+    """Test unauthenticated API requests."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        """Test auth is required to export recipes."""
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateExportApiTests(TestCase):
+    """Test authenticated API requests."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_export_ndjson(self):
+        """Test exporting recipes as NDJSON."""
+        recipe = create_recipe(user=self.user, title='Soup')
+        create_recipe(user=create_user(email='other@example.com'))
+
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in content(res).splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['id'], recipe.id)
+        self.assertEqual(rows[0]['title'], 'Soup')
+        self.assertEqual(rows[0]['price'], '5.25')
+        self.assertEqual(rows[0]['tags'][0]['name'], 'Dinner')
+        self.assertEqual(rows[0]['ingredients'][0]['name'], 'Salt')
+
+    def test_export_csv(self):
+        """Test exporting recipes as CSV."""
+        create_recipe(user=self.user, title='Soup, hot')
+
+        res = self.client.get(EXPORT_URL, {'export_format': 'csv'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'text/csv')
+        rows = list(csv.DictReader(io.StringIO(content(res))))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['title'], 'Soup, hot')
+        self.assertEqual(rows[0]['tags'], 'Dinner')
+        self.assertEqual(rows[0]['ingredients'], 'Salt')
+
+    def test_export_invalid_format(self):
+        """Test an unknown export format is rejected."""
+        res = self.client.get(EXPORT_URL, {'export_format': 'xml'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @patch('recipe.exporters.CHUNK_SIZE', 2)
+    def test_export_prefetches_per_chunk(self):
+        """Test tags and ingredients are fetched once per chunk."""
+        for i in range(5):
+            create_recipe(user=self.user, title=f'Recipe {i}')
+
+        with self.assertNumQueries(1 + 3 * 2):
+            res = self.client.get(EXPORT_URL)
+            lines = content(res).splitlines()
+
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(json.loads(lines[0])['title'], 'Recipe 4')
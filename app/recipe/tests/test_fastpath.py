@@ -0,0 +1,91 @@
+"""
+Tests for the values() recipe list serializer.
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, TestCase
+
+from rest_framework.renderers import JSONRenderer
+
+from core.models import Ingredient, Recipe, RecipeImage, Tag
+from recipe import fastpath, fieldsets
+from recipe.fieldsets import Fieldset
+from recipe.serializers import RecipeSerializer
+
+
+def create_recipe(user, **params):
+    """Create and return a sample recipe."""
+    defaults = {
+        'title': 'Soup',
+        'time_minutes': 20,
+        'price': Decimal('4.5'),
+        'link': 'https://example.com/soup',
+    }
+    defaults.update(params)
+    return Recipe.objects.create(user=user, **defaults)
+
+
+class FastPathTests(TestCase):
+    """Test the fast path renders exactly what RecipeSerializer does."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('fast@example.com')
+        self.request = RequestFactory().get('/api/recipe/recipes/')
+        tags = [
+            Tag.objects.create(user=self.user, name=name)
+            for name in ('Vegan', 'Quick', 'Dinner')
+        ]
+        leek = Ingredient.objects.create(user=self.user, name='Leek')
+        image = RecipeImage.objects.create(
+            sha256='a' * 64,
+            file='images/soup.jpg',
+            width=10,
+            height=10,
+            thumbnails={'small': 'thumbnails/soup-small.jpg'},
+        )
+        soup = create_recipe(self.user, calories=300, image=image)
+        soup.tags.add(*tags)
+        soup.ingredients.add(leek)
+        stew = create_recipe(self.user, title='Stew', price=Decimal('12'))
+        stew.tags.add(tags[1])
+        create_recipe(self.user, title='Water', time_minutes=None)
+
+    def assertSameOutput(self, fieldset=None):
+        """Check both serializers render the same bytes."""
+        queryset = fieldsets.narrow(
+            Recipe.objects.filter(user=self.user),
+            fieldset,
+        ).order_by('-id')
+        expected = RecipeSerializer(
+            queryset,
+            many=True,
+            context={'request': self.request, 'fieldset': fieldset},
+        ).data
+
+        actual = fastpath.serialize(
+            fastpath.rows(queryset, fieldset),
+            self.request,
+            fieldset=fieldset,
+        )
+
+        renderer = JSONRenderer()
+        self.assertEqual(renderer.render(actual), renderer.render(expected))
+
+    def test_matches_serializer(self):
+        """Test every field matches, including nulls and thumbnails."""
+        self.assertSameOutput()
+
+    def test_matches_serializer_with_fieldset(self):
+        """Test sparse fieldsets and collapsed relations match."""
+        self.assertSameOutput(Fieldset(
+            fields={'id', 'price', 'tags', 'ingredients', 'thumbnails'},
+            collapsed={'tags'},
+        ))
+
+    def test_relations_batched(self):
+        """Test one query per relation whatever the number of recipes."""
+        rows = list(fastpath.rows(Recipe.objects.filter(user=self.user)))
+
+        with self.assertNumQueries(2):
+            fastpath.serialize(rows, self.request)
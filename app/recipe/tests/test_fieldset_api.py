@@ -0,0 +1,134 @@
+"""
+Tests for sparse fieldsets on the recipe APIs.
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Ingredient, Recipe, Tag
+
+
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+def detail_url(recipe_id):
+    """Create and return a recipe detail URL."""
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+def create_recipe(user, **params):
+    """Create and return a recipe with a tag and an ingredient."""
+    defaults = {
+        'title': 'Soup',
+        'time_minutes': 20,
+        'calories': 300,
+        'price': Decimal('4.50'),
+        'description': 'Hot soup',
+    }
+    defaults.update(params)
+    recipe = Recipe.objects.create(user=user, **defaults)
+    recipe.tags.add(Tag.objects.create(user=user, name='Vegan'))
+    recipe.ingredients.add(Ingredient.objects.create(user=user, name='Leek'))
+    return recipe
+
+
+class FieldsetApiTests(TestCase):
+    """Test ?fields= and ?expand= on recipe endpoints."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'fields@example.com',
+            'testpass123',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.recipe = create_recipe(self.user)
+
+    def test_fields_trim_list_output(self):
+        """Test only the requested fields are returned."""
+        res = self.client.get(RECIPES_URL, {'fields': 'id,title,calories'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'], [{
+            'id': self.recipe.id,
+            'title': 'Soup',
+            'calories': 300,
+        }])
+
+    def test_fields_narrow_queries(self):
+        """Test unrequested columns and relations are not queried."""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(RECIPES_URL, {'fields': 'id,title'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        sql = ' '.join(query['sql'] for query in queries)
+        self.assertNotIn('"price"', sql)
+        self.assertNotIn('core_tag', sql)
+        self.assertNotIn('core_ingredient', sql)
+        self.assertNotIn('core_recipeimage', sql)
+
+    def test_unexpanded_relations_are_ids(self):
+        """Test relations in fields but not expand are returned as IDs."""
+        tag = self.recipe.tags.get()
+
+        res = self.client.get(RECIPES_URL, {'fields': 'id,tags'})
+
+        self.assertEqual(res.data['results'][0]['tags'], [tag.id])
+
+    def test_expand_nests_relations(self):
+        """Test expanded relations are nested and implicitly included."""
+        ingredient = self.recipe.ingredients.get()
+
+        res = self.client.get(
+            RECIPES_URL,
+            {'fields': 'id,tags', 'expand': 'ingredients'},
+        )
+
+        result = res.data['results'][0]
+        self.assertEqual(set(result), {'id', 'tags', 'ingredients'})
+        self.assertEqual(
+            result['ingredients'],
+            [{'id': ingredient.id, 'name': 'Leek'}],
+        )
+
+    def test_detail_fields(self):
+        """Test detail only fields can be requested on retrieve."""
+        res = self.client.get(
+            detail_url(self.recipe.id),
+            {'fields': 'description,thumbnails'},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {
+            'description': 'Hot soup',
+            'thumbnails': {},
+        })
+
+    def test_unknown_fields_rejected(self):
+        """Test unknown fields and relations return a 400."""
+        res = self.client.get(
+            RECIPES_URL,
+            {'fields': 'id,description', 'expand': 'user'},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('description', res.data['fields'])
+        self.assertIn('user', res.data['expand'])
+
+    def test_writes_return_every_field(self):
+        """Test fields are ignored when updating a recipe."""
+        res = self.client.patch(
+            f'{detail_url(self.recipe.id)}?fields=id',
+            {'title': 'Stew'},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['title'], 'Stew')
+        self.assertIn('description', res.data)
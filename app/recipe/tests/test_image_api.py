@@ -0,0 +1,207 @@
+"""
+Tests for the recipe image upload API.
+"""
+import os
+import shutil
+import tempfile
+from decimal import Decimal
+from io import BytesIO
+from unittest.mock import patch
+
+from PIL import Image
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, RecipeImage
+from recipe import images, thumbnails
+
+
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+def image_upload_url(recipe_id):
+    """Create and return an image upload URL."""
+    return reverse('recipe:recipe-upload-image', args=[recipe_id])
+
+
+def detail_url(recipe_id):
+    """Create and return a recipe detail URL."""
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+def create_user(email='user@example.com', password='pass123'):
+    """Create and return a user."""
+    return get_user_model().objects.create_user(email, password)
+
+
+def create_recipe(user, **params):
+    """Create and return a sample recipe."""
+    defaults = {
+        'title': 'Sample recipe',
+        'time_minutes': 10,
+        'price': Decimal('5.00'),
+    }
+    defaults.update(params)
+    return Recipe.objects.create(user=user, **defaults)
+
+
+def create_image(size=(600, 400), color='red', image_format='PNG'):
+    """Create and return an uploadable image file."""
+    buffer = BytesIO()
+    Image.new('RGB', size, color).save(buffer, image_format)
+    buffer.seek(0)
+    buffer.name = f'upload.{image_format.lower()}'
+    return buffer
+
+
+class ImageUploadTests(TestCase):
+    """Tests for the image upload API."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings = override_settings(
+            MEDIA_ROOT=self.media_root,
+            THUMBNAIL_WORKERS=0,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.recipe = create_recipe(self.user)
+
+    def _upload(self, recipe, image):
+        """Upload an image to a recipe and return the response."""
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                image_upload_url(recipe.id),
+                {'image': image},
+                format='multipart',
+            )
+
+    def _stored_files(self, directory):
+        """Return the names of all files stored under a media directory."""
+        root = os.path.join(self.media_root, directory)
+        return [name for _, _, names in os.walk(root) for name in names]
+
+    def test_upload_image(self):
+        """Test uploading an image stores it with its thumbnails."""
+        res = self._upload(self.recipe, create_image())
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.recipe.refresh_from_db()
+        image = self.recipe.image
+        self.assertEqual((image.width, image.height), (600, 400))
+        self.assertTrue(image.file.name.endswith(f'{image.sha256}.png'))
+        self.assertTrue(os.path.exists(image.file.path))
+        self.assertEqual(set(image.thumbnails), set(thumbnails.SIZES))
+        with Image.open(
+            os.path.join(self.media_root, image.thumbnails['small'])
+        ) as small:
+            self.assertEqual(small.size, (160, 107))
+        self.assertIn(image.sha256, res.data['image'])
+
+    def test_identical_uploads_stored_once(self):
+        """Test uploading the same bytes twice keeps a single copy."""
+        other = create_recipe(self.user, title='Other recipe')
+
+        self._upload(self.recipe, create_image())
+        res = self._upload(other, create_image())
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(RecipeImage.objects.count(), 1)
+        self.assertEqual(len(self._stored_files('images')), 1)
+        self.assertEqual(len(self._stored_files('thumbnails')), 2)
+        other.refresh_from_db()
+        self.recipe.refresh_from_db()
+        self.assertEqual(other.image_id, self.recipe.image_id)
+
+    def test_upload_invalid_image(self):
+        """Test uploading a file that is not an image fails."""
+        upload = BytesIO(b'not an image')
+        upload.name = 'upload.png'
+
+        res = self._upload(self.recipe, upload)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(RecipeImage.objects.exists())
+        self.assertEqual(self._stored_files('images'), [])
+
+    def test_upload_missing_image(self):
+        """Test posting without an image fails."""
+        res = self.client.post(
+            image_upload_url(self.recipe.id),
+            {'title': 'x'},
+            format='multipart',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_upload_too_large(self):
+        """Test uploads over the size limit are refused."""
+        with override_settings(RECIPE_IMAGE_MAX_BYTES=100):
+            res = self._upload(self.recipe, create_image())
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('image', res.data)
+        self.assertFalse(RecipeImage.objects.exists())
+
+    def test_upload_other_users_recipe(self):
+        """Test uploading to another user's recipe is not found."""
+        recipe = create_recipe(create_user(email='other@example.com'))
+
+        res = self._upload(recipe, create_image())
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(RecipeImage.objects.exists())
+
+    def test_list_includes_thumbnail_urls(self):
+        """Test listing recipes returns their thumbnail URLs."""
+        self._upload(self.recipe, create_image())
+        create_recipe(self.user, title='No image')
+
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        by_title = {r['title']: r for r in res.data['results']}
+        self.assertEqual(by_title['No image']['thumbnails'], {})
+        urls = by_title['Sample recipe']['thumbnails']
+        self.assertEqual(set(urls), set(thumbnails.SIZES))
+        self.assertTrue(urls['small'].startswith('http://testserver/'))
+        self.assertTrue(urls['small'].endswith('-small.jpg'))
+
+    def test_list_after_thumbnails_rendered(self):
+        """Test cached lists pick up thumbnails rendered later."""
+        with patch('recipe.images.schedule_thumbnails') as schedule:
+            self._upload(self.recipe, create_image())
+        image = schedule.call_args.args[0]
+        res = self.client.get(RECIPES_URL)
+        self.assertEqual(res.data['results'][0]['thumbnails'], {})
+
+        images.save_thumbnails(image.sha256, thumbnails.render(
+            self.media_root,
+            image.file.name,
+            image.sha256,
+        ))
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(
+            set(res.data['results'][0]['thumbnails']),
+            set(thumbnails.SIZES),
+        )
+
+    def test_detail_includes_image_url(self):
+        """Test the recipe detail returns the full image URL."""
+        self._upload(self.recipe, create_image())
+
+        res = self.client.get(detail_url(self.recipe.id))
+
+        self.assertTrue(res.data['image'].startswith('http://testserver/'))
+        self.assertTrue(res.data['image'].endswith('.png'))
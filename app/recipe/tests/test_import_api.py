@@ -0,0 +1,168 @@
+"""
+Tests for the recipe bulk import API.
+"""
+import json
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import (
+    Recipe,
+    Tag,
+    Ingredient,
+)
+
+
+IMPORT_URL = reverse('recipe:recipe-bulk-import')
+
+
+def create_user(email='user@example.com', password='pass123'):
+    """Create and return a user."""
+    return get_user_model().objects.create_user(email, password)
+
+
+def recipe_payload(index, **params):
+    """Return a sample recipe payload."""
+    payload = {
+        'title': f'Recipe {index}',
+        'time_minutes': 10,
+        'price': '4.50',
+        'tags': [{'name': 'Dinner'}, {'name': f'Tag {index}'}],
+        'ingredients': [{'name': 'Salt'}],
+    }
+    payload.update(params)
+    return payload
+
+
+class PublicImportApiTests(TestCase):
+    """Test unauthenticated API requests."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        """Test auth is required to import recipes."""
+        res = self.client.post(IMPORT_URL, [], format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateImportApiTests(TestCase):
+    """Test authenticated API requests."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _post_ndjson(self, records):
+        """Post records as an NDJSON body."""
+        body = '\n'.join(
+            record if isinstance(record, str) else json.dumps(record)
+            for record in records
+        )
+        return self.client.post(
+            IMPORT_URL,
+            body,
+            content_type='application/x-ndjson',
+        )
+
+    def test_import_json_array(self):
+        """Test importing recipes from a JSON array."""
+        Tag.objects.create(user=self.user, name='Dinner')
+        payload = [recipe_payload(i) for i in range(3)]
+
+        res = self.client.post(IMPORT_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['created'], 3)
+        self.assertEqual(res.data['failed'], 0)
+        recipes = Recipe.objects.filter(user=self.user).order_by('id')
+        self.assertEqual(recipes.count(), 3)
+        self.assertEqual(recipes[0].price, Decimal('4.50'))
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 4)
+        self.assertEqual(
+            Ingredient.objects.filter(user=self.user).count(),
+            1,
+        )
+        for recipe in recipes:
+            self.assertEqual(recipe.tags.count(), 2)
+            self.assertEqual(recipe.ingredients.count(), 1)
+
+    def test_import_ndjson_reports_row_errors(self):
+        """Test invalid NDJSON rows are reported without aborting."""
+        records = [
+            recipe_payload(0),
+            recipe_payload(1, price='not a price'),
+            '{"title": ',
+            ['not', 'an', 'object'],
+            recipe_payload(4),
+        ]
+
+        res = self._post_ndjson(records)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['created'], 2)
+        self.assertEqual(res.data['failed'], 3)
+        self.assertEqual(
+            [error['row'] for error in res.data['errors']],
+            [1, 2, 3],
+        )
+        self.assertIn('price', res.data['errors'][0]['errors'])
+        titles = Recipe.objects.filter(user=self.user).values_list(
+            'title',
+            flat=True,
+        )
+        self.assertEqual(sorted(titles), ['Recipe 0', 'Recipe 4'])
+
+    def test_import_malformed_array(self):
+        """Test a truncated JSON array keeps the rows before the error."""
+        body = json.dumps([recipe_payload(0)])[:-1] + ', {"title": '
+
+        res = self.client.post(
+            IMPORT_URL,
+            body,
+            content_type='application/json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data['row'], 1)
+        self.assertEqual(res.data['created'], 1)
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 1)
+
+    def test_import_empty_array(self):
+        """Test importing an empty array creates nothing."""
+        res = self.client.post(IMPORT_URL, [], format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['created'], 0)
+
+    @patch('recipe.importers.READ_SIZE', 7)
+    def test_import_records_split_across_reads(self):
+        """Test records spanning several reads are decoded."""
+        payload = [recipe_payload(i) for i in range(5)]
+
+        res = self.client.post(IMPORT_URL, payload, format='json')
+
+        self.assertEqual(res.data['created'], 5)
+
+    @skipUnlessDBFeature('can_return_rows_from_bulk_insert')
+    @patch('recipe.importers.CHUNK_SIZE', 10)
+    def test_import_queries_per_chunk_fixed(self):
+        """Test each chunk costs the same queries whatever its size."""
+        counts = []
+        for size in (2, 10):
+            payload = [recipe_payload(i) for i in range(size)]
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.post(IMPORT_URL, payload, format='json')
+            counts.append(len(ctx.captured_queries))
+
+        self.assertEqual(counts[0], counts[1])
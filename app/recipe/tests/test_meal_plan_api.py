@@ -0,0 +1,186 @@
+"""
+Tests for the meal plan API.
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe
+from recipe import meal_plan
+
+
+MEAL_PLAN_URL = reverse('recipe:meal-plan')
+
+
+def create_user(email='user@example.com', password='pass123', **params):
+    """Create and return a user."""
+    return get_user_model().objects.create_user(email, password, **params)
+
+
+def create_recipe(user, **params):
+    """Create and return a sample recipe."""
+    defaults = {
+        'title': 'Sample recipe',
+        'time_minutes': 10,
+        'calories': 600,
+        'price': Decimal('5.00'),
+    }
+    defaults.update(params)
+    return Recipe.objects.create(user=user, **defaults)
+
+
+class CalorieTargetTests(TestCase):
+    """Test computing calorie targets from body metrics."""
+
+    def test_calorie_target(self):
+        """Test the target follows the metrics and activity level."""
+        user = create_user(age=30, weight=70, height=175)
+
+        self.assertEqual(meal_plan.calorie_target(user), 1879)
+        self.assertEqual(meal_plan.calorie_target(user, 'active'), 2701)
+
+    def test_calorie_target_needs_metrics(self):
+        """Test no target is computed without metrics."""
+        user = create_user(age=30, weight=70)
+
+        self.assertIsNone(meal_plan.calorie_target(user))
+
+
+class PublicMealPlanApiTests(TestCase):
+    """Test unauthenticated API requests."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        """Test auth is required to plan meals."""
+        res = self.client.get(MEAL_PLAN_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateMealPlanApiTests(TestCase):
+    """Test authenticated API requests."""
+
+    def setUp(self):
+        self.user = create_user(age=30, weight=70, height=175)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_plan_hits_calorie_target(self):
+        """Test the plan picks the recipes closest to the target."""
+        for calories in (200, 500, 650, 700, 1500):
+            create_recipe(self.user, calories=calories)
+
+        res = self.client.get(MEAL_PLAN_URL, {'calories': 1850})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['calorie_target'], 1850)
+        day = res.data['days'][0]
+        self.assertEqual(day['calories'], 1850)
+        self.assertEqual(
+            sorted(recipe['calories'] for recipe in day['recipes']),
+            [500, 650, 700],
+        )
+
+    def test_plan_uses_profile_target(self):
+        """Test the profile metrics set the default target."""
+        create_recipe(self.user)
+
+        res = self.client.get(MEAL_PLAN_URL, {'activity': 'moderate'})
+
+        self.assertEqual(res.data['calorie_target'], 2427)
+
+    def test_plan_requires_target(self):
+        """Test a target is required when metrics are missing."""
+        user = create_user('other@example.com')
+        self.client.force_authenticate(user)
+
+        res = self.client.get(MEAL_PLAN_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('calories', res.data)
+
+    def test_plan_respects_budget_and_time(self):
+        """Test recipes over the limits are never picked."""
+        cheap = [create_recipe(self.user, calories=600) for _ in range(3)]
+        create_recipe(self.user, calories=620, price=Decimal('30.00'))
+        create_recipe(self.user, calories=610, time_minutes=120)
+
+        res = self.client.get(MEAL_PLAN_URL, {
+            'calories': 1850,
+            'budget': '20.00',
+            'max_time': 60,
+        })
+
+        day = res.data['days'][0]
+        self.assertEqual(
+            sorted(recipe['id'] for recipe in day['recipes']),
+            [recipe.id for recipe in cheap],
+        )
+        self.assertEqual(day['price'], '15.00')
+
+    def test_plan_combination_within_budget(self):
+        """Test a day never costs more than the budget in total."""
+        for _ in range(3):
+            create_recipe(self.user, calories=600, price=Decimal('1.10'))
+        params = {'calories': 1800, 'budget': '3.00'}
+
+        res = self.client.get(MEAL_PLAN_URL, params)
+
+        day = res.data['days'][0]
+        self.assertEqual(len(day['recipes']), 2)
+        self.assertEqual(day['price'], '2.20')
+
+        snack = create_recipe(self.user, calories=300, price=Decimal('0.50'))
+
+        res = self.client.get(MEAL_PLAN_URL, params)
+
+        day = res.data['days'][0]
+        self.assertEqual(len(day['recipes']), 3)
+        self.assertIn(snack.id, [recipe['id'] for recipe in day['recipes']])
+        self.assertEqual(day['price'], '2.70')
+
+    def test_plan_rejects_implausible_profile_target(self):
+        """Test profile targets outside the allowed range are refused."""
+        for metrics in ({'age': 100, 'weight': 1, 'height': 1}, {
+            'age': 30, 'weight': 1000, 'height': 250,
+        }):
+            user = create_user(f'{metrics["weight"]}@example.com', **metrics)
+            self.client.force_authenticate(user)
+
+            res = self.client.get(MEAL_PLAN_URL)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('calories', res.data)
+
+    def test_week_plan_varies_recipes(self):
+        """Test a week plan avoids repeating recipes when it can."""
+        for index in range(30):
+            create_recipe(self.user, calories=500 + index * 10)
+        create_recipe(create_user('other@example.com'), calories=620)
+
+        res = self.client.get(MEAL_PLAN_URL, {'days': 7, 'calories': 1800})
+
+        self.assertEqual(len(res.data['days']), 7)
+        ids = [
+            recipe['id']
+            for day in res.data['days'] for recipe in day['recipes']
+        ]
+        self.assertEqual(len(ids), 21)
+        self.assertEqual(len(set(ids)), 21)
+        self.assertTrue(set(ids) <= set(
+            Recipe.objects.filter(user=self.user).values_list('id', flat=True)
+        ))
+
+    def test_plan_without_recipes(self):
+        """Test an empty plan is returned without candidates."""
+        res = self.client.get(MEAL_PLAN_URL, {'calories': 2000})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['days'], [])
@@ -0,0 +1,174 @@
+"""
+Query and latency budget benchmarks for the recipe APIs.
+"""
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import (
+    Recipe,
+    Tag,
+    Ingredient,
+)
+
+from recipe.pagination import RecipeCursorPagination
+
+
+RECIPES_URL = reverse('recipe:recipe-list')
+TAGS_URL = reverse('recipe:tag-list')
+INGREDIENTS_URL = reverse('recipe:ingredient-list')
+
+# Number of recipes seeded per user for each benchmark run.
+SEED_SIZES = [1, 10, 100]
+
+# Maximum SQL queries allowed per endpoint, independent of the seed size.
+QUERY_BUDGETS = {
+    'recipe-list': 3,
+    'recipe-detail': 3,
+    'tag-list': 1,
+    'ingredient-list': 1,
+}
+
+# Maximum wall time in seconds allowed per request at the largest seed size.
+LATENCY_BUDGET = 1.0
+
+# Requests timed per tag count when comparing filter latency, keeping the
+# fastest, and the fixed slack in seconds allowed on top of 2x growth.
+FILTER_REPEATS = 5
+FILTER_ALLOWANCE = 0.05
+
+
+def detail_url(recipe_id):
+    """Create and return a recipe detail URL."""
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+def create_user(email='user@example.com', password='pass123'):
+    """Create and return a user."""
+    return get_user_model().objects.create_user(email, password)
+
+
+def seed_user(user, size):
+    """Create `size` recipes for user, each with tags and ingredients."""
+    tags = [Tag.objects.create(user=user, name=f'Tag {i}') for i in range(5)]
+    ingredients = [
+        Ingredient.objects.create(user=user, name=f'Ingredient {i}')
+        for i in range(5)
+    ]
+    for i in range(size):
+        recipe = Recipe.objects.create(
+            user=user,
+            title=f'Recipe {i}',
+            time_minutes=10,
+            price=Decimal('5.50'),
+        )
+        recipe.tags.add(*tags)
+        recipe.ingredients.add(*ingredients)
+
+
+class QueryBudgetTests(TestCase):
+    """Test recipe endpoints run in a fixed number of queries."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def _assert_within_budget(self, name, url):
+        """Request url and check the query and latency budgets."""
+        with self.assertNumQueries(QUERY_BUDGETS[name]):
+            start = time.perf_counter()
+            res = self.client.get(url)
+            elapsed = time.perf_counter() - start
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertLess(elapsed, LATENCY_BUDGET)
+        return res
+
+    def test_endpoints_within_budget(self):
+        """Test query count does not grow with the number of recipes."""
+        for size in SEED_SIZES:
+            with self.subTest(size=size):
+                user = create_user(email=f'user{size}@example.com')
+                seed_user(user, size)
+                self.client.force_authenticate(user)
+                recipe = Recipe.objects.filter(user=user).first()
+
+                res = self._assert_within_budget('recipe-list', RECIPES_URL)
+                self.assertEqual(
+                    len(res.data['results']),
+                    min(size, RecipeCursorPagination.page_size),
+                )
+                self.assertEqual(len(res.data['results'][0]['tags']), 5)
+                self._assert_within_budget(
+                    'recipe-detail',
+                    detail_url(recipe.id),
+                )
+                self._assert_within_budget('tag-list', TAGS_URL)
+                self._assert_within_budget(
+                    'ingredient-list',
+                    INGREDIENTS_URL,
+                )
+
+
+class FilterBenchmarkTests(TestCase):
+    """Benchmark filtering recipes as tags per recipe grow."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _filter_by_all_tags(self, tags_per_recipe):
+        """Seed recipes with tags_per_recipe tags and filter by all of them.
+
+        Return the queries run and the best of FILTER_REPEATS timings.
+        """
+        Recipe.objects.all().delete()
+        Tag.objects.all().delete()
+        tags = [
+            Tag.objects.create(user=self.user, name=f'Tag {i}')
+            for i in range(tags_per_recipe)
+        ]
+        for i in range(20):
+            recipe = Recipe.objects.create(
+                user=self.user,
+                title=f'Recipe {i}',
+                price=Decimal('1.00'),
+            )
+            recipe.tags.add(*tags)
+        params = {'tags': ','.join(str(tag.id) for tag in tags)}
+
+        timings = []
+        for _ in range(FILTER_REPEATS):
+            cache.clear()
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                res = self.client.get(RECIPES_URL, params)
+                timings.append(time.perf_counter() - start)
+            self.assertEqual(len(res.data['results']), 20)
+        return [query['sql'] for query in ctx.captured_queries], min(timings)
+
+    def test_tag_filter_latency_flat(self):
+        """Test filter cost does not grow with tags per recipe."""
+        one_queries, one_time = self._filter_by_all_tags(1)
+        many_queries, many_time = self._filter_by_all_tags(50)
+
+        self.assertEqual(len(many_queries), len(one_queries))
+        for one_sql, many_sql in zip(one_queries, many_queries):
+            self.assertEqual(
+                many_sql.count('JOIN'),
+                one_sql.count('JOIN'),
+            )
+        sql = many_queries[0]
+        self.assertNotIn('DISTINCT', sql)
+        self.assertEqual(sql.count('EXISTS'), 1)
+        self.assertEqual(sql.count(' IN ('), 1)
+        self.assertLess(many_time, one_time * 2 + FILTER_ALLOWANCE)
@@ -1,10 +1,14 @@
 """
 Tests for the Recipe APIs.
 """
+import threading
 from decimal import Decimal
+from unittest import skipIf
+from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
 from django.urls import reverse
 
 from rest_framework import status
@@ -16,6 +20,7 @@ from core.models import (
     Ingredient
 )
 
+from recipe.pagination import RecipeCursorPagination
 from recipe.serializers import (
     RecipeSerializer,
     RecipeDetailSerializer,
@@ -84,7 +89,7 @@ class PrivateRecipeAPITest(TestCase):
         recipes = Recipe.objects.all().order_by('-id')
         serializer = RecipeSerializer(recipes, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_recipe_list_limited_to_user(self):
         """Test list of recipes is limited to authenticated user"""
@@ -97,7 +102,7 @@ class PrivateRecipeAPITest(TestCase):
         recipes = Recipe.objects.filter(user=self.user)
         serializer = RecipeSerializer(recipes, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_get_recipe_detail(self):
         """Test get recipe details."""
@@ -375,3 +380,164 @@ class PrivateRecipeAPITest(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(recipe.ingredients.count(), 0)
+
+    def test_create_recipe_bulk_query_count(self):
+        """Test nested tags and ingredients are created in bulk."""
+        Ingredient.objects.create(user=self.user, name='Ingredient 0')
+        payload = {
+            'title': 'Big Salad',
+            'time_minutes': 10,
+            'price': Decimal('9.00'),
+            'tags': [{'name': f'Tag {i}'} for i in range(30)],
+            'ingredients': [{'name': f'Ingredient {i}'} for i in range(30)],
+        }
+
+        with self.assertNumQueries(16):
+            res = self.client.post(RECIPES_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        recipe = Recipe.objects.get(id=res.data['id'])
+        self.assertEqual(recipe.tags.count(), 30)
+        self.assertEqual(recipe.ingredients.count(), 30)
+        self.assertEqual(Ingredient.objects.filter(user=self.user).count(), 30)
+
+    def test_create_recipe_with_duplicate_tag_names(self):
+        """Test repeated names in a payload create a single tag."""
+        payload = {
+            'title': 'Curry',
+            'time_minutes': 30,
+            'price': Decimal('6.00'),
+            'tags': [{'name': 'Spicy'}, {'name': 'Spicy'}],
+        }
+        res = self.client.post(RECIPES_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(len(res.data['tags']), 1)
+
+    def test_recipe_list_paginated_by_cursor(self):
+        """Test walking the recipe list with cursor pagination."""
+        recipes = [create_recipe(user=self.user) for _ in range(5)]
+
+        res = self.client.get(RECIPES_URL, {'page_size': 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn('count', res.data)
+        self.assertIsNone(res.data['previous'])
+        ids = [recipe['id'] for recipe in res.data['results']]
+        next_url = res.data['next']
+        while next_url:
+            with self.assertNumQueries(3):
+                res = self.client.get(next_url)
+            ids += [recipe['id'] for recipe in res.data['results']]
+            next_url = res.data['next']
+
+        self.assertEqual(ids, [recipe.id for recipe in reversed(recipes)])
+
+    def test_recipe_list_page_size_capped(self):
+        """Test the requested page size is capped."""
+        for _ in range(3):
+            create_recipe(user=self.user)
+
+        with patch.object(RecipeCursorPagination, 'max_page_size', 2):
+            res = self.client.get(RECIPES_URL, {'page_size': 1000})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 2)
+        self.assertIsNotNone(res.data['next'])
+
+    def test_filter_by_tags(self):
+        """Test filtering recipes by tags."""
+        r1 = create_recipe(user=self.user, title='Thai Vegetable Curry')
+        r2 = create_recipe(user=self.user, title='Aubergine with Tahini')
+        tag1 = Tag.objects.create(user=self.user, name='Vegan')
+        tag2 = Tag.objects.create(user=self.user, name='Vegetarian')
+        r1.tags.add(tag1)
+        r2.tags.add(tag1, tag2)
+        r3 = create_recipe(user=self.user, title='Fish and chips')
+
+        params = {'tags': f'{tag1.id},{tag2.id}'}
+        res = self.client.get(RECIPES_URL, params)
+
+        ids = [recipe['id'] for recipe in res.data['results']]
+        self.assertEqual(ids, [r2.id, r1.id])
+        self.assertNotIn(r3.id, ids)
+
+    def test_filter_by_ingredients(self):
+        """Test filtering recipes by ingredients."""
+        r1 = create_recipe(user=self.user, title='Posh Beans on Toast')
+        r2 = create_recipe(user=self.user, title='Chicken Cacciatore')
+        in1 = Ingredient.objects.create(user=self.user, name='Feta Cheese')
+        in2 = Ingredient.objects.create(user=self.user, name='Chicken')
+        r1.ingredients.add(in1)
+        r2.ingredients.add(in2)
+        create_recipe(user=self.user, title='Red Lentil Daal')
+
+        params = {'ingredients': f'{in1.id}', 'tags': ''}
+        res = self.client.get(RECIPES_URL, params)
+
+        ids = [recipe['id'] for recipe in res.data['results']]
+        self.assertEqual(ids, [r1.id])
+
+    def test_filter_invalid_ids(self):
+        """Test filtering with non numeric IDs returns an error."""
+        res = self.client.get(RECIPES_URL, {'tags': '1,abc'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@skipIf(
+    connection.vendor == 'sqlite',
+    'SQLite test databases do not support concurrent writers.',
+)
+class ConcurrentRecipeCreateTests(TransactionTestCase):
+    """Test creating recipes from parallel writers."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@example.com',
+            'testpass123',
+        )
+
+    def _create_recipe(self, index, errors):
+        """Create a recipe sharing tags with the other writers."""
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        payload = {
+            'title': f'Recipe {index}',
+            'time_minutes': 5,
+            'price': Decimal('1.00'),
+            'tags': [{'name': f'Tag {i}'} for i in range(10)],
+            'ingredients': [{'name': f'Ingredient {i}'} for i in range(10)],
+        }
+        try:
+            res = client.post(RECIPES_URL, payload, format='json')
+            if res.status_code != status.HTTP_201_CREATED:
+                errors.append(res.status_code)
+        except Exception as exc:  # noqa: B902
+            errors.append(exc)
+        finally:
+            connection.close()
+
+    def test_parallel_creates_share_tags(self):
+        """Test parallel creates never duplicate tags or ingredients."""
+        errors = []
+        threads = [
+            threading.Thread(target=self._create_recipe, args=(i, errors))
+            for i in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 8)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 10)
+        self.assertEqual(
+            Ingredient.objects.filter(user=self.user).count(),
+            10,
+        )
+        for recipe in Recipe.objects.filter(user=self.user):
+            self.assertEqual(recipe.tags.count(), 10)
+            self.assertEqual(recipe.ingredients.count(), 10)
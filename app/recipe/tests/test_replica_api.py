@@ -0,0 +1,141 @@
+"""
+Tests for reading recipe API data from replicas.
+"""
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db.models.query import QuerySet
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import routers
+from core.models import Recipe, Tag
+
+
+RECIPES_URL = reverse('recipe:recipe-list')
+TAGS_URL = reverse('recipe:tag-list')
+
+
+def detail_url(recipe_id):
+    """Create and return a recipe detail URL."""
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+def create_user(email='user@example.com', password='pass123'):
+    """Create and return a user."""
+    return get_user_model().objects.create_user(email, password)
+
+
+def create_recipe(user, **params):
+    """Create and return a sample recipe."""
+    defaults = {
+        'title': 'Sample recipe',
+        'time_minutes': 10,
+        'price': Decimal('5.00'),
+    }
+    defaults.update(params)
+    return Recipe.objects.create(user=user, **defaults)
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'])
+class ReplicaApiTests(TestCase):
+    """Test which database the recipe APIs read from."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.aliases = []
+        using = QuerySet.using
+
+        def record_using(queryset, alias):
+            if alias is None:
+                return using(queryset, alias)
+            # The test database stands in for the replica.
+            self.aliases.append(alias)
+            return using(queryset, 'default')
+
+        patcher = patch.object(QuerySet, 'using', record_using)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_list_reads_replica(self):
+        """Test listing recipes and tags reads from a replica."""
+        create_recipe(self.user)
+
+        res = self.client.get(RECIPES_URL)
+        self.client.get(TAGS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(self.aliases, ['replica_1', 'replica_1'])
+
+    def test_detail_reads_replica(self):
+        """Test retrieving a recipe reads from a replica."""
+        recipe = create_recipe(self.user)
+
+        res = self.client.get(detail_url(recipe.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.aliases, ['replica_1'])
+
+    def test_reads_after_write_use_primary(self):
+        """Test a user's reads stick to the primary after they write."""
+        recipe = create_recipe(self.user)
+
+        res = self.client.patch(detail_url(recipe.id), {'title': 'New'})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.client.get(RECIPES_URL)
+
+        self.assertEqual(set(self.aliases), {'default'})
+        self.assertTrue(routers.is_pinned(self.user.pk))
+
+    def test_pin_restarts_after_write_commits(self):
+        """Test writes pin the user again once they have committed."""
+        recipe = create_recipe(self.user)
+        titles = []
+        pin = routers.pin
+
+        def record_pin(user_id):
+            titles.append(Recipe.objects.get(pk=recipe.pk).title)
+            pin(user_id)
+
+        with patch.object(routers, 'pin', side_effect=record_pin):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.patch(detail_url(recipe.id), {'title': 'New'})
+
+        self.assertEqual(titles, ['Sample recipe', 'New'])
+
+    def test_pin_is_per_user(self):
+        """Test one user's write does not pin other users."""
+        other = create_user(email='other@example.com')
+        client = APIClient()
+        client.force_authenticate(other)
+
+        client.post(RECIPES_URL, {
+            'title': 'Other recipe',
+            'time_minutes': 5,
+            'price': Decimal('1.00'),
+        })
+        self.client.get(RECIPES_URL)
+
+        self.assertEqual(self.aliases[-1], 'replica_1')
+
+    def test_writes_from_replica_reads_go_to_primary(self):
+        """Test updating a tag saves it on the primary."""
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+
+        res = self.client.patch(
+            reverse('recipe:tag-detail', args=[tag.id]),
+            {'name': 'Vegetarian'},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        tag.refresh_from_db()
+        self.assertEqual(tag.name, 'Vegetarian')
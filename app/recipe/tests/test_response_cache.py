@@ -0,0 +1,140 @@
+"""
+Tests for the per-user recipe response cache.
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import (
+    Recipe,
+    Tag,
+)
+
+
+RECIPES_URL = reverse('recipe:recipe-list')
+TAGS_URL = reverse('recipe:tag-list')
+IMPORT_URL = reverse('recipe:recipe-bulk-import')
+
+
+def detail_url(recipe_id):
+    """Create and return a recipe detail URL."""
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+def create_user(email='user@example.com', password='pass123'):
+    """Create and return a user."""
+    return get_user_model().objects.create_user(email, password)
+
+
+def create_recipe(user, **params):
+    """Create and return a sample recipe."""
+    defaults = {
+        'title': 'Sample recipe',
+        'time_minutes': 10,
+        'price': Decimal('5.00'),
+    }
+    defaults.update(params)
+    return Recipe.objects.create(user=user, **defaults)
+
+
+class ResponseCacheTests(TestCase):
+    """Test caching recipe API responses."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_repeated_list_served_from_cache(self):
+        """Test a repeated list request runs no queries."""
+        create_recipe(user=self.user)
+        first = self.client.get(RECIPES_URL)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(RECIPES_URL)
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_conditional_get_not_modified(self):
+        """Test a matching If-None-Match returns 304."""
+        recipe = create_recipe(user=self.user)
+        res = self.client.get(detail_url(recipe.id))
+
+        with self.assertNumQueries(0):
+            res = self.client.get(
+                detail_url(recipe.id),
+                HTTP_IF_NONE_MATCH=res['ETag'],
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res.content, b'')
+
+    def test_write_invalidates_list(self):
+        """Test creating a recipe changes the cached list."""
+        res = self.client.get(RECIPES_URL)
+        etag = res['ETag']
+
+        self.client.post(
+            RECIPES_URL,
+            {'title': 'Soup', 'price': '2.00'},
+            format='json',
+        )
+        res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'][0]['title'], 'Soup')
+
+    def test_tag_rename_invalidates_recipes(self):
+        """Test renaming a tag changes cached recipe responses."""
+        recipe = create_recipe(user=self.user)
+        tag = Tag.objects.create(user=self.user, name='Lunch')
+        recipe.tags.add(tag)
+        self.client.get(detail_url(recipe.id))
+
+        tag.name = 'Dinner'
+        tag.save()
+        res = self.client.get(detail_url(recipe.id))
+
+        self.assertEqual(res.data['tags'][0]['name'], 'Dinner')
+
+    def test_m2m_change_invalidates_recipes(self):
+        """Test linking a tag changes cached recipe responses."""
+        recipe = create_recipe(user=self.user)
+        self.client.get(detail_url(recipe.id))
+
+        recipe.tags.add(Tag.objects.create(user=self.user, name='Lunch'))
+        res = self.client.get(detail_url(recipe.id))
+
+        self.assertEqual(len(res.data['tags']), 1)
+
+    def test_import_invalidates_list(self):
+        """Test bulk imports change the cached list."""
+        self.client.get(RECIPES_URL)
+
+        self.client.post(
+            IMPORT_URL,
+            [{'title': 'Imported', 'price': '1.00'}],
+            format='json',
+        )
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.data['results'][0]['title'], 'Imported')
+
+    def test_cache_limited_to_user(self):
+        """Test users never see each other's cached responses."""
+        create_recipe(user=self.user)
+        self.client.get(TAGS_URL)
+        self.client.get(RECIPES_URL)
+
+        other = create_user(email='other@example.com')
+        self.client.force_authenticate(other)
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.data['results'], [])
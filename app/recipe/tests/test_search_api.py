@@ -0,0 +1,115 @@
+"""
+Tests for recipe search.
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import (
+    Recipe,
+    Tag,
+    Ingredient,
+)
+
+
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+def create_user(email='user@example.com', password='pass123'):
+    """Create and return a user."""
+    return get_user_model().objects.create_user(email, password)
+
+
+def create_recipe(user, **params):
+    """Create and return a sample recipe."""
+    defaults = {
+        'title': 'Sample recipe',
+        'time_minutes': 10,
+        'price': Decimal('5.00'),
+    }
+    defaults.update(params)
+    return Recipe.objects.create(user=user, **defaults)
+
+
+class SearchApiTests(TestCase):
+    """Test searching recipes."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _search(self, terms, **params):
+        """Search recipes and return the result IDs."""
+        res = self.client.get(RECIPES_URL, {'search': terms, **params})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [recipe['id'] for recipe in res.data['results']]
+
+    def test_search_ranks_title_before_description(self):
+        """Test title matches rank above description matches."""
+        with self.captureOnCommitCallbacks(execute=True):
+            described = create_recipe(
+                user=self.user,
+                title='Weeknight dinner',
+                description='A quick curry with rice.',
+            )
+            titled = create_recipe(user=self.user, title='Green curry')
+            create_recipe(user=self.user, title='Pancakes')
+
+        self.assertEqual(self._search('curry'), [titled.id, described.id])
+
+    def test_search_matches_tags_and_ingredients(self):
+        """Test tag and ingredient names are searched."""
+        with self.captureOnCommitCallbacks(execute=True):
+            tagged = create_recipe(user=self.user, title='Salad')
+            tagged.tags.add(Tag.objects.create(user=self.user, name='Vegan'))
+            with_ingredient = create_recipe(user=self.user, title='Stew')
+            with_ingredient.ingredients.add(
+                Ingredient.objects.create(user=self.user, name='Lentils')
+            )
+
+        self.assertEqual(self._search('vegan'), [tagged.id])
+        self.assertEqual(self._search('lentils'), [with_ingredient.id])
+
+    def test_search_follows_tag_rename(self):
+        """Test renaming a tag updates search results."""
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe = create_recipe(user=self.user, title='Salad')
+            tag = Tag.objects.create(user=self.user, name='Lunch')
+            recipe.tags.add(tag)
+        with self.captureOnCommitCallbacks(execute=True):
+            tag.name = 'Brunch'
+            tag.save()
+
+        self.assertEqual(self._search('brunch'), [recipe.id])
+
+    def test_search_limited_to_user(self):
+        """Test search only returns the user's recipes."""
+        with self.captureOnCommitCallbacks(execute=True):
+            create_recipe(
+                user=create_user(email='other@example.com'),
+                title='Curry',
+            )
+
+        self.assertEqual(self._search('curry'), [])
+
+    def test_search_paginated(self):
+        """Test ranked search results can be paged through."""
+        with self.captureOnCommitCallbacks(execute=True):
+            recipes = [
+                create_recipe(user=self.user, title=f'Curry {i}')
+                for i in range(5)
+            ]
+
+        res = self.client.get(RECIPES_URL, {'search': 'curry', 'page_size': 2})
+        ids = [recipe['id'] for recipe in res.data['results']]
+        while res.data['next']:
+            res = self.client.get(res.data['next'])
+            ids += [recipe['id'] for recipe in res.data['results']]
+
+        self.assertEqual(ids, [recipe.id for recipe in reversed(recipes)])
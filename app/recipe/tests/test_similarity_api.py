@@ -0,0 +1,154 @@
+"""
+Tests for the similar recipes API.
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import (
+    Recipe,
+    RecipeSignature,
+    SimilarityBucket,
+    Tag,
+    Ingredient,
+)
+from recipe import similarity
+
+
+def similar_url(recipe_id):
+    """Create and return a similar recipes URL."""
+    return reverse('recipe:recipe-similar', args=[recipe_id])
+
+
+def create_user(email='user@example.com', password='pass123'):
+    """Create and return a user."""
+    return get_user_model().objects.create_user(email, password)
+
+
+def create_recipe(user, **params):
+    """Create and return a sample recipe."""
+    defaults = {
+        'title': 'Sample recipe',
+        'time_minutes': 10,
+        'price': Decimal('5.00'),
+    }
+    defaults.update(params)
+    return Recipe.objects.create(user=user, **defaults)
+
+
+class PrivateSimilarityApiTests(TestCase):
+    """Test authenticated API requests."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.tags = [
+            Tag.objects.create(user=self.user, name=f'Tag {i}')
+            for i in range(8)
+        ]
+
+    def _tagged(self, count, user=None):
+        """Create a recipe with the first count tags."""
+        recipe = create_recipe(user or self.user)
+        recipe.tags.add(*self.tags[:count])
+        return recipe
+
+    def test_similar_ranked_by_overlap(self):
+        """Test recipes sharing more tags rank first."""
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe = self._tagged(8)
+            close = self._tagged(7)
+            far = self._tagged(4)
+            create_recipe(self.user)
+
+        res = self.client.get(similar_url(recipe.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([r['id'] for r in res.data], [close.id, far.id])
+        self.assertGreater(res.data[0]['similarity'], 0.5)
+
+    def test_similar_follows_m2m_changes(self):
+        """Test the index follows added, removed and deleted links."""
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe = self._tagged(4)
+            other = create_recipe(self.user)
+        self.assertEqual(self.client.get(similar_url(recipe.id)).data, [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            other.tags.add(*self.tags[:4])
+        res = self.client.get(similar_url(recipe.id))
+        self.assertEqual([r['id'] for r in res.data], [other.id])
+        self.assertEqual(res.data[0]['similarity'], 1.0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            other.tags.clear()
+        self.assertEqual(self.client.get(similar_url(recipe.id)).data, [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            other.tags.add(*self.tags[:4])
+            for tag in self.tags[:4]:
+                tag.delete()
+        self.assertFalse(RecipeSignature.objects.exists())
+
+    def test_similar_uses_ingredients(self):
+        """Test ingredients count towards similarity."""
+        salt = Ingredient.objects.create(user=self.user, name='Salt')
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe = create_recipe(self.user)
+            recipe.ingredients.add(salt)
+            other = create_recipe(self.user)
+            other.ingredients.add(salt)
+
+        res = self.client.get(similar_url(recipe.id))
+
+        self.assertEqual([r['id'] for r in res.data], [other.id])
+
+    def test_similar_limited_to_user(self):
+        """Test other users' recipes are never returned."""
+        other_user = create_user('other@example.com')
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe = self._tagged(4)
+            self._tagged(4, user=other_user)
+
+        res = self.client.get(similar_url(recipe.id))
+
+        self.assertEqual(res.data, [])
+
+    def test_similar_limit(self):
+        """Test the limit parameter is applied and validated."""
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe = self._tagged(4)
+            for _ in range(3):
+                self._tagged(4)
+
+        res = self.client.get(similar_url(recipe.id), {'limit': 2})
+        bad = self.client.get(similar_url(recipe.id), {'limit': 0})
+
+        self.assertEqual(len(res.data), 2)
+        self.assertEqual(bad.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_index_size_bounded(self):
+        """Test every indexed recipe stores a fixed amount of data."""
+        with self.captureOnCommitCallbacks(execute=True):
+            small = self._tagged(1)
+            large = self._tagged(8)
+
+        for recipe in (small, large):
+            self.assertEqual(
+                len(bytes(recipe.signature.signature)),
+                similarity.NUM_PERM * 4,
+            )
+            self.assertEqual(
+                SimilarityBucket.objects.filter(recipe=recipe).count(),
+                similarity.BANDS,
+            )
+        count, per_recipe = similarity.index_size()
+        self.assertEqual(count, 2)
+        self.assertEqual(per_recipe, similarity.NUM_PERM * 4
+                         + similarity.BANDS * 8)
@@ -0,0 +1,144 @@
+"""
+Tests for the recipe stats API.
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import (
+    Recipe,
+    RecipeStats,
+)
+
+
+STATS_URL = reverse('recipe:stats')
+RECIPES_URL = reverse('recipe:recipe-list')
+IMPORT_URL = reverse('recipe:recipe-bulk-import')
+
+
+def detail_url(recipe_id):
+    """Create and return a recipe detail URL."""
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+def create_user(email='user@example.com', password='pass123'):
+    """Create and return a user."""
+    return get_user_model().objects.create_user(email, password)
+
+
+def create_recipe(user, **params):
+    """Create and return a sample recipe."""
+    defaults = {
+        'title': 'Sample recipe',
+        'time_minutes': 10,
+        'price': Decimal('5.00'),
+    }
+    defaults.update(params)
+    return Recipe.objects.create(user=user, **defaults)
+
+
+class PublicStatsApiTests(TestCase):
+    """Test unauthenticated API requests."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        """Test auth is required to retrieve stats."""
+        res = self.client.get(STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateStatsApiTests(TestCase):
+    """Test authenticated API requests."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_empty_stats(self):
+        """Test stats for a user without recipes."""
+        res = self.client.get(STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['recipe_count'], 0)
+        self.assertIsNone(res.data['calories']['average'])
+        self.assertIsNone(res.data['price']['average'])
+
+    def test_stats_summarise_recipes(self):
+        """Test stats reflect the user's recipes only."""
+        create_recipe(self.user, calories=400, price=Decimal('4.00'))
+        create_recipe(self.user, calories=600, price=Decimal('12.00'))
+        create_recipe(self.user, time_minutes=30, price=Decimal('25.50'))
+        create_recipe(create_user('other@example.com'), calories=900)
+
+        res = self.client.get(STATS_URL)
+
+        self.assertEqual(res.data['recipe_count'], 3)
+        self.assertEqual(res.data['calories']['total'], 1000)
+        self.assertEqual(res.data['calories']['average'], Decimal('500'))
+        self.assertEqual(res.data['time_minutes']['total'], 50)
+        self.assertEqual(res.data['price']['total'], '41.50')
+        self.assertEqual(
+            res.data['price']['distribution'],
+            {'under_5': 1, '5_to_10': 0, '10_to_20': 1, '20_and_over': 1},
+        )
+
+    def test_prices_rendered_like_recipe_prices(self):
+        """Test price totals and averages render as two place strings."""
+        for price in ('1.10', '2.20', '4.00', '3.70'):
+            create_recipe(self.user, price=Decimal(price))
+
+        res = self.client.get(STATS_URL)
+
+        price = res.json()['price']
+        self.assertEqual(price['total'], '11.00')
+        self.assertEqual(price['average'], '2.75')
+        self.assertIn(b'"total":"11.00"', res.content)
+
+    def test_stats_follow_updates_and_deletes(self):
+        """Test edits and deletes apply deltas to the stats."""
+        recipe = create_recipe(self.user, calories=400)
+        other = create_recipe(self.user, price=Decimal('3.00'))
+
+        self.client.patch(detail_url(recipe.id), {'price': '22.00'})
+        self.client.delete(detail_url(other.id))
+        Recipe.objects.get(id=recipe.id).save()
+
+        stats = RecipeStats.objects.get(user=self.user)
+        self.assertEqual(stats.recipe_count, 1)
+        self.assertEqual(stats.calories_total, 400)
+        self.assertEqual(stats.price_total, Decimal('22.00'))
+        self.assertEqual(stats.price_under_5, 0)
+        self.assertEqual(stats.price_under_10, 0)
+        self.assertEqual(stats.price_20_and_over, 1)
+
+    def test_stats_follow_bulk_import(self):
+        """Test imported recipes are counted."""
+        payload = [
+            {'title': f'Recipe {i}', 'time_minutes': 10, 'price': '4.50'}
+            for i in range(3)
+        ]
+
+        self.client.post(IMPORT_URL, payload, format='json')
+
+        stats = RecipeStats.objects.get(user=self.user)
+        self.assertEqual(stats.recipe_count, 3)
+        self.assertEqual(stats.time_minutes_total, 30)
+        self.assertEqual(stats.price_under_5, 3)
+
+    def test_cached_stats_refresh_after_create(self):
+        """Test a new recipe invalidates the cached stats."""
+        self.client.get(STATS_URL, HTTP_ACCEPT='application/json')
+        create_recipe(self.user)
+
+        res = self.client.get(STATS_URL, HTTP_ACCEPT='application/json')
+
+        self.assertEqual(res.json()['recipe_count'], 1)
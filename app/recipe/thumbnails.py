@@ -0,0 +1,44 @@
+"""
+Thumbnail rendering, run in worker processes.
+
+This module only depends on Pillow so spawned workers can import it
+without setting up Django.
+"""
+import os
+
+from PIL import Image, ImageOps
+
+
+# Label -> bounding box of each generated thumbnail.
+SIZES = {
+    'small': (160, 160),
+    'medium': (480, 480),
+}
+
+QUALITY = 85
+
+
+def thumbnail_name(sha256, label):
+    """Return the storage name of a thumbnail."""
+    return f'thumbnails/{sha256[:2]}/{sha256}-{label}.jpg'
+
+
+def render(media_root, source_name, sha256):
+    """Write every thumbnail of a stored image and return their names."""
+    names = {}
+    with Image.open(os.path.join(media_root, source_name)) as source:
+        source = ImageOps.exif_transpose(source)
+        if source.mode not in ('RGB', 'L'):
+            source = source.convert('RGB')
+        for label, size in SIZES.items():
+            name = thumbnail_name(sha256, label)
+            path = os.path.join(media_root, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            image = source.copy()
+            image.thumbnail(size)
+            # Write then rename, so readers never see a partial file.
+            partial = f'{path}.{os.getpid()}.tmp'
+            image.save(partial, 'JPEG', quality=QUALITY, optimize=True)
+            os.replace(partial, path)
+            names[label] = name
+    return names
@@ -8,6 +8,7 @@ from django.urls import (
 
 from rest_framework.routers import DefaultRouter
 
+from core.async_views import async_view
 from recipe import views
 
 
@@ -19,5 +20,40 @@ router.register('ingredients', views.IngredientViewSet)
 app_name = 'recipe'
 
 urlpatterns = [
+    path('meal-plan/', views.MealPlanView.as_view(), name='meal-plan'),
+    path('stats/', views.RecipeStatsView.as_view(), name='stats'),
     path('', include(router.urls)),
 ]
+
+# Read paths served as async views by the ASGI application, see
+# app.urls_async. Routes not listed here fall through to the router.
+async_urlpatterns = [
+    path(
+        'recipes/',
+        async_view(views.RecipeViewSet.as_view({
+            'get': 'list',
+            'post': 'create',
+        })),
+        name='recipe-list',
+    ),
+    path(
+        'recipes/<int:pk>/',
+        async_view(views.RecipeViewSet.as_view({
+            'get': 'retrieve',
+            'put': 'update',
+            'patch': 'partial_update',
+            'delete': 'destroy',
+        })),
+        name='recipe-detail',
+    ),
+    path(
+        'tags/',
+        async_view(views.TagViewSet.as_view({'get': 'list'})),
+        name='tag-list',
+    ),
+    path(
+        'ingredients/',
+        async_view(views.IngredientViewSet.as_view({'get': 'list'})),
+        name='ingredient-list',
+    ),
+]
@@ -1,65 +1,467 @@
 """
 Views for the recipe APIs
 """
+from decimal import Decimal
+from io import BytesIO
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.http import StreamingHttpResponse
+
+from drf_spectacular.utils import (
+    extend_schema_view,
+    extend_schema,
+    OpenApiParameter,
+    OpenApiTypes,
+)
+
 from rest_framework import (
+    generics,
     viewsets,
     mixins,
+    status,
 )
-from rest_framework.authentication import TokenAuthentication
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework.permissions import SAFE_METHODS, IsAuthenticated
 
 from core.models import (
     Recipe,
+    RecipeStats,
     Tag,
     Ingredient
      )
-from recipe import serializers
+from core import metrics, routers
+from user.authentication import CachedTokenAuthentication
+from recipe import (
+    caching,
+    exporters,
+    fastpath,
+    fieldsets,
+    images,
+    importers,
+    meal_plan,
+    pagination,
+    search,
+    serializers,
+    similarity,
+)
+
+
+MAX_SIMILAR = 50
+
+FIELDSET_PARAMETERS = [
+    OpenApiParameter(
+        'fields',
+        OpenApiTypes.STR,
+        description='Comma separated list of fields to return',
+    ),
+    OpenApiParameter(
+        'expand',
+        OpenApiTypes.STR,
+        description='Comma separated list of relations to nest, '
+                    'others are returned as IDs',
+    ),
+]
+
+
+def params_to_ints(value, name):
+    """Convert a comma separated string of IDs to a list of integers."""
+    try:
+        return [int(str_id) for str_id in value.split(',')]
+    except ValueError:
+        raise ValidationError({name: 'Expected a comma separated ID list.'})
+
+
+def param_to_bool(value, name):
+    """Convert a 0 or 1 query parameter to a boolean."""
+    if value not in ('0', '1'):
+        raise ValidationError({name: 'Expected 0 or 1.'})
+    return value == '1'
+
 
+class ReplicaReadMixin:
+    """Read from replicas on safe methods, pinning writers to the primary."""
 
-class RecipeViewSet(viewsets.ModelViewSet):
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method not in SAFE_METHODS:
+            routers.pin(request.user.pk)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs,
+        )
+        if (
+            request.method not in SAFE_METHODS
+            and request.user.is_authenticated
+        ):
+            # Restart the pin once the write commits, so it outlasts
+            # replica lag however long the write itself took.
+            user_id = request.user.pk
+            transaction.on_commit(lambda: routers.pin(user_id))
+        return response
+
+    def get_base_queryset(self):
+        """Return the view's queryset on the database to read from."""
+        return self.queryset.using(routers.read_alias(self.request))
+
+
+@extend_schema_view(
+    list=extend_schema(
+        parameters=[
+            OpenApiParameter(
+                'tags',
+                OpenApiTypes.STR,
+                description='Comma separated list of tag IDs to filter',
+            ),
+            OpenApiParameter(
+                'ingredients',
+                OpenApiTypes.STR,
+                description='Comma separated list of ingredient IDs to filter',
+            ),
+            OpenApiParameter(
+                'search',
+                OpenApiTypes.STR,
+                description='Search terms, results are ranked by relevance',
+            ),
+            *FIELDSET_PARAMETERS,
+        ]
+    ),
+    retrieve=extend_schema(parameters=FIELDSET_PARAMETERS),
+)
+class RecipeViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """View for managing recipe APIs."""
     serializer_class = serializers.RecipeDetailSerializer
     queryset = Recipe.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = pagination.RecipeCursorPagination
 
     def get_queryset(self):
         """Retrieve recipes for authenticated user."""
-        return self.queryset.filter(user=self.request.user).order_by('-id')
+        queryset = self.get_base_queryset().filter(user=self.request.user)
+        for param, field in (('tags', 'tag'), ('ingredients', 'ingredient')):
+            value = self.request.query_params.get(param)
+            if value:
+                # EXISTS keeps one row per recipe, unlike a JOIN + distinct.
+                through = getattr(Recipe, param).through
+                queryset = queryset.filter(Exists(through.objects.filter(
+                    recipe_id=OuterRef('pk'),
+                    **{f'{field}_id__in': params_to_ints(value, param)},
+                )))
+
+        terms = self.request.query_params.get('search')
+        if terms:
+            queryset = search.search(queryset, terms)
+
+        return fieldsets.narrow(
+            queryset,
+            self.get_fieldset(),
+        ).order_by('-id')
+
+    def get_fieldset(self):
+        """Return the sparse fieldset requested for list and retrieve."""
+        if self.action not in ('list', 'retrieve'):
+            return None
+        if not hasattr(self, '_fieldset'):
+            self._fieldset = fieldsets.parse(
+                self.request,
+                self.get_serializer_class().Meta.fields,
+            )
+        return self._fieldset
+
+    def get_serializer_context(self):
+        """Pass the sparse fieldset to the serializer."""
+        context = super().get_serializer_context()
+        context['fieldset'] = self.get_fieldset()
+        return context
 
     def get_serializer_class(self):
         """return the serializer class for requests"""
 
         if self.action == 'list':
             return serializers.RecipeSerializer
+        elif self.action == 'upload_image':
+            return serializers.RecipeImageSerializer
 
         return self.serializer_class
 
+    @caching.cache_user_response
+    def list(self, request, *args, **kwargs):
+        """List recipes, served from the response cache when fresh.
+
+        Pages are rendered from values() rows by the fast path.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        fieldset = self.get_fieldset()
+        page = self.paginate_queryset(fastpath.rows(queryset, fieldset))
+        data = metrics.timed(
+            'serialize',
+            fastpath.serialize,
+            page,
+            request,
+            fieldset=fieldset,
+            using=queryset.db,
+        )
+        return self.get_paginated_response(data)
+
+    @caching.cache_user_response
+    def retrieve(self, request, *args, **kwargs):
+        """Retrieve a recipe, served from the response cache when fresh."""
+        return super().retrieve(request, *args, **kwargs)
+
     def perform_create(self, serializer):
         """Create a new recipe."""
         serializer.save(user=self.request.user)
 
+    @extend_schema(request=serializers.RecipeImageUploadSerializer)
+    @action(
+        methods=['POST'],
+        detail=True,
+        url_path='upload-image',
+        parser_classes=[images.ImageUploadParser],
+    )
+    def upload_image(self, request, pk=None):
+        """Upload an image to a recipe."""
+        recipe = self.get_object()
+        upload = request.FILES.get('image')
+        if upload is None:
+            raise ValidationError({'image': 'No image was uploaded.'})
 
-class BaseRecipeAttrViewSet(mixins.UpdateModelMixin,
+        try:
+            image = images.store(upload)
+        finally:
+            upload.close()
+        recipe.image = image
+        recipe.save(update_fields=['image'])
+
+        serializer = self.get_serializer(image)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @action(methods=['POST'], detail=False, url_path='import')
+    def bulk_import(self, request):
+        """Create recipes in bulk from a JSON array or NDJSON upload."""
+        if request.content_type.startswith(importers.NDJSON_CONTENT_TYPE):
+            records = importers.iter_ndjson(request.stream or [])
+        else:
+            records = importers.iter_json_array(request.stream or BytesIO())
+
+        try:
+            result = importers.import_recipes(records, self.get_serializer())
+        except importers.ImportFormatError as exc:
+            return Response(
+                {'detail': str(exc), 'row': exc.row, **exc.result},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response(result, status=status.HTTP_200_OK)
+
+    @action(methods=['GET'], detail=False)
+    def export(self, request):
+        """Stream all of the user's recipes as NDJSON or CSV."""
+        export_format = request.query_params.get('export_format', 'ndjson')
+        if export_format not in exporters.FORMATS:
+            raise ValidationError({
+                'export_format': f'Choose one of {list(exporters.FORMATS)}.'
+            })
+
+        response = StreamingHttpResponse(
+            exporters.iter_export(
+                self.get_queryset(),
+                serializers.RecipeDetailSerializer,
+                export_format,
+            ),
+            content_type=exporters.FORMATS[export_format],
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="recipes.{export_format}"'
+        )
+        return response
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                'limit',
+                OpenApiTypes.INT,
+                description='Number of similar recipes to return, '
+                            f'at most {MAX_SIMILAR}.',
+            ),
+        ],
+        responses=OpenApiTypes.OBJECT,
+    )
+    @action(methods=['GET'], detail=True)
+    def similar(self, request, pk=None):
+        """List the user's recipes sharing the most tags and ingredients."""
+        try:
+            limit = int(request.query_params.get('limit', 10))
+        except ValueError:
+            raise ValidationError({'limit': 'Expected an integer.'})
+        if not 1 <= limit <= MAX_SIMILAR:
+            raise ValidationError({
+                'limit': f'Expected a value from 1 to {MAX_SIMILAR}.'
+            })
+
+        ranked = similarity.similar(self.get_object(), limit=limit)
+        recipes = self.get_queryset().in_bulk(
+            [recipe_id for recipe_id, _ in ranked]
+        )
+        return Response([
+            {
+                **serializers.RecipeSerializer(
+                    recipes[recipe_id],
+                    context={'request': request},
+                ).data,
+                'similarity': round(score, 3),
+            }
+            for recipe_id, score in ranked
+            if recipe_id in recipes
+        ])
+
+
+@extend_schema_view(
+    list=extend_schema(
+        parameters=[
+            OpenApiParameter(
+                'assigned_only',
+                OpenApiTypes.INT, enum=[0, 1],
+                description='Filter by items assigned to recipes.',
+            ),
+        ]
+    )
+)
+class BaseRecipeAttrViewSet(ReplicaReadMixin,
+                            mixins.UpdateModelMixin,
                             mixins.DestroyModelMixin,
                             mixins.ListModelMixin,
                             viewsets.GenericViewSet):
     """bass view set for recipe attributes."""
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = pagination.RecipeAttrCursorPagination
 
     def get_queryset(self):
         """Filter queryset to authenticated users."""
-        return self.queryset.filter(user=self.request.user).order_by('-name')
+        queryset = self.get_base_queryset().filter(user=self.request.user)
+        assigned_only = param_to_bool(
+            self.request.query_params.get('assigned_only', '0'),
+            'assigned_only',
+        )
+        if assigned_only:
+            through = getattr(Recipe, self.recipe_field).through
+            column = f'{self.queryset.model._meta.model_name}_id'
+            queryset = queryset.filter(Exists(through.objects.filter(
+                **{column: OuterRef('pk')}
+            )))
+
+        return queryset.order_by('-name')
+
+    @caching.cache_user_response
+    def list(self, request, *args, **kwargs):
+        """List items, served from the response cache when fresh."""
+        return super().list(request, *args, **kwargs)
 
 
 class TagViewSet(BaseRecipeAttrViewSet):
     """Manage tags in the database."""
     serializer_class = serializers.TagSerializer
     queryset = Tag.objects.all()
+    recipe_field = 'tags'
 
 
 class IngredientViewSet(BaseRecipeAttrViewSet):
     """Manage Ingredients in the database"""
     serializer_class = serializers.IngredientSerializer
     queryset = Ingredient.objects.all()
+    recipe_field = 'ingredients'
+
+
+class RecipeStatsView(generics.RetrieveAPIView):
+    """Summarise the authenticated user's recipes."""
+    serializer_class = serializers.RecipeStatsSerializer
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get_object(self):
+        """Retrieve the user's stats, empty if they have no recipes yet."""
+        user = self.request.user
+        return (
+            RecipeStats.objects.filter(user=user).first()
+            or RecipeStats(user=user)
+        )
+
+    @caching.cache_user_response
+    def get(self, request, *args, **kwargs):
+        """Return the stats, served from the response cache when fresh."""
+        return super().get(request, *args, **kwargs)
+
+
+class MealPlanView(APIView):
+    """Plan a day or week of meals from the user's recipes."""
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        parameters=[serializers.MealPlanQuerySerializer],
+        responses=OpenApiTypes.OBJECT,
+    )
+    def get(self, request):
+        """Return a meal plan hitting the calorie target within limits."""
+        query = serializers.MealPlanQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        target = params.get('calories') or meal_plan.calorie_target(
+            request.user,
+            params['activity'],
+        )
+        if target is None:
+            raise ValidationError({
+                'calories': 'Set age, weight and height on your profile '
+                            'or pass a calorie target.'
+            })
+        if not meal_plan.MIN_CALORIES <= target <= meal_plan.MAX_CALORIES:
+            raise ValidationError({
+                'calories': f'Your profile gives a target of {target}, '
+                            f'outside {meal_plan.MIN_CALORIES}-'
+                            f'{meal_plan.MAX_CALORIES}. Check your profile '
+                            'or pass a calorie target.'
+            })
+
+        plan = meal_plan.generate(
+            request.user,
+            target,
+            days=params['days'],
+            meals=params['meals'],
+            budget=params.get('budget'),
+            max_time=params.get('max_time'),
+        )
+        recipes = Recipe.objects.filter(
+            id__in={recipe_id for day in plan for recipe_id in day},
+        ).defer('search_vector').select_related(
+            'image',
+        ).prefetch_related(
+            'tags',
+            'ingredients',
+        ).in_bulk()
+
+        days = []
+        for day in plan:
+            day_recipes = [recipes[recipe_id] for recipe_id in day]
+            days.append({
+                'calories': sum(r.calories for r in day_recipes),
+                'price': str(sum(
+                    (r.price for r in day_recipes),
+                    Decimal('0.00'),
+                )),
+                'time_minutes': sum(
+                    r.time_minutes or 0 for r in day_recipes
+                ),
+                'recipes': serializers.RecipeSerializer(
+                    day_recipes,
+                    many=True,
+                    context={'request': request},
+                ).data,
+            })
+        return Response({'calorie_target': target, 'days': days})
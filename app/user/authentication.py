@@ -0,0 +1,118 @@
+"""
+Cached token authentication for the APIs.
+"""
+import hashlib
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+
+class TokenCache:
+    """Bounded, thread safe LRU of pickled tokens with a TTL.
+
+    Values are stored pickled so every hit returns fresh objects that the
+    request is free to modify.
+    """
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value for key, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return pickle.loads(entry[1])
+
+    def set(self, key, value):
+        """Store value for key, evicting the least recently used entry."""
+        data = pickle.dumps(value)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        """Remove key from the cache."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Remove every entry and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+token_cache = TokenCache(
+    max_size=getattr(settings, 'AUTH_TOKEN_LOCAL_CACHE_SIZE', 1024),
+    ttl=getattr(settings, 'AUTH_TOKEN_LOCAL_CACHE_TTL', 5),
+)
+
+
+def shared_cache_key(key):
+    """Return the Django cache key for a token, without exposing it."""
+    return 'auth-token:' + hashlib.sha256(key.encode()).hexdigest()
+
+
+def invalidate_token(key):
+    """Drop a token from both cache tiers."""
+    token_cache.delete(key)
+    cache.delete(shared_cache_key(key))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication that caches the token to user lookup.
+
+    Tokens are looked up in a per-process LRU first, then in the Django
+    cache and finally in the database. Entries are dropped on token delete
+    and user save (see user.signals); the per-process TTL bounds how long
+    other processes may keep serving a dropped entry.
+    """
+
+    def authenticate_credentials(self, key):
+        token = token_cache.get(key)
+        if token is None:
+            token = cache.get(shared_cache_key(key))
+            if token is None:
+                model = self.get_model()
+                try:
+                    token = model.objects.select_related('user').get(key=key)
+                except model.DoesNotExist:
+                    raise exceptions.AuthenticationFailed(_('Invalid token.'))
+                cache.set(
+                    shared_cache_key(key),
+                    token,
+                    getattr(settings, 'AUTH_TOKEN_CACHE_TTL', 300),
+                )
+            token_cache.set(key, token)
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _('User inactive or deleted.')
+            )
+
+        return (token.user, token)
@@ -0,0 +1,16 @@
+"""
+Password hashers for the user app.
+"""
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """PBKDF2 with the iteration count set by PASSWORD_HASH_ITERATIONS.
+
+    Hashes made with another count are upgraded on the next login.
+    """
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_HASH_ITERATIONS
@@ -0,0 +1,98 @@
+"""
+Password hashing on a bounded thread pool.
+
+PBKDF2 releases the GIL, so a burst of logins hashing inline would use
+every core and starve the rest of the API. Hashes run on at most
+PASSWORD_HASH_WORKERS threads, with at most PASSWORD_HASH_QUEUE_SIZE more
+waiting; beyond that logins fail fast with a 503. With no workers
+passwords hash inline.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from core import executors
+
+
+class HashingUnavailable(APIException):
+    """Raised when the hashing pool and its queue are full."""
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _('Too many logins in progress, try again shortly.')
+    default_code = 'hashing_unavailable'
+
+
+class HashingPool:
+    """Thread pool refusing work once its queue limit is reached."""
+
+    def __init__(self, workers, queue_size):
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix='password-hash',
+        )
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+
+    def run(self, func, *args):
+        """Run func on the pool and return its result."""
+        if not self._slots.acquire(blocking=False):
+            raise HashingUnavailable()
+        try:
+            future = self._executor.submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda future: self._slots.release())
+        return future.result()
+
+    def shutdown(self):
+        """Stop the pool's threads once queued hashes finish."""
+        self._executor.shutdown()
+
+
+def _hashing_pool(workers):
+    """Build the hashing pool."""
+    return HashingPool(workers, settings.PASSWORD_HASH_QUEUE_SIZE)
+
+
+def get_pool():
+    """Return the shared hashing pool, or None when it is disabled."""
+    return executors.get_executor(
+        'password-hash',
+        'PASSWORD_HASH_WORKERS',
+        _hashing_pool,
+    )
+
+
+def _run(func, *args):
+    """Run func on the hashing pool, or inline when it is disabled."""
+    pool = get_pool()
+    if pool is None:
+        return func(*args)
+    return pool.run(func, *args)
+
+
+def _verify(password, encoded):
+    """Return whether password matches and whether it needs a rehash."""
+    rehash = []
+    valid = hashers.check_password(password, encoded, setter=rehash.append)
+    return valid, bool(rehash)
+
+
+def check_password(user, password):
+    """Check a user's password on the pool, upgrading outdated hashes."""
+    valid, rehash = _run(_verify, password, user.password)
+    if valid and rehash:
+        user.password = _run(hashers.make_password, password)
+        user.save(update_fields=['password'])
+    return valid
+
+
+def make_password(password):
+    """Hash a password on the pool."""
+    return _run(hashers.make_password, password)
@@ -0,0 +1,165 @@
+"""
+Tests for cached token authentication.
+"""
+import time
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient
+
+from user.authentication import (
+    CachedTokenAuthentication,
+    TokenCache,
+    token_cache,
+)
+
+
+ME_URL = reverse('user:me')
+
+
+def create_user(email='user@example.com', password='pass123'):
+    """Create and return a user."""
+    return get_user_model().objects.create_user(email, password)
+
+
+class TokenCacheTests(TestCase):
+    """Test the per-process token LRU."""
+
+    def test_lru_bounded(self):
+        """Test the least recently used entry is evicted."""
+        lru = TokenCache(max_size=2, ttl=60)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+
+        self.assertEqual(len(lru), 2)
+        self.assertEqual(lru.get('a'), 1)
+        self.assertIsNone(lru.get('b'))
+
+    def test_entries_expire(self):
+        """Test entries are dropped after the TTL."""
+        lru = TokenCache(max_size=2, ttl=5)
+        with patch('user.authentication.time.monotonic', return_value=100):
+            lru.set('a', 1)
+        with patch('user.authentication.time.monotonic', return_value=106):
+            self.assertIsNone(lru.get('a'))
+
+    def test_hits_return_copies(self):
+        """Test changing a returned value does not change the cache."""
+        lru = TokenCache(max_size=2, ttl=60)
+        lru.set('a', {'name': 'before'})
+        lru.get('a')['name'] = 'after'
+
+        self.assertEqual(lru.get('a'), {'name': 'before'})
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Test authenticating API requests with cached tokens."""
+
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+        self.user = create_user()
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_repeated_requests_skip_auth_query(self):
+        """Test only the first request looks the token up."""
+        self.client.get(ME_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['email'], self.user.email)
+
+    def test_shared_cache_used_after_local_miss(self):
+        """Test the Django cache serves tokens missing from the LRU."""
+        self.client.get(ME_URL)
+        token_cache.clear()
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_deleted_token_rejected(self):
+        """Test deleting a token invalidates the cached entry."""
+        self.client.get(ME_URL)
+        self.token.delete()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_rejected(self):
+        """Test deactivating a user invalidates the cached entry."""
+        self.client.get(ME_URL)
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_changed_user_served_fresh(self):
+        """Test user changes are visible on the next request."""
+        self.client.get(ME_URL)
+        self.client.patch(ME_URL, {'name': 'New Name'})
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data['name'], 'New Name')
+
+    def test_update_does_not_write_back_cached_user(self):
+        """Test updates start from the database, not the cached user."""
+        self.client.get(ME_URL)
+        # Changed without signals, as seen from another process whose
+        # per-process cache entry was not dropped.
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            password='changed-elsewhere',
+            is_active=False,
+        )
+
+        res = self.client.patch(ME_URL, {'name': 'New name'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.name, 'New name')
+        self.assertEqual(self.user.password, 'changed-elsewhere')
+        self.assertFalse(self.user.is_active)
+
+    def test_invalid_token_rejected(self):
+        """Test unknown tokens are rejected."""
+        with self.assertRaises(AuthenticationFailed):
+            CachedTokenAuthentication().authenticate_credentials('invalid')
+
+    def test_cache_benchmark(self):
+        """Benchmark hit rate and latency against uncached lookups."""
+        rounds = 200
+        cached = CachedTokenAuthentication()
+        uncached = TokenAuthentication()
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            uncached.authenticate_credentials(self.token.key)
+        uncached_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            cached.authenticate_credentials(self.token.key)
+        cached_time = time.perf_counter() - start
+
+        hit_rate = token_cache.hits / (token_cache.hits + token_cache.misses)
+        self.assertGreaterEqual(hit_rate, (rounds - 1) / rounds)
+        self.assertLess(cached_time, uncached_time)
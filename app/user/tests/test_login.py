@@ -0,0 +1,156 @@
+"""
+Tests for login hashing and throttling.
+"""
+import threading
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user import hashing
+from user.throttling import LoginEmailRateThrottle, LoginIPRateThrottle
+
+
+TOKEN_URL = reverse('user:token')
+
+
+def create_user(**params):
+    """Helper Function for creating and returning new users."""
+    return get_user_model().objects.create_user(**params)
+
+
+class HashingPoolTests(TestCase):
+    """Test the bounded hashing pool."""
+
+    def test_full_pool_refuses_work(self):
+        """Test work beyond workers plus queue is refused."""
+        pool = hashing.HashingPool(workers=1, queue_size=0)
+        started = threading.Event()
+        release = threading.Event()
+
+        def block():
+            started.set()
+            release.wait(5)
+
+        thread = threading.Thread(target=pool.run, args=(block,))
+        thread.start()
+        started.wait(5)
+        try:
+            with self.assertRaises(hashing.HashingUnavailable):
+                pool.run(lambda: None)
+        finally:
+            release.set()
+            thread.join()
+
+        self.assertEqual(pool.run(lambda: 'done'), 'done')
+
+    @override_settings(PASSWORD_HASH_WORKERS=0)
+    def test_disabled_pool_hashes_inline(self):
+        """Test passwords hash on the caller's thread without workers."""
+        with patch.object(hashing.hashers, 'make_password') as make:
+            make.side_effect = lambda password: threading.current_thread()
+            thread = hashing.make_password('pass123')
+
+        self.assertIs(thread, threading.current_thread())
+
+
+class LoginApiTests(TestCase):
+    """Test logging in through the token endpoint."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.payload = {'email': 'test@example.com', 'password': 'pass123'}
+
+    @override_settings(PASSWORD_HASH_ITERATIONS=1000)
+    def test_login_rehashes_with_new_cost(self):
+        """Test a hash made with another iteration count is upgraded."""
+        user = create_user(**self.payload)
+        self.assertIn('$1000$', user.password)
+
+        with self.settings(PASSWORD_HASH_ITERATIONS=2000):
+            res = self.client.post(TOKEN_URL, self.payload)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        user.refresh_from_db()
+        self.assertIn('$2000$', user.password)
+        self.assertTrue(user.check_password('pass123'))
+
+    def test_unknown_email_still_hashes(self):
+        """Test unknown emails cost a hash like wrong passwords do."""
+        with patch.object(hashing, 'make_password') as patched_make:
+            res = self.client.post(TOKEN_URL, self.payload)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        patched_make.assert_called_once_with('pass123')
+
+    def test_full_pool_returns_503(self):
+        """Test logins are refused while the hashing pool is full."""
+        create_user(**self.payload)
+        pool = hashing.HashingPool(workers=1, queue_size=0)
+        pool._slots.acquire()
+
+        with patch.object(hashing, 'get_pool', return_value=pool):
+            res = self.client.post(TOKEN_URL, self.payload)
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    @patch.object(LoginEmailRateThrottle, 'THROTTLE_RATES',
+                  {'login_email': '2/min'})
+    def test_email_throttled_before_hashing(self):
+        """Test repeated logins for one email are throttled unhashed."""
+        for _ in range(2):
+            self.client.post(TOKEN_URL, {**self.payload, 'password': 'bad'})
+
+        with patch.object(hashing, 'check_password') as patched_check, \
+                patch.object(hashing, 'make_password') as patched_make:
+            res = self.client.post(TOKEN_URL, self.payload)
+            other = self.client.post(
+                TOKEN_URL,
+                {**self.payload, 'email': 'OTHER@example.com'},
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(other.status_code, status.HTTP_400_BAD_REQUEST)
+        patched_check.assert_not_called()
+        patched_make.assert_called_once()
+
+    @patch.object(LoginIPRateThrottle, 'THROTTLE_RATES',
+                  {'login_ip': '2/min'})
+    def test_ip_throttled(self):
+        """Test logins from one IP are throttled across emails."""
+        for index in range(2):
+            self.client.post(
+                TOKEN_URL,
+                {**self.payload, 'email': f'user{index}@example.com'},
+            )
+
+        res = self.client.post(TOKEN_URL, self.payload)
+        other_ip = self.client.post(
+            TOKEN_URL,
+            self.payload,
+            REMOTE_ADDR='10.0.0.2',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(other_ip.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @patch.object(LoginIPRateThrottle, 'THROTTLE_RATES',
+                  {'login_ip': '2/min'})
+    def test_ip_throttle_ignores_forwarded_for(self):
+        """Test rotating X-Forwarded-For does not escape the IP throttle."""
+        statuses = [
+            self.client.post(
+                TOKEN_URL,
+                self.payload,
+                HTTP_X_FORWARDED_FOR=f'203.0.113.{index}',
+            ).status_code
+            for index in range(3)
+        ]
+
+        self.assertEqual(statuses[-1], status.HTTP_429_TOO_MANY_REQUESTS)
@@ -3,6 +3,7 @@ URL mapping for the user API.
 """
 from django.urls import path
 
+from core.async_views import async_view
 from user import views
 
 
@@ -13,3 +14,8 @@ urlpatterns = [
     path('token/', views.CreateTokenView.as_view(), name='token'),
     path('me/', views.ManageUserView.as_view(), name='me'),
 ]
+
+# Read paths served as async views by the ASGI application.
+async_urlpatterns = [
+    path('me/', async_view(views.ManageUserView.as_view()), name='me'),
+]
@@ -1,10 +1,15 @@
 """
 Views for the user API.
 """
-from rest_framework import generics, authentication, permissions
+from django.contrib.auth import get_user_model
+
+from rest_framework import generics, permissions
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.permissions import SAFE_METHODS
 from rest_framework.settings import api_settings
 
+from user.authentication import CachedTokenAuthentication
+from user.throttling import LoginEmailRateThrottle, LoginIPRateThrottle
 from user.serializers import (
     UserSerializer,
     AuthTokenSerializer
@@ -20,14 +25,21 @@ class CreateTokenView(ObtainAuthToken):
     """Create a new auth token for user"""
     serializer_class = AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    parser_classes = api_settings.DEFAULT_PARSER_CLASSES
+    # Throttles run before the serializer, so rejected logins never hash.
+    throttle_classes = [LoginIPRateThrottle, LoginEmailRateThrottle]
 
 
 class ManageUserView(generics.RetrieveUpdateAPIView):
     """Manage the authenticated user."""
     serializer_class = UserSerializer
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
         """Retrive and return the authenticated user"""
-        return self.request.user
+        if self.request.method in SAFE_METHODS:
+            return self.request.user
+        # The cached user may be seconds old; saving it would write back
+        # columns another process has changed since.
+        return get_user_model().objects.get(pk=self.request.user.pk)